@@ -0,0 +1,116 @@
+"""
+Appointment counts by status, doctor type and day for the admin view.
+
+appointment_counts holds one row per (dimension, value), e.g. ("status",
+"confirmed") or ("day", "2025-05-01"). Every write path that changes
+appointments (single and bulk saves, the ingest queue, status changes)
+folds its changes into those rows in the same transaction, with one
+batched upsert. Reading the stats costs one query over the groups however
+many appointments there are.
+
+Rows are upserted in key order, so concurrent writers lock them in the same
+order on PostgreSQL. check() recounts everything from the appointments
+table and reports (or, with repair=True, fixes) any difference; run it with
+`flask --app app check-stats [--repair]`.
+"""
+
+from collections import Counter
+
+from database import upsert_insert
+from models import db, Appointment, AppointmentCount
+
+DIMENSIONS = ("status", "doctor_type", "day")
+# Appointment.status defaults to pending; older rows may have no status at all
+DEFAULT_STATUS = "pending"
+
+
+def _groups(fields):
+    return (("status", fields.get("status") or DEFAULT_STATUS),
+            ("doctor_type", fields["doctor_type"]),
+            ("day", fields["appointment_date"].isoformat()))
+
+
+def _apply(deltas):
+    deltas = sorted((key, n) for key, n in deltas.items() if n)
+    if not deltas:
+        return
+    insert = upsert_insert(db.session)(AppointmentCount)
+    statement = insert.on_conflict_do_update(
+        index_elements=[AppointmentCount.dimension, AppointmentCount.value],
+        set_={"count": AppointmentCount.count + insert.excluded.count},
+    )
+    db.session.execute(statement, [{"dimension": dimension, "value": value, "count": n}
+                                   for (dimension, value), n in deltas])
+
+
+def record_inserted(rows):
+    """Count newly inserted appointments (dicts of Appointment columns), in the current transaction."""
+    deltas = Counter()
+    for fields in rows:
+        deltas.update(_groups(fields))
+    _apply(deltas)
+
+
+def record_status_change(previous, status):
+    """Move one appointment from status previous to status, in the current transaction."""
+    deltas = Counter({("status", previous or DEFAULT_STATUS): -1})
+    deltas[("status", status or DEFAULT_STATUS)] += 1  # nets out to nothing when the status is unchanged
+    _apply(deltas)
+
+
+def summary(date_from=None, date_to=None):
+    """Totals per status, doctor type and day (days optionally limited to an ISO date range)."""
+    day_range = [AppointmentCount.dimension == "day"]
+    if date_from:
+        day_range.append(AppointmentCount.value >= date_from.isoformat())
+    if date_to:
+        day_range.append(AppointmentCount.value <= date_to.isoformat())
+    rows = db.session.execute(
+        db.select(AppointmentCount.dimension, AppointmentCount.value, AppointmentCount.count)
+        .where(AppointmentCount.count != 0,
+               db.or_(AppointmentCount.dimension != "day", db.and_(*day_range)))
+        .order_by(AppointmentCount.dimension, AppointmentCount.value)
+    ).all()
+    result = {f"by_{dimension}": {} for dimension in DIMENSIONS}
+    for dimension, value, count in rows:
+        result[f"by_{dimension}"][value] = count
+    result["total"] = sum(result["by_status"].values())
+    return result
+
+
+def expected_counts():
+    """Recount every group from the appointments table: {(dimension, value): count}."""
+    status = db.func.coalesce(Appointment.status, DEFAULT_STATUS)
+    counts = {}
+    for dimension, column in (("status", status), ("doctor_type", Appointment.doctor_type),
+                              ("day", Appointment.appointment_date)):
+        for value, count in db.session.execute(db.select(column, db.func.count()).group_by(column)):
+            counts[(dimension, value.isoformat() if dimension == "day" else value)] = count
+    return counts
+
+
+def check(repair=False):
+    """
+    Compare appointment_counts with a full recount. Returns the differences as
+    [{"dimension", "value", "stored", "expected"}]; repair=True then rewrites the table.
+    """
+    if db.session.get_bind().dialect.name == "postgresql":
+        # Both reads must see the same snapshot, or concurrent bookings show up as differences
+        db.session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    expected = expected_counts()
+    stored = {(dimension, value): count for dimension, value, count in db.session.execute(
+        db.select(AppointmentCount.dimension, AppointmentCount.value, AppointmentCount.count)
+        .where(AppointmentCount.count != 0))}
+    differences = [{"dimension": dimension, "value": value,
+                    "stored": stored.get((dimension, value), 0), "expected": expected.get((dimension, value), 0)}
+                   for dimension, value in sorted(expected.keys() | stored.keys())
+                   if stored.get((dimension, value), 0) != expected.get((dimension, value), 0)]
+    if repair and differences:
+        db.session.execute(db.delete(AppointmentCount))
+        db.session.execute(db.insert(AppointmentCount), [
+            {"dimension": dimension, "value": value, "count": count}
+            for (dimension, value), count in sorted(expected.items())])
+        db.session.commit()
+    else:
+        db.session.rollback()
+    return differences
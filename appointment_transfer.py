@@ -0,0 +1,192 @@
+"""
+Streaming export and import of the appointments table as CSV or Parquet.
+
+export_chunks() reads the table with yield_per, i.e. through a server-side
+(named) cursor on PostgreSQL and a stepped cursor on SQLite, EXPORT_CHUNK
+rows at a time. encode() turns each chunk into bytes as it arrives, so
+exporting a million rows holds one chunk in memory, not the table. A
+Parquet export writes one row group per chunk.
+
+read_file()/read_csv()/read_parquet() yield records in chunks for
+blueprints.appointments.import_appointment_records, which validates them
+with the /api/save_appointment validator and inserts each chunk with one
+executemany. A Parquet file is read through its footer, so uploads of it are
+buffered whole; CSV is read line by line.
+
+CSV cells that a spreadsheet would run as a formula (starting with =, +, -,
+@, tab or carriage return) are written with a leading ' and read back
+without it; Parquet keeps values as they are.
+
+Parquet needs pyarrow, which is optional (see requirements.txt).
+
+CLI: flask --app app export-appointments appointments.csv
+     flask --app app import-appointments appointments.parquet
+"""
+
+import csv
+import io
+import os
+
+from models import db, Appointment
+
+EXPORT_COLUMNS = tuple(column.name for column in Appointment.__table__.columns)
+# Rows per server-side cursor fetch, CSV write and Parquet row group
+EXPORT_CHUNK = int(os.environ.get("EXPORT_CHUNK", "5000"))
+# Records per validation pass and executemany on import
+IMPORT_CHUNK = int(os.environ.get("IMPORT_CHUNK", "2000"))
+
+FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+# First characters that make a spreadsheet read a CSV cell as a formula
+FORMULA_START = ("=", "+", "-", "@", "\t", "\r")
+
+
+def format_for(path):
+    """csv or parquet from a file name, csv when the extension is neither."""
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Parquet support needs pyarrow (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+
+def check_format(fmt):
+    """Raise ValueError for an unknown format, or Parquet without pyarrow installed."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    if fmt == "parquet":
+        _pyarrow()
+
+
+def export_statement(*criteria):
+    """Every column of the appointments matching criteria, in id order."""
+    table = Appointment.__table__
+    return db.select(*(table.c[name] for name in EXPORT_COLUMNS)).where(*criteria).order_by(table.c.id)
+
+
+def export_chunks(statement, chunk=EXPORT_CHUNK):
+    """Yield the rows of statement as lists of tuples, chunk rows per fetch."""
+    result = db.session.execute(statement.execution_options(yield_per=chunk))
+    for rows in result.partitions():
+        yield rows
+
+
+def encode(fmt, chunks):
+    """Bytes of the export in format fmt, one piece per chunk."""
+    if fmt == "parquet":
+        return _parquet_bytes(chunks)
+    return _csv_bytes(chunks)
+
+
+def _needs_quote(value):
+    """True for text a spreadsheet would run as a formula, also behind quotes added by escape_cell()."""
+    return value.startswith(FORMULA_START) or (value.startswith("'") and _needs_quote(value[1:]))
+
+
+def escape_cell(value):
+    """value with a leading ' when a spreadsheet would take it for a formula; other values as they are."""
+    return "'" + value if isinstance(value, str) and _needs_quote(value) else value
+
+
+def unescape_cell(value):
+    """Undo escape_cell() on a CSV value."""
+    return value[1:] if isinstance(value, str) and value.startswith("'") and _needs_quote(value[1:]) else value
+
+
+def _csv_bytes(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows([escape_cell(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # header of an empty export
+        yield buffer.getvalue().encode()
+
+
+class _Drain(io.RawIOBase):
+    """Write-only file handing back, through take(), what was written since the last call."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts, self._size = [], 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._size
+
+    def take(self):
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _parquet_bytes(chunks):
+    pa, pq = _pyarrow()
+    types = {"id": pa.int64(), "slot_minute": pa.int32(), "appointment_date": pa.date32(),
+             "created_at": pa.timestamp("us")}
+    schema = pa.schema([(name, types.get(name, pa.string())) for name in EXPORT_COLUMNS])
+    sink = _Drain()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema))
+            yield sink.take()
+    yield sink.take()  # footer
+
+
+def export_file(path, fmt, statement=None):
+    """Write an export to path; returns the number of rows."""
+    count = 0
+
+    def counted():
+        nonlocal count
+        for rows in export_chunks(statement if statement is not None else export_statement()):
+            count += len(rows)
+            yield rows
+
+    with open(path, "wb") as out:
+        for data in encode(fmt, counted()):
+            out.write(data)
+    return count
+
+
+def read_csv(stream, chunk=IMPORT_CHUNK):
+    """Records (dicts keyed by the header row) from a text stream, chunk at a time."""
+    batch = []
+    for record in csv.DictReader(stream):
+        batch.append({name: unescape_cell(value) for name, value in record.items()})
+        if len(batch) == chunk:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def read_parquet(source, chunk=IMPORT_CHUNK):
+    """Records from a Parquet file (path or binary file object), chunk at a time."""
+    _, pq = _pyarrow()
+    for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk):
+        yield batch.to_pylist()
+
+
+def read_file(path, fmt, chunk=IMPORT_CHUNK):
+    if fmt == "parquet":
+        yield from read_parquet(path, chunk)
+        return
+    with open(path, newline="", encoding="utf-8-sig") as stream:
+        yield from read_csv(stream, chunk)
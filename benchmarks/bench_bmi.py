@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: BMI / WHtR / BMR / TDEE for a synthetic cohort
+Compares the old per-person view logic (one Python call per row)
+with bmi_calculator.compute_metrics (one NumPy pass over the cohort).
+
+Usage: python benchmarks/bench_bmi.py [rows]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bmi_calculator import compute_metrics, ACTIVITY_FACTORS
+
+
+def legacy(height_cm, weight_kg, waist_cm, age, sex, activity):
+    bmi_val = weight_kg / ((height_cm / 100.0) ** 2)
+    if bmi_val < 18.5:
+        bmi_cat = "Underweight"
+    elif bmi_val < 25:
+        bmi_cat = "Normal"
+    elif bmi_val < 30:
+        bmi_cat = "Overweight"
+    else:
+        bmi_cat = "Obesity"
+    whtr = round(waist_cm / height_cm, 2) if waist_cm > 0 else None
+    if sex == "male":
+        bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age + 5
+    else:
+        bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age - 161
+    tdee = bmr * ACTIVITY_FACTORS.get(activity, 1.55)
+    return round(bmi_val, 1), bmi_cat, whtr, int(round(bmr)), int(round(tdee))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rng = np.random.default_rng(12)
+    cohort = {
+        "height_cm": rng.uniform(140, 200, rows).round(1),
+        "weight_kg": rng.uniform(35, 150, rows).round(1),
+        "waist_cm": rng.uniform(55, 130, rows).round(1),
+        "age": rng.integers(15, 90, rows).astype(float),
+        "sex": rng.choice(["male", "female"], rows),
+        "activity": rng.choice(list(ACTIVITY_FACTORS), rows),
+    }
+    as_rows = list(zip(*(cohort[name].tolist() for name in cohort)))
+
+    start = time.perf_counter()
+    expected = [legacy(*row) for row in as_rows]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    metrics = compute_metrics(**cohort)
+    vector_s = time.perf_counter() - start
+
+    assert metrics["tdee"][:1000].astype(int).tolist() == [row[4] for row in expected[:1000]]
+    assert metrics["bmi_cat"][:1000].tolist() == [row[1] for row in expected[:1000]]
+
+    print(f"rows: {rows}")
+    print(f"per-row Python: {legacy_s:8.3f}s  ({rows / legacy_s:12,.0f} rows/s)")
+    print(f"vectorized:     {vector_s:8.3f}s  ({rows / vector_s:12,.0f} rows/s)")
+    print(f"speedup:        {legacy_s / vector_s:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark: mixed read/write load on the appointment routes
+Runs the same workload under DB_PROFILE=default (rollback journal) and
+DB_PROFILE=production (WAL + pragmas + pool), each in a fresh process and
+database file. Writers POST /api/save_appointment, readers GET /appointments.
+
+Usage: python benchmarks/bench_db_concurrency.py [seconds] [writers] [readers]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_workload(seconds, writers, readers):
+    sys.path.insert(0, ROOT)
+    import logging
+    logging.disable(logging.CRITICAL)
+    from app import app, db
+
+    with app.app_context():
+        db.create_all()
+
+    stop = time.monotonic() + seconds
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def record(key, ok):
+        with lock:
+            counts[key if ok else "errors"] += 1
+
+    def writer(n):
+        client = app.test_client()
+        i = 0
+        while time.monotonic() < stop:
+            i += 1
+            response = client.post("/api/save_appointment", json={
+                "name": "Bench", "email": f"writer{n}-{i}@example.com", "phone": "1",
+                "doctor_type": "General Physician", "issue": "bench",
+                "appointment_date": "2025-06-01", "appointment_time": "10:00",
+            })
+            record("writes", response.status_code == 200)
+
+    def reader(n):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["user"] = f"writer{n}-1@example.com"
+        while time.monotonic() < stop:
+            record("reads", client.get("/appointments").status_code == 200)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    threads += [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"{counts['writes']} {counts['reads']} {counts['errors']}")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    print(f"{seconds:.0f}s, {writers} writer threads, {readers} reader threads")
+
+    for profile in ("default", "production"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DB_PROFILE=profile,
+                       DATABASE_URL="sqlite:///" + os.path.join(tmp, "bench.db"))
+            out = subprocess.run(
+                [sys.executable, __file__, "--worker", str(seconds), str(writers), str(readers)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout.split()
+        writes, reads, errors = (int(x) for x in out[-3:])
+        print(f"  {profile:<10} writes {writes / seconds:>8.0f}/s   reads {reads / seconds:>8.0f}/s   "
+              f"errors {errors}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        run_workload(float(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]))
+    else:
+        main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: typo-tolerant condition search as the vocabulary grows to 50k terms
+Vocabularies are the real condition names plus synthetic pronounceable
+terms. Queries are vocabulary terms with 0-2 random edits, searched with the
+default edit budget. Reports index build time and query latency of
+FuzzyIndex, and a linear scan (bounded edit distance against every term)
+for comparison on a sample.
+
+Usage: python benchmarks/bench_fuzzy_search.py [queries]
+"""
+
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzy_search import FuzzyIndex, edit_distance, default_max_distance, build_conditions_index
+
+CONSONANTS = list("bcdfghjklmnprstvwxz") + ["ch", "ph", "th", "st", "tr", "pl", "gr"]
+VOWELS = list("aeiouy") + ["ae", "ia", "ou"]
+
+
+def syllable(rng):
+    return rng.choice(CONSONANTS) + rng.choice(VOWELS) + (rng.choice(CONSONANTS) if rng.random() < 0.4 else "")
+
+
+def synthetic_terms(rng, count):
+    """Pronounceable pseudo-terms of 2-4 syllables, 30% with a second word."""
+    terms = set()
+    while len(terms) < count:
+        word = "".join(syllable(rng) for _ in range(rng.randint(2, 4)))
+        if rng.random() < 0.3:
+            word += " " + "".join(syllable(rng) for _ in range(rng.randint(1, 3)))
+        terms.add(word)
+    return sorted(terms)
+
+
+def typo(rng, word):
+    letters = list(word)
+    for _ in range(rng.choice([0, 1, 1, 2])):
+        i = rng.randrange(len(letters))
+        op = rng.choice("idst")
+        if op == "i":
+            letters.insert(i, rng.choice(string.ascii_lowercase))
+        elif op == "d" and len(letters) > 1:
+            del letters[i]
+        elif op == "t" and i + 1 < len(letters):
+            letters[i], letters[i + 1] = letters[i + 1], letters[i]
+        else:
+            letters[i] = rng.choice(string.ascii_lowercase)
+    return "".join(letters)
+
+
+def percentile(values, p):
+    return sorted(values)[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(16)
+    base = build_conditions_index()
+    print(f"knowledge base vocabulary: {len(base)} terms")
+
+    for size in (1000, 10000, 50000):
+        terms = list(base.terms) + synthetic_terms(rng, size - len(base))
+        start = time.perf_counter()
+        index = FuzzyIndex({term: None for term in terms})
+        build_s = time.perf_counter() - start
+
+        workload = [typo(rng, rng.choice(terms)) for _ in range(queries)]
+        latencies = []
+        for query in workload:
+            started = time.perf_counter()
+            index.search(query)
+            latencies.append(time.perf_counter() - started)
+
+        sample = workload[:50]
+        started = time.perf_counter()
+        for query in sample:
+            k = default_max_distance(len(query))
+            sorted(t for t in terms if edit_distance(query, t, k) <= k)
+        scan_ms = (time.perf_counter() - started) / len(sample) * 1000
+
+        print(f"{size:6d} terms: build {build_s * 1000:7.1f} ms | index p50 {percentile(latencies, 0.5) * 1000:6.3f} ms"
+              f"  p90 {percentile(latencies, 0.9) * 1000:6.3f} ms  p99 {percentile(latencies, 0.99) * 1000:6.3f} ms"
+              f" | linear scan {scan_ms:8.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
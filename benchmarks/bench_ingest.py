@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/save_appointment in sync mode vs the async ingest queue
+N threads post distinct appointments through the test client as fast as
+they can, against a fresh SQLite database. "sync" validates, checks for
+duplicates, inserts and commits inside the request; "async" validates,
+appends to the ingest queue and answers 202 while the worker pool saves
+batches. Reports request latency and the time until every appointment is
+in the appointments table.
+
+Usage: python benchmarks/bench_ingest.py [appointments] [threads]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-ingest-"), "bench.db")
+sys.path.insert(0, ROOT)
+
+import logging
+logging.disable(logging.CRITICAL)
+
+from app import app, db
+from models import Appointment
+
+
+def payload(mode, n, i):
+    return {
+        "name": f"Bench Patient {n}-{i}",
+        "email": f"{mode}{n}@example.com",
+        "phone": "+1234567890",
+        "doctor_type": "General Physician",
+        "issue": "Regular checkup",
+        "appointment_date": (date(2026, 1, 1) + timedelta(days=i)).isoformat(),
+        "appointment_time": "10:00",
+    }
+
+
+def run(mode, total, threads):
+    per_thread = total // threads
+    latencies, failures = [], []
+    lock = threading.Lock()
+
+    def worker(n):
+        client = app.test_client()
+        mine, bad = [], 0
+        for i in range(per_thread):
+            started = time.perf_counter()
+            response = client.post(f"/api/save_appointment?mode={mode}", json=payload(mode, n, i))
+            mine.append(time.perf_counter() - started)
+            bad += response.status_code not in (200, 202)
+        with lock:
+            latencies.extend(mine)
+            failures.append(bad)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    submitted = time.perf_counter() - started
+    if mode == "async":
+        app.extensions["ingest_queue"].wait_idle(timeout=600)
+    durable = time.perf_counter() - started
+
+    with app.app_context():
+        stored = Appointment.query.filter(Appointment.patient_email.like(f"{mode}%")).count()
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{mode:6s} requests {submitted:6.2f}s  saved {durable:6.2f}s  {stored / durable:8,.0f} appts/s  "
+          f"p50 {p50:6.2f}ms  p99 {p99:7.2f}ms  failed {sum(failures)}")
+    assert stored == per_thread * threads
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    app.test_client().get("/api/health")  # create the schema
+    run("sync", total, threads)
+    run("async", total, threads)
+    print("queue:", app.extensions["ingest_queue"].metrics())
+
+
+if __name__ == "__main__":
+    main()
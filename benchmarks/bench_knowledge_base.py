@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: remedy / medicine / pose lookups
+Compares the old view logic (allopathy_map and ayur_map dict literals built on
+every request, exact lowercase match, "split on (" pose keys) with the
+compiled knowledge base (normalise + one probe of a prebuilt alias index).
+
+Usage: python benchmarks/bench_knowledge_base.py [lookups]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge_base import kb
+from yoga_data import YOGA_POSES, MEDICINE_DATABASE
+
+
+def legacy_allopathic(disease):
+    allopathy_map = {
+        "fever": {"text": "Paracetamol 500 mg — 1 tablet every 8 hours after food", "medicine": "paracetamol"},
+        "cold": {"text": "Cetirizine 10 mg — once at night", "medicine": "cetirizine"},
+        "headache": {"text": "Paracetamol 500 mg — as needed after food", "medicine": "paracetamol"},
+        "back pain": {"text": "Ibuprofen 400 mg — twice daily + local heat", "medicine": "ibuprofen"},
+        "asthma": {"text": "Salbutamol inhaler — 2 puffs as needed", "medicine": None},
+        "diabetes": {"text": "Metformin 500 mg — morning & night with food", "medicine": "metformin"},
+        "stress": {"text": "Vitamin B-complex — once daily", "medicine": None},
+    }
+    result = allopathy_map.get(disease.lower().strip())
+    if result and result["medicine"] and result["medicine"] in MEDICINE_DATABASE:
+        return result["text"], MEDICINE_DATABASE[result["medicine"]]
+    return (result["text"], None) if result else (None, None)
+
+
+def compiled_allopathic(disease):
+    remedy = kb.allopathic(disease)
+    if remedy:
+        return remedy.text, kb.medicines.get(remedy.medicine) if remedy.medicine else None
+    return None, None
+
+
+def legacy_pose(name):
+    return YOGA_POSES.get(name.split("(")[0].strip())
+
+
+def timed(fn, inputs):
+    start = time.perf_counter()
+    for value in inputs:
+        fn(value)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(inputs) * 1e9
+
+
+def main():
+    lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rng = random.Random(4)
+    diseases = [d for d in kb.diseases] + ["Fever ", "unknown issue", "sprained wrist"]
+    pose_names = [p.name for p in kb.poses.values()] + list(kb.poses)
+    disease_inputs = [rng.choice(diseases) for _ in range(lookups)]
+    pose_inputs = [rng.choice(pose_names) for _ in range(lookups)]
+    alias_inputs = [rng.choice(["lower back pain", "Backache", "diabetic", "high temperature"]) for _ in range(lookups)]
+
+    print(f"lookups: {lookups} (knowledge base version {kb.version})")
+    print(f"allopathic, old dict literal : {timed(legacy_allopathic, disease_inputs):7.0f} ns/lookup")
+    print(f"allopathic, compiled         : {timed(compiled_allopathic, disease_inputs):7.0f} ns/lookup")
+    print(f"ayurvedic, compiled          : {timed(kb.ayurvedic, disease_inputs):7.0f} ns/lookup")
+    print(f"alias hits, compiled         : {timed(compiled_allopathic, alias_inputs):7.0f} ns/lookup "
+          f"({sum(legacy_allopathic(a)[0] is not None for a in alias_inputs[:1000]) / 10:.0f}% found by the old map)")
+    print(f"pose, old split + dict       : {timed(legacy_pose, pose_inputs):7.0f} ns/lookup")
+    print(f"pose, compiled               : {timed(kb.pose, pose_inputs):7.0f} ns/lookup")
+    print(f"medicine, compiled           : {timed(kb.medicine, [rng.choice(['Paracetamol', 'acetaminophen', 'zyrtec']) for _ in range(lookups)]):7.0f} ns/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark
+Hammers POST /login_register with concurrent logins and reports logins per
+second (total and per core), plus the latency of /api/health measured
+alongside to show whether other routes get starved. Runs once with hashing
+inline and once in the bounded pool (PASSWORD_HASH_WORKERS = cores).
+
+Usage: python benchmarks/bench_login.py [seconds] [login_threads]
+Honours PASSWORD_HASH_ALGORITHM / PASSWORD_HASH_COST for the policy under test.
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+import logging
+logging.disable(logging.CRITICAL)
+
+import passwords
+from app import app, db
+from models import User
+
+USERS = 8
+
+
+def seed_users():
+    with app.app_context():
+        db.create_all()
+        User.query.delete()
+        for i in range(USERS):
+            user = User(email=f"bench{i}@example.com")
+            user.set_password("password123")
+            db.session.add(user)
+        db.session.commit()
+
+
+def run(seconds, threads):
+    stop = time.monotonic() + seconds
+    logins, busy, probe_latency = [0], [0], []
+    lock = threading.Lock()
+
+    def login_loop(n):
+        client = app.test_client()
+        while time.monotonic() < stop:
+            response = client.post("/login_register", data={
+                "action": "login", "email": f"bench{n % USERS}@example.com", "password": "password123"})
+            with lock:
+                if response.status_code == 302:
+                    logins[0] += 1
+                elif response.status_code == 503:
+                    busy[0] += 1
+
+    def probe_loop():
+        client = app.test_client()
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            client.get("/api/health")
+            probe_latency.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+
+    workers = [threading.Thread(target=login_loop, args=(n,)) for n in range(threads)]
+    workers.append(threading.Thread(target=probe_loop))
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    probe_latency.sort()
+    return logins[0], busy[0], statistics.median(probe_latency), probe_latency[int(len(probe_latency) * 0.95)]
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    cores = os.cpu_count() or 1
+    print(f"Policy {passwords.policy.method}, {threads} login threads, {cores} core(s), {seconds:.0f}s per run")
+    seed_users()
+
+    for label, workers in (("inline", 0), (f"pool({cores})", cores)):
+        passwords.configure(workers=workers, max_queue=threads)
+        logins, busy, p50, p95 = run(seconds, threads)
+        rate = logins / seconds
+        print(f"  {label:<10} {rate:>7.1f} logins/s  {rate / cores:>7.1f}/s/core  refused {busy:>4}  "
+              f"/api/health p50 {p50:6.1f} ms  p95 {p95:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of request metrics (METRICS_ENABLED=1 vs 0)
+Two apps on the same database, one with metrics and one without, answer the
+same requests in interleaved rounds; the best round of each is reported.
+Whole-request timings are noisy at this scale, so the recorder and the
+per-statement listener cost are also timed on their own.
+
+Usage: python benchmarks/bench_metrics.py [requests per round] [rounds]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from metrics import RequestMetrics, instrument_engine
+
+REQUESTS = [
+    ("GET", "/login_register", None),
+    ("GET", "/api/health", None),
+    ("GET", "/yoga/Padmasana", None),
+    ("POST", "/api/bmi/batch", {"height_cm": [170], "weight_kg": [70], "age": [30]}),
+]
+
+
+def best(func, calls, rounds):
+    result = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(calls):
+            func()
+        result = min(result, (time.perf_counter() - started) / calls)
+    return result
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 9
+    tmp = tempfile.mkdtemp(prefix="bench-metrics-")
+    url = f"sqlite:///{os.path.join(tmp, 'metrics.db')}"
+    clients = {enabled: create_app({"SQLALCHEMY_DATABASE_URI": url, "METRICS_ENABLED": enabled}).test_client()
+               for enabled in (False, True)}
+    for client in clients.values():
+        with client.session_transaction() as sess:
+            sess["user"] = "metrics@example.com"
+
+    print(f"{'request':26s} {'off us':>9s} {'on us':>9s} {'overhead':>9s}")
+    for method, path, body in REQUESTS:
+        times = {enabled: float("inf") for enabled in clients}
+        for enabled, client in clients.items():
+            for _ in range(calls // 3):
+                client.open(path, method=method, json=body)
+        for _ in range(rounds):
+            for enabled, client in clients.items():
+                times[enabled] = min(times[enabled], best(lambda: client.open(path, method=method, json=body),
+                                                          calls, 1))
+        off, on = times[False], times[True]
+        print(f"{method + ' ' + path:26s} {off * 1e6:9.1f} {on * 1e6:9.1f} {(on / off - 1) * 100:8.1f}%")
+
+    recorder = RequestMetrics()
+
+    def record():
+        recorder.request_started()
+        recorder.query_executed(0.0001)
+        recorder.request_finished("bench", "GET", 200, 1024)
+        recorder.request_closed()
+
+    print(f"\nrecorder per request:      {best(record, 10000, rounds) * 1e6:6.2f} us")
+    plain = create_engine(f"sqlite:///{os.path.join(tmp, 'plain.db')}")
+    timed = create_engine(f"sqlite:///{os.path.join(tmp, 'timed.db')}")
+    instrument_engine(timed, recorder)
+    with plain.connect() as plain_conn, timed.connect() as timed_conn:
+        plain_query = best(lambda: plain_conn.execute(text("SELECT 1")), 5000, rounds)
+        timed_query = best(lambda: timed_conn.execute(text("SELECT 1")), 5000, rounds)
+    print(f"SELECT 1 without metrics:  {plain_query * 1e6:6.2f} us")
+    print(f"SELECT 1 with metrics:     {timed_query * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
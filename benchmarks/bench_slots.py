@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Load test: concurrent bookings against slot capacity, and /api/slots latency
+N threads book appointments for random patients into a handful of slots of
+one day through /api/save_appointment, with SLOT_CAPACITY places per slot.
+Afterwards every slot is checked against the appointments table: no slot
+may hold more active appointments than its capacity, and slot_bookings must
+match the table. Then /api/slots is timed on the filled day.
+
+Usage: python benchmarks/bench_slots.py [bookings] [threads] [capacity]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-slots-"), "bench.db")
+sys.path.insert(0, ROOT)
+
+import logging
+logging.disable(logging.CRITICAL)
+
+import slots
+from app import app, db
+from models import Appointment, SlotBooking
+
+TIMES = ["09:00", "09:30 AM", "10:00", "10:15", "10:30 AM", "11:00", "2:00 PM", "14:30"]
+
+
+def main():
+    bookings = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    places = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    slots.capacity = slots.SlotCapacity.parse(str(places))
+    app.test_client().get("/api/health")  # create the schema
+
+    statuses = Counter()
+    lock = threading.Lock()
+    per_thread = bookings // threads
+
+    def book(n):
+        client = app.test_client()
+        mine = Counter()
+        for i in range(per_thread):
+            mine[client.post("/api/save_appointment", json={
+                "name": f"Load {n}-{i}", "email": f"load{n}-{i}@example.com", "phone": "+1234567890",
+                "doctor_type": "Cardiologist", "issue": "Load test", "appointment_date": "2026-03-02",
+                "appointment_time": TIMES[(n + i) % len(TIMES)],
+            }).status_code] += 1
+        with lock:
+            statuses.update(mine)
+
+    pool = [threading.Thread(target=book, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    print(f"{per_thread * threads} booking attempts from {threads} threads in {elapsed:.2f}s "
+          f"({per_thread * threads / elapsed:,.0f}/s): {dict(statuses)}")
+
+    with app.app_context():
+        start = Appointment.slot_minute - Appointment.slot_minute % slots.SLOT_LENGTH
+        actual = dict(db.session.execute(
+            db.select(start, db.func.count()).where(Appointment.status != "cancelled").group_by(start)).all())
+        counted = dict(db.session.execute(db.select(SlotBooking.slot_minute, SlotBooking.booked)).all())
+    over = {minute: n for minute, n in actual.items() if n > places}
+    print(f"slots used: {len(actual)}, most booked: {max(actual.values())} of {places}, "
+          f"over capacity: {over or 'none'}, slot_bookings matches table: {actual == counted}")
+    assert not over and actual == counted and statuses[200] == sum(actual.values())
+
+    client = app.test_client()
+    runs = 2000
+    started = time.perf_counter()
+    for _ in range(runs):
+        client.get("/api/slots?date=2026-03-02&doctor_type=Cardiologist")
+    print(f"/api/slots: {(time.perf_counter() - started) / runs * 1e6:,.0f} us per request")
+
+
+if __name__ == "__main__":
+    main()
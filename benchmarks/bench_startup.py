@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold start, from `from app import app` to the first response
+Each sample is a fresh interpreter (like a new serverless instance). It
+imports Flask and SQLAlchemy, then the app, sends one request and reports
+the framework import, app import + creation and first-response times.
+"first deploy" runs on an empty database, so the first request creates the
+schema. "warm deploy" reuses that database, where the schema fingerprint is
+already recorded.
+
+Usage: python benchmarks/bench_startup.py [samples per case]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+import flask, flask_cors, flask_sqlalchemy, sqlalchemy.orm
+framework = time.perf_counter()
+from app import app
+created = time.perf_counter()
+client = app.test_client()
+with client.session_transaction() as sess:
+    sess["user"] = "startup@example.com"
+method, path, body = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+response = client.open(path, method=method, json=body)
+done = time.perf_counter()
+assert response.status_code < 400, response.status_code
+print(json.dumps({"framework_ms": (framework - started) * 1000, "create_ms": (created - framework) * 1000,
+                  "first_ms": (done - created) * 1000}))
+"""
+
+REQUESTS = [
+    ("GET", "/login_register", None),
+    ("GET", "/api/health", None),
+    ("GET", "/yoga/Padmasana", None),
+    ("POST", "/api/bmi/batch", {"height_cm": [170], "weight_kg": [70], "age": [30]}),
+]
+
+
+def sample(method, path, body, database_url):
+    env = dict(os.environ, DATABASE_URL=database_url, PYTHONPATH=ROOT)
+    out = subprocess.run([sys.executable, "-c", CHILD, method, path, json.dumps(body)],
+                         cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    print(f"{'case':14s} {'request':26s} {'framework':>10s} {'app import':>11s} {'first response':>15s}"
+          f" {'app total':>10s}  (median ms)")
+    for method, path, body in REQUESTS:
+        for case in ("first deploy", "warm deploy"):
+            runs = []
+            for _ in range(samples):
+                with tempfile.TemporaryDirectory() as tmp:
+                    url = f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+                    if case == "warm deploy":
+                        sample("GET", "/api/health", None, url)
+                    runs.append(sample(method, path, body, url))
+            framework = statistics.median(r["framework_ms"] for r in runs)
+            create = statistics.median(r["create_ms"] for r in runs)
+            first = statistics.median(r["first_ms"] for r in runs)
+            total = statistics.median(r["create_ms"] + r["first_ms"] for r in runs)
+            print(f"{case:14s} {method + ' ' + path:26s} {framework:10.1f} {create:11.1f} {first:15.1f} {total:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/appointments/stats vs counting from the appointments table
+Fills a fresh SQLite database with N appointments spread over doctor types,
+statuses and a year of days, builds appointment_counts with check(repair=True),
+then times the stats endpoint against the two ways the admin view could get
+the same numbers without it: GROUP BY queries over the table, and pulling
+every row and counting in Python. The endpoint's cost should stay flat as N
+grows; the other two grow with it.
+
+Usage: python benchmarks/bench_stats.py [appointments]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-stats-"), "bench.db")
+sys.path.insert(0, ROOT)
+
+import logging
+logging.disable(logging.CRITICAL)
+
+import appointment_stats
+from app import app, db
+from models import Appointment
+
+DOCTORS = ["General Physician", "Cardiologist", "Dermatologist", "Pediatrician", "Dentist"]
+STATUSES = ["confirmed", "confirmed", "confirmed", "completed", "cancelled"]
+
+
+def timed(fn, runs):
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - started) / runs * 1e3
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    client = app.test_client()
+    client.get("/api/health")  # create the schema
+
+    with app.app_context():
+        db.session.execute(db.insert(Appointment), [{
+            "patient_name": f"Patient {i}", "patient_email": f"patient{i}@example.com",
+            "doctor_type": DOCTORS[i % len(DOCTORS)], "status": STATUSES[i % len(STATUSES)],
+            "appointment_date": date(2026, 1, 1) + timedelta(days=i % 365), "appointment_time": "10:00",
+        } for i in range(count)])
+        db.session.commit()
+        started = time.perf_counter()
+        appointment_stats.check(repair=True)
+        print(f"{count:,} appointments, counts built in {time.perf_counter() - started:.2f}s")
+
+        def group_by():
+            appointment_stats.expected_counts()
+
+        def full_scan():
+            counts = Counter()
+            for status, doctor_type, day in db.session.execute(
+                    db.select(Appointment.status, Appointment.doctor_type, Appointment.appointment_date)):
+                counts.update((("status", status), ("doctor_type", doctor_type), ("day", day)))
+
+        print(f"GROUP BY over the table: {timed(group_by, 5):8.2f} ms")
+        print(f"every row, counted:      {timed(full_scan, 3):8.2f} ms")
+
+    assert client.get("/api/appointments/stats").get_json()["total"] == count
+    print(f"/api/appointments/stats: {timed(lambda: client.get('/api/appointments/stats'), 200):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
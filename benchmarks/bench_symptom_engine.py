@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: symptom scoring on a synthetic 5,000-condition / 1,000-symptom knowledge base
+Compares the old view logic (nested loops over a dict of lists + full sort)
+with SymptomEngine (inverted index + heap top-k).
+
+Usage: python benchmarks/bench_symptom_engine.py [queries]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from symptom_engine import SymptomEngine
+
+CONDITIONS = 5000
+SYMPTOMS = 1000
+CONDITIONS_PER_SYMPTOM = 60
+
+
+def synthetic_kb(rng):
+    conditions = [f"Condition {i}" for i in range(CONDITIONS)]
+    return {f"symptom_{s}": rng.sample(conditions, CONDITIONS_PER_SYMPTOM) for s in range(SYMPTOMS)}
+
+
+def legacy(kb, selected):
+    condition_scores = {}
+    for symptom in selected:
+        for condition in kb.get(symptom, []):
+            condition_scores[condition] = condition_scores.get(condition, 0) + 1
+    return sorted(condition_scores.items(), key=lambda x: x[1], reverse=True)[:5]
+
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = random.Random(11)
+    kb = synthetic_kb(rng)
+    symptom_names = list(kb)
+    workload = [rng.sample(symptom_names, rng.randint(3, 10)) for _ in range(queries)]
+
+    start = time.perf_counter()
+    engine = SymptomEngine(kb)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for selected in workload:
+        legacy(kb, selected)
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for selected in workload:
+        engine.top_conditions(selected)
+    engine_s = time.perf_counter() - start
+
+    for selected in workload[:200]:
+        assert [s for _, s in engine.top_conditions(selected)] == [s for _, s in legacy(kb, selected)]
+
+    print(f"{CONDITIONS} conditions, {SYMPTOMS} symptoms, {queries} queries of 3-10 symptoms")
+    print(f"  index build:                 {build_ms:8.1f} ms")
+    print(f"  legacy loops + full sort:    {queries / legacy_s:>10,.0f} queries/s")
+    print(f"  inverted index + heap top-k: {queries / engine_s:>10,.0f} queries/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark: render every page in templates/ under concurrent load
+Each template is rendered with a realistic context (knowledge base poses and
+medicines, a symptom check result, a BMI result, ...) from a pool of threads,
+once with the {% cache %} fragment cache off and once with it on. The render
+profiler is enabled throughout; its per-template / per-block report for the
+cached run is printed at the end.
+
+Usage: python benchmarks/bench_templates.py [renders per template] [threads]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date
+from types import SimpleNamespace
+
+from flask import render_template
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ["TEMPLATE_PROFILE"] = "1"
+
+import bmi_calculator
+import template_cache
+from app import app
+from knowledge_base import kb
+from symptom_engine import engine
+from yoga_suggestions import suggest_yoga
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+BRAND = {"brand": "Health Care"}
+
+
+def sample_contexts():
+    """template name -> list of contexts, cycled through by the renderers."""
+    now = datetime.now()
+    appointments = [SimpleNamespace(appointment_date=date(2025, 11, day), appointment_time="10:30",
+                                    created_at=now, doctor_type="General Physician",
+                                    health_issue="Follow-up", patient_email=f"p{day}@example.com",
+                                    patient_phone=None, status="scheduled")
+                    for day in range(1, 11)]
+    consultations = [SimpleNamespace(id=i, created_at=now, disease="fever", doctor_type="allopathic",
+                                     medicine="Paracetamol", notes=None, user_email=f"u{i}@example.com")
+                     for i in range(20)]
+
+    yoga = []
+    for disease in ("back pain", "stress", "asthma", "diabetes", "insomnia"):
+        poses = suggest_yoga(disease)
+        details = [{"key": p.key, "data": p} for p in map(kb.pose, poses) if p]
+        yoga.append(dict(BRAND, poses=poses, pose_details=details, disease=disease))
+
+    symptom_sets = [["fever", "cough"], ["headache", "nausea"], ["chest_pain", "shortness_of_breath"],
+                    ["fatigue", "joint_pain", "fever"]]
+    symptom = [dict(BRAND, selected_symptoms=s, result=engine.check(s)) for s in symptom_sets]
+
+    allopathic = []
+    for disease in ("fever", "headache", "back pain", "diabetes"):
+        remedy = kb.allopathic(disease)
+        allopathic.append(dict(BRAND, disease=disease, matched=None, suggestion=remedy.text,
+                               medicine_details=kb.medicines.get(remedy.medicine) if remedy.medicine else None))
+
+    bmi_defaults = {"height_cm": 170, "weight_kg": 72, "waist_cm": 84, "age": 35, "sex": "male", "activity": "moderate"}
+    bmi = dict(BRAND, error=None, defaults=bmi_defaults,
+               result=bmi_calculator.single_result(170, 72, 84, 35, "male", "moderate"))
+
+    dashboard = [dict(BRAND, user_email=f"user{i}@example.com",
+                      stats={"allopathic_count": i, "ayurvedic_count": 2, "yoga_sessions": 5},
+                      wellness_score=75, next_appointment="Nov 15",
+                      health_tip="Drink 8 glasses of water daily for optimal hydration.",
+                      recent_consultations=[{"doctor": "Dr. Sharma", "topic": "General Checkup", "date": "Nov 8"},
+                                            {"doctor": "Dr. Patel", "topic": "Stress Management", "date": "Nov 5"}],
+                      year=now.year)
+                 for i in range(8)]
+
+    return {
+        "404.html": [{"links": ["/home", "/yoga", "/dashboard"]}],
+        "admin.html": [{"consultations": consultations}],
+        "allopathic.html": allopathic,
+        "appointment.html": [BRAND],
+        "appointments.html": [dict(BRAND, appointments=appointments)],
+        "ayurvedic.html": [dict(BRAND, disease=d, matched=None, remedy=kb.ayurvedic(d))
+                           for d in ("fever", "cold", "stress")],
+        "bmi.html": [bmi],
+        "consult.html": [BRAND],
+        "dashboard.html": dashboard,
+        "feedback.html": [dict(BRAND, saved=True, error=None,
+                               rows=[(f"User {i}", "Great app", "2025-11-08") for i in range(20)])],
+        "forgot.html": [dict(BRAND, info="Code generated", code="123456", email="a@example.com")],
+        "home.html": [dict(BRAND, user="a@example.com")],
+        "landing.html": [BRAND],
+        "login_register.html": [dict(BRAND, msg="Invalid email or password.")],
+        "medicine_detail.html": [dict(BRAND, medicine=m, medicine_name=m.key) for m in kb.medicines.values()],
+        "reset.html": [dict(BRAND, msg="Password updated", success=True)],
+        "result.html": [dict(BRAND, disease="back pain", yoga_list=suggest_yoga("back pain"))],
+        "symptom_checker.html": symptom,
+        "yoga.html": yoga,
+        "yoga_detail.html": [dict(BRAND, pose=p, pose_name=p.key) for p in kb.poses.values()],
+    }
+
+
+def render_all(contexts, renders, threads):
+    """Render every template `renders` times across the thread pool; returns (seconds, latencies)."""
+    jobs = [(name, ctxs[i % len(ctxs)]) for name, ctxs in contexts.items() for i in range(renders)]
+
+    def render(job):
+        name, context = job
+        with app.test_request_context("/", environ_base={"REMOTE_ADDR": "127.0.0.1"}):
+            started = time.perf_counter()
+            render_template(name, **context)
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(render, jobs))
+    return time.perf_counter() - started, latencies
+
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    contexts = sample_contexts()
+    missing = sorted(set(os.listdir(TEMPLATE_DIR)) - set(contexts))
+    if missing:
+        sys.exit(f"No sample context for: {', '.join(missing)}")
+
+    profiler = app.jinja_env.render_profiler
+    fragment_templates = sorted(name for name in contexts
+                                if "{% cache" in open(os.path.join(TEMPLATE_DIR, name), encoding="utf-8").read())
+    runs = [("fragment cache off", template_cache.FragmentCache(max_entries=0)),
+            ("fragment cache on", template_cache.FragmentCache())]
+    means = {}
+    print(f"{len(contexts)} templates x {renders} renders, {threads} threads")
+    for label, cache in runs:
+        app.jinja_env.fragment_cache = cache
+        render_all(contexts, 5, threads)  # warm the template cache
+        profiler.reset()
+        seconds, latencies = render_all(contexts, renders, threads)
+        n = len(latencies)
+        print(f"{label:20s} {n / seconds:9.0f} renders/s   p50 {latencies[n // 2] * 1000:.3f} ms"
+              f"   p99 {latencies[int(n * 0.99)] * 1000:.3f} ms   fragment hits {cache.hits}")
+        means[label] = {row["name"]: row["mean_ms"] for row in profiler.report()}
+
+    print("\nTemplates with {% cache %} fragments, mean render time (off -> on):")
+    for name in fragment_templates:
+        off, on = means["fragment cache off"][name], means["fragment cache on"][name]
+        print(f"  {name:25s} {off:.4f} ms -> {on:.4f} ms  ({off / on:.2f}x)")
+
+    print("\nSlowest templates / blocks (fragment cache on):")
+    for row in profiler.report()[:15]:
+        print(f"  {row['name']:40s} {row['count']:7d} x {row['mean_ms']:.4f} ms  (max {row['max_ms']:.3f} ms)")
+
+
+if __name__ == "__main__":
+    main()
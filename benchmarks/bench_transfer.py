@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk import and streaming export of the appointments table
+Writes N appointments to a CSV file, imports it into a fresh SQLite
+database with import_appointment_records (validation, duplicate and slot
+checks, one executemany per chunk), then exports the table back to CSV and,
+when pyarrow is installed, to Parquet. Reports rows per second and the peak
+resident memory after each step; resident memory also holds SQLite's page
+cache and mmap (SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE), so each export is
+run a second time under tracemalloc for the peak Python heap, which should
+stay at a few chunks whatever the number of rows.
+
+Usage: python benchmarks/bench_transfer.py [appointments] [import chunk]
+"""
+
+import csv
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORK_DIR = tempfile.mkdtemp(prefix="bench-transfer-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(WORK_DIR, "bench.db")
+sys.path.insert(0, ROOT)
+
+import logging
+logging.disable(logging.CRITICAL)
+
+import appointment_transfer
+from app import app
+from blueprints.appointments import import_appointment_records
+
+DOCTORS = ["General Physician", "Cardiologist", "Dermatologist", "Pediatrician", "Dentist"]
+
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def report(step, rows, started, path=None):
+    elapsed = time.perf_counter() - started
+    size = f", {os.path.getsize(path) / 1e6:,.0f} MB" if path else ""
+    print(f"{step:<16} {rows:>9,} rows in {elapsed:6.2f}s ({rows / elapsed:>9,.0f}/s{size}), "
+          f"peak RSS {peak_mb():,.0f} MB")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    chunk = int(sys.argv[2]) if len(sys.argv) > 2 else appointment_transfer.IMPORT_CHUNK
+    app.test_client().get("/api/health")  # create the schema
+
+    source = os.path.join(WORK_DIR, "source.csv")
+    started = time.perf_counter()
+    with open(source, "w", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(["name", "email", "phone", "doctor_type", "issue", "appointment_date", "appointment_time"])
+        for i in range(count):
+            writer.writerow([f"Patient {i}", f"patient{i}@example.com", "+1234567890", DOCTORS[i % len(DOCTORS)],
+                             "Regular checkup", (date(2026, 1, 1) + timedelta(days=i % 730)).isoformat(),
+                             f"{8 + i % 10}:{i % 60:02d}"])
+    report("write source", count, started, source)
+
+    with app.app_context():
+        started = time.perf_counter()
+        result = import_appointment_records(appointment_transfer.read_file(source, "csv", chunk))
+        report("import csv", result["saved"], started)
+        assert result["saved"] == count, result
+
+        formats = ["csv"]
+        try:
+            appointment_transfer.check_format("parquet")
+            formats.append("parquet")
+        except ValueError as e:
+            print(f"parquet skipped: {e}")
+        for fmt in formats:
+            path = os.path.join(WORK_DIR, f"export.{fmt}")
+            started = time.perf_counter()
+            rows = appointment_transfer.export_file(path, fmt)
+            report(f"export {fmt}", rows, started, path)
+            assert rows == count
+            tracemalloc.start()
+            appointment_transfer.export_file(path, fmt)
+            print(f"{'':<16} peak Python heap during the export: {tracemalloc.get_traced_memory()[1] / 2**20:.1f} MB")
+            tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
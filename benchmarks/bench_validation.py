@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: appointment validation throughput
+Compares the original inline save_appointment checks (re-imported regex
+patterns, up to four strptime attempts) with validators.AppointmentValidator.
+
+Usage: python benchmarks/bench_validation.py [iterations]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from validators import appointment_validator
+
+PAYLOADS = [
+    {"name": "A", "email": "a@example.com", "phone": "1", "doctor_type": "GP", "issue": "x",
+     "appointment_date": "2025-03-04", "appointment_time": "10:00 AM"},
+    {"name": "B", "email": "b@example.com", "phone": "2", "doctor_type": "GP", "issue": "x",
+     "appointment_date": "03/04/2025", "appointment_time": "14:30"},
+    {"name": "C", "email": "c@example.com", "phone": "3", "doctor_type": "GP", "issue": "x",
+     "appointment_date": "2025/03/04", "appointment_time": "9:15 pm"},   # last strptime format
+    {"name": "D", "email": "bad-email", "phone": "4", "doctor_type": "GP", "issue": "x",
+     "appointment_date": "invalid-date", "appointment_time": "10:00"},
+]
+
+
+def legacy_validate(data):
+    """The checks save_appointment ran inline before validators.py existed."""
+    import re
+    required_fields = ['name', 'email', 'phone', 'doctor_type', 'issue', 'appointment_date', 'appointment_time']
+    missing_fields = [f for f in required_fields if f not in data or not str(data[f]).strip()]
+    if missing_fields:
+        return None
+    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    if not re.match(email_pattern, data['email']):
+        return None
+    appointment_date = None
+    for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d']:
+        try:
+            appointment_date = datetime.strptime(data['appointment_date'], fmt).date()
+            break
+        except ValueError:
+            continue
+    if not appointment_date:
+        return None
+    time_pattern = r'^([0-1]?[0-9]|2[0-3]):[0-5][0-9](\s?(AM|PM))?$'
+    if not re.match(time_pattern, data['appointment_time'], re.IGNORECASE):
+        return None
+    return appointment_date
+
+
+def throughput(fn, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(PAYLOADS[i % len(PAYLOADS)])
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    before = throughput(legacy_validate, iterations)
+    after = throughput(appointment_validator.validate, iterations)
+    print(f"Validated {iterations} payloads (mixed date layouts, 1 in {len(PAYLOADS)} invalid)")
+    print(f"  before (inline regex + strptime loop): {before:>12,.0f} validations/s")
+    print(f"  after  (AppointmentValidator):         {after:>12,.0f} validations/s")
+    print(f"  speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
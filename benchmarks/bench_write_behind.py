@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: feedback inserts with one commit per request vs the write-behind queue
+Both modes run N threads that each store rows as fast as they can in a fresh
+SQLite database. "per-request" does session.add + commit per row like a
+classic view; "write-behind" calls write_queue.submit and the queue inserts
+batches in one transaction each. Reports submit latency and time until durable.
+
+Usage: python benchmarks/bench_write_behind.py [rows] [threads]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-wb-"), "bench.db")
+sys.path.insert(0, ROOT)
+
+import logging
+logging.disable(logging.CRITICAL)
+
+from app import app, db
+from models import Feedback
+from write_behind import WriteBehindQueue
+
+
+def run_threads(threads, rows, work):
+    per_thread = rows // threads
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(n):
+        mine = []
+        with app.app_context():
+            for i in range(per_thread):
+                started = time.perf_counter()
+                work(n, i)
+                mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - started, sorted(latencies)
+
+
+def row(n, i):
+    return dict(user_email=f"user{n}@example.com", name=None, message=f"feedback {i}", created_at=datetime.utcnow())
+
+
+def report(name, total_rows, submit_s, durable_s, latencies):
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{name:13s} submit {submit_s:6.2f}s  durable {durable_s:6.2f}s  "
+          f"{total_rows / durable_s:9,.0f} rows/s  p50 {p50:6.3f}ms  p99 {p99:6.3f}ms")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    with app.app_context():
+        db.create_all()
+        Feedback.query.delete()
+        db.session.commit()
+
+    def per_request(n, i):
+        db.session.add(Feedback(**row(n, i)))
+        db.session.commit()
+
+    elapsed, latencies = run_threads(threads, rows, per_request)
+    report("per-request", rows, elapsed, elapsed, latencies)
+
+    wq = WriteBehindQueue(app, db, batch_size=500, flush_ms=50, max_pending=rows)
+    started = time.perf_counter()
+    elapsed, latencies = run_threads(threads, rows, lambda n, i: wq.submit(Feedback, **row(n, i)))
+    wq.flush(timeout=600)
+    durable = time.perf_counter() - started
+    report("write-behind", rows, elapsed, durable, latencies)
+    wq.close()
+
+    with app.app_context():
+        assert Feedback.query.count() == 2 * (rows // threads) * threads
+    print("queue:", wq.metrics())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: suggest_yoga keyword matching as the vocabulary grows
+Compares the old per-key `key in text` scan with the Aho-Corasick
+KeywordMatcher for 10 to 10,000 synthetic condition keywords.
+
+Usage: python benchmarks/bench_yoga_matcher.py [queries]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yoga_suggestions import KeywordMatcher
+
+rng = random.Random(42)
+WORDS = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(5, 12)))
+         for _ in range(20000)]
+
+
+def make_text(keywords):
+    """A ~300 character complaint mentioning three of the keywords."""
+    filler = [rng.choice(WORDS[-5000:]) for _ in range(30)]
+    for kw in rng.sample(keywords, 3):
+        filler.insert(rng.randrange(len(filler)), kw)
+    return " ".join(filler)[:400]
+
+
+def linear_scan(keywords, text):
+    return [kw for kw in keywords if kw in text]
+
+
+def per_query_us(fn, texts):
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main():
+    queries = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"{'keywords':>9} {'build ms':>9} {'linear us/query':>16} {'aho-corasick us/query':>22}")
+    for count in (10, 100, 1000, 10000):
+        keywords = WORDS[:count]
+        texts = [make_text(keywords) for _ in range(queries)]
+
+        start = time.perf_counter()
+        matcher = KeywordMatcher({kw: kw for kw in keywords})
+        build_ms = (time.perf_counter() - start) * 1000
+
+        linear = per_query_us(lambda t: linear_scan(keywords, t), texts)
+        automaton = per_query_us(lambda t: list(matcher.find_all(t)), texts)
+        print(f"{count:>9} {build_ms:>9.1f} {linear:>16.1f} {automaton:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
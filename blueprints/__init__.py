@@ -0,0 +1,12 @@
+"""
+Route blueprints, registered by app.create_app() in the order of app.BLUEPRINTS.
+
+auth         - login, registration, password reset; login_required
+pages        - home, appointments page, consult, dashboard, feedback
+knowledge    - yoga, allopathic and ayurvedic advice, pose and medicine pages, condition search
+symptoms     - symptom checker page and API
+bmi          - BMI / fitness lab page and cohort API
+appointments - Make.com appointment API, appointment status changes
+slots        - slot availability per day and doctor type
+api          - consultation requests, health and diagnostics endpoints
+"""
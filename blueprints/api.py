@@ -0,0 +1,77 @@
+"""Consultation requests, health check and diagnostics (metrics, write and ingest queues, render profile)."""
+
+from datetime import datetime
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from sqlalchemy import text
+
+import metrics
+from models import db, Consultation
+from write_behind import WriteQueueFull
+
+bp = Blueprint("api", __name__)
+
+@bp.route('/api/consultations', methods=['POST'])
+def request_consultation():
+    """Queue a consultation request; it is written to the database in the next batch"""
+    data = request.get_json(silent=True) or request.form
+    name = (data.get("name") or "").strip()
+    issue = (data.get("issue") or "").strip()
+    if not name or not issue:
+        return jsonify({"status": "error", "message": "name and issue are required"}), 400
+    write_queue = current_app.extensions["write_queue"]
+    try:
+        write_queue.submit(Consultation, name=name[:100], issue=issue[:200],
+                           message=data.get("message") or None, created_at=datetime.utcnow())
+    except WriteQueueFull as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    return jsonify({"status": "accepted", "message": "Consultation request received"}), 202
+
+@bp.route('/api/metrics', methods=['GET'])
+def request_metrics():
+    """Per-endpoint latency histograms, response sizes, DB query counts/time and in-flight requests (Prometheus text)"""
+    recorder = current_app.extensions.get("metrics")
+    if recorder is None:
+        return jsonify({"status": "error", "message": "Metrics are disabled (set METRICS_ENABLED=1)"}), 404
+    return Response(recorder.render(), mimetype="text/plain", content_type=metrics.CONTENT_TYPE)
+
+@bp.route('/api/write_queue', methods=['GET'])
+def write_queue_metrics():
+    """Depth, throughput and backpressure counters of the write-behind queue"""
+    return jsonify(current_app.extensions["write_queue"].metrics()), 200
+
+@bp.route('/api/ingest_queue', methods=['GET'])
+def ingest_queue_metrics():
+    """Ticket counts by state and worker throughput of the appointment ingest queue"""
+    return jsonify(current_app.extensions["ingest_queue"].metrics()), 200
+
+@bp.route('/api/render_profile', methods=['GET'])
+def render_profile():
+    """Render time per template and block (needs TEMPLATE_PROFILE=1); ?reset=1 clears the totals"""
+    render_profiler = current_app.jinja_env.render_profiler
+    if render_profiler is None:
+        return jsonify({"status": "error", "message": "Template profiling is disabled (set TEMPLATE_PROFILE=1)"}), 404
+    report = render_profiler.report()
+    if request.args.get("reset") == "1":
+        render_profiler.reset()
+    cache = current_app.jinja_env.fragment_cache
+    return jsonify({"templates": report,
+                    "fragment_cache": {"entries": len(cache), "hits": cache.hits, "misses": cache.misses}}), 200
+
+@bp.route('/api/health', methods=['GET'])
+def health_check():
+    """Health check endpoint for monitoring"""
+    try:
+        # Test database connection
+        db.session.execute(text('SELECT 1'))
+        return jsonify({
+            "status": "healthy",
+            "timestamp": datetime.utcnow().isoformat(),
+            "database": "connected"
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "status": "unhealthy",
+            "timestamp": datetime.utcnow().isoformat(),
+            "error": str(e)
+        }), 500
@@ -0,0 +1,664 @@
+"""Make.com appointment API: single and bulk saves, status changes, keyset-paginated listing, CSV/Parquet transfer."""
+
+import base64
+import csv
+import io
+import json
+import logging
+import os
+from datetime import datetime, date
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context, url_for
+from sqlalchemy.exc import IntegrityError
+
+import appointment_stats
+import appointment_transfer
+import database
+import slots
+from blueprints.auth import api_token_required
+from idempotency import idempotent
+from models import db, Appointment
+from validators import appointment_validator, APPOINTMENT_FIELDS, REQUIRED_ERROR
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint("appointments", __name__)
+
+# sync (default): save inline. async: queue every webhook (see ingest_queue.py).
+# Callers can also ask per request with "Prefer: respond-async" or ?mode=async.
+APPOINTMENT_INGEST_MODE = os.environ.get("APPOINTMENT_INGEST_MODE", "sync").lower()
+
+def patient_appointments_query(email):
+    """Appointments for one patient, newest first (served by uq_appointments_patient_slot)."""
+    return Appointment.query.filter_by(patient_email=email).order_by(Appointment.appointment_date.desc())
+
+def validate_appointment_data(data):
+    """
+    Validate one appointment payload from Make.com.
+    Returns (fields, None) with the cleaned Appointment columns,
+    or (None, error) where error is the JSON body for a 400 response.
+    """
+    fields, errors = appointment_validator.validate(data)
+    if not errors:
+        return fields, None
+
+    logger.error(f"Invalid appointment data: {errors}")
+    missing_fields = [field for field, _ in APPOINTMENT_FIELDS if errors.get(field) == REQUIRED_ERROR]
+    if missing_fields:
+        message = f"Missing required fields: {', '.join(missing_fields)}"
+    else:
+        # Report the first failing field, in payload order
+        message = next(iter(errors.values()))
+    error = {
+        "status": "error",
+        "message": message,
+        "errors": errors
+    }
+    if missing_fields:
+        error["missing_fields"] = missing_fields
+    return None, error
+
+@bp.route('/api/save_appointment', methods=['POST'])
+@idempotent
+def save_appointment():
+    """
+    Receives appointment data from Make.com automation
+    and saves it to the database.
+    Retries that repeat an Idempotency-Key get the first response back (see idempotency.py).
+    """
+    try:
+        logger.info("Received appointment save request")
+        
+        # Get JSON data
+        if not request.is_json:
+            logger.error("Request is not JSON")
+            return jsonify({
+                "status": "error",
+                "message": "Content-Type must be application/json"
+            }), 400
+            
+        data = request.get_json()
+        logger.info(f"Received data: {data}")
+        
+        fields, error = validate_appointment_data(data)
+        if error:
+            return jsonify(error), 400
+
+        if wants_async_ingest():
+            ticket = current_app.extensions["ingest_queue"].enqueue(data)
+            status_url = url_for(".ingest_status", ticket=ticket)
+            logger.info(f"Appointment queued: ticket {ticket}")
+            return jsonify({
+                "status": "accepted",
+                "message": "Appointment queued",
+                "ticket": ticket,
+                "status_url": status_url
+            }), 202, {"Location": status_url}
+
+        if "uq_appointments_patient_slot" in database.unenforced_constraints and \
+                find_booked_slots([slot_key(fields)]):
+            # Older database whose duplicate rows keep the unique index from being built
+            return duplicate_response(fields)
+
+        # Take a place in the doctor type's slot; a duplicate below rolls it back with the insert
+        key = slots.slot_key(fields)
+        if key and not slots.reserve(key):
+            db.session.rollback()
+            logger.warning(f"Slot full: {fields['doctor_type']} on {fields['appointment_date']} "
+                           f"at {fields['appointment_time']}")
+            return jsonify({
+                "status": "error",
+                "message": slot_full_message(fields)
+            }), 409
+
+        # Create new appointment record
+        new_appointment = Appointment(created_at=datetime.utcnow(), **fields)
+
+        db.session.add(new_appointment)
+        try:
+            # Flushes the insert first, so a duplicate surfaces here too
+            appointment_stats.record_inserted([fields])
+            db.session.commit()
+        except IntegrityError:
+            # uq_appointments_patient_slot: same email, date and time (slot_minute) already booked
+            db.session.rollback()
+            return duplicate_response(fields)
+        
+        logger.info(f"Appointment saved successfully: ID {new_appointment.id}")
+
+        return jsonify({
+            "status": "success",
+            "message": "Appointment saved successfully",
+            "appointment_id": new_appointment.id,
+            "appointment": new_appointment.to_dict()
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Database error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"Internal server error: {str(e)}"
+        }), 500
+
+def duplicate_response(fields):
+    logger.warning(f"Duplicate appointment attempt: {fields['patient_email']} on {fields['appointment_date']}")
+    return jsonify({
+        "status": "error",
+        "message": "An appointment already exists for this email, date, and time"
+    }), 409
+
+def slot_full_message(fields):
+    return f"No free {fields['doctor_type']} slot on {fields['appointment_date']} at {fields['appointment_time']}"
+
+def wants_async_ingest():
+    mode = request.args.get("mode") or APPOINTMENT_INGEST_MODE
+    return mode == "async" or "respond-async" in request.headers.get("Prefer", "")
+
+@bp.route('/api/appointments/ingest/<ticket>', methods=['GET'])
+def ingest_status(ticket):
+    """State of an appointment queued by the async mode: queued, processing, saved, duplicate or error"""
+    status = current_app.extensions["ingest_queue"].status(ticket)
+    if status is None:
+        return jsonify({"status": "error", "message": "Unknown ticket"}), 404
+    return jsonify(status), 200
+
+# Largest batch accepted by /api/save_appointments/bulk
+BULK_MAX_ITEMS = 10000
+# Slot keys per set-based duplicate query (3 bound parameters each)
+BULK_LOOKUP_CHUNK = 300
+
+def slot_key(fields):
+    """(email, date, minute) key of uq_appointments_patient_slot; "10:00 AM" and "10:00" share one."""
+    return (fields["patient_email"], fields["appointment_date"], fields["slot_minute"])
+
+def booked_slots_query(keys):
+    """The (email, date, minute) keys among keys that already have an appointment."""
+    return db.session.query(
+        Appointment.patient_email, Appointment.appointment_date, Appointment.slot_minute
+    ).filter(
+        # SQLite scans the whole index for a row-value IN; the email IN makes it seek per patient
+        Appointment.patient_email.in_({key[0] for key in keys}),
+        db.tuple_(Appointment.patient_email, Appointment.appointment_date, Appointment.slot_minute).in_(keys)
+    )
+
+def find_booked_slots(keys):
+    """Return the subset of (email, date, minute) keys that already exist, in one query per chunk."""
+    keys = list(keys)
+    booked = set()
+    for i in range(0, len(keys), BULK_LOOKUP_CHUNK):
+        rows = booked_slots_query(keys[i:i + BULK_LOOKUP_CHUNK]).all()
+        booked.update(tuple(row) for row in rows)
+    return booked
+
+def read_bulk_payload():
+    """Return the list of items from a JSON array or an NDJSON body."""
+    if request.mimetype == "application/x-ndjson":
+        items = []
+        for line in request.stream:
+            line = line.strip()
+            if line:
+                items.append(json.loads(line))
+        return items
+    data = request.get_json()
+    if isinstance(data, dict) and isinstance(data.get("appointments"), list):
+        return data["appointments"]
+    if not isinstance(data, list):
+        raise ValueError("Body must be a JSON array of appointments")
+    return data
+
+def insert_new_appointments(pending, return_ids=True):
+    """
+    Insert the (index, fields) pairs whose slot is free, in one transaction.
+    Returns {index: appointment_id} for the rows written, the set of indexes skipped as
+    duplicates and the set refused because the doctor type's slot is full (see slots.py).
+    With return_ids=False the ids are None and the insert is a plain executemany
+    (SQLite runs an ordered RETURNING one row at a time).
+    """
+    booked = find_booked_slots({slot_key(fields) for _, fields in pending})
+    rows, duplicates, batch_keys = [], set(), set()
+    for index, fields in pending:
+        key = slot_key(fields)
+        if key in booked or key in batch_keys:
+            duplicates.add(index)
+            continue
+        batch_keys.add(key)
+        rows.append((index, fields))
+
+    full = slots.reserve_rows(rows)
+    if full:
+        rows = [(index, fields) for index, fields in rows if index not in full]
+
+    saved = {}
+    if rows:
+        now = datetime.utcnow()
+        values = [{"created_at": now, **fields} for _, fields in rows]
+        if return_ids:
+            ids = db.session.scalars(
+                db.insert(Appointment).returning(Appointment.id, sort_by_parameter_order=True), values
+            ).all()
+        else:
+            db.session.execute(db.insert(Appointment), values)
+            ids = [None] * len(rows)
+        saved = {index: apt_id for (index, _), apt_id in zip(rows, ids)}
+        appointment_stats.record_inserted(fields for _, fields in rows)
+    db.session.commit()
+    return saved, duplicates, full
+
+def insert_with_retry(pending, **options):
+    """
+    insert_new_appointments(pending, **options), run once more when a concurrent request booked
+    one of the slots after its lookup. Any other failure is rolled back and re-raised.
+    """
+    try:
+        try:
+            return insert_new_appointments(pending, **options)
+        except IntegrityError:
+            db.session.rollback()
+            return insert_new_appointments(pending, **options)
+    except Exception:
+        db.session.rollback()
+        raise
+
+@bp.route('/api/save_appointments/bulk', methods=['POST'])
+def save_appointments_bulk():
+    """
+    Batch version of /api/save_appointment for Make.com backlog replays.
+    Takes a JSON array (or NDJSON), validates every item, checks duplicates
+    with set-based queries and inserts all valid rows in a single transaction.
+    """
+    try:
+        items = read_bulk_payload()
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({"status": "error", "message": f"Invalid payload: {e}"}), 400
+    except Exception:
+        return jsonify({"status": "error", "message": "Body must be a JSON array or NDJSON"}), 400
+
+    if len(items) > BULK_MAX_ITEMS:
+        return jsonify({
+            "status": "error",
+            "message": f"Too many appointments in one batch (max {BULK_MAX_ITEMS})"
+        }), 413
+
+    logger.info(f"Received bulk appointment request with {len(items)} items")
+    results = [None] * len(items)
+    pending = []
+    for index, data in enumerate(items):
+        fields, error = validate_appointment_data(data)
+        if error:
+            results[index] = dict(error, index=index)
+        else:
+            pending.append((index, fields))
+
+    try:
+        saved, duplicates, full = insert_with_retry(pending)
+    except Exception as e:
+        logger.error(f"Database error in bulk save: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"Internal server error: {str(e)}"
+        }), 500
+
+    for index, fields in pending:
+        if index in saved:
+            results[index] = {"index": index, "status": "success", "appointment_id": saved[index]}
+        elif index in full:
+            results[index] = {"index": index, "status": "full", "message": slot_full_message(fields)}
+        else:
+            results[index] = {
+                "index": index,
+                "status": "duplicate",
+                "message": "An appointment already exists for this email, date, and time"
+            }
+
+    logger.info(f"Bulk save: {len(saved)} saved, {len(duplicates)} duplicates, {len(full)} full, "
+                f"{len(items) - len(pending)} invalid")
+    return jsonify({
+        "status": "success",
+        "received": len(items),
+        "saved": len(saved),
+        "duplicates": len(duplicates),
+        "full": len(full),
+        "invalid": len(items) - len(pending),
+        "results": results
+    }), 200
+
+def ingest_appointments(payloads):
+    """
+    Save a batch of queued webhook payloads for ingest_queue.py, in one transaction.
+    Returns one {"state", "appointment_id", "message"} dict per payload.
+    """
+    results = [None] * len(payloads)
+    pending = []
+    for index, data in enumerate(payloads):
+        fields, error = validate_appointment_data(data)
+        if error:
+            results[index] = {"state": "error", "message": error["message"]}
+        else:
+            pending.append((index, fields))
+    saved, _, full = insert_with_retry(pending)
+    for index, fields in pending:
+        if index in saved:
+            results[index] = {"state": "saved", "appointment_id": saved[index]}
+        elif index in full:
+            results[index] = {"state": "error", "message": slot_full_message(fields)}
+        else:
+            results[index] = {"state": "duplicate",
+                              "message": "An appointment already exists for this email, date, and time"}
+    return results
+
+APPOINTMENT_STATUSES = ("pending", "confirmed", "completed", "cancelled")
+
+@bp.route('/api/appointments/<int:appointment_id>/status', methods=['POST'])
+@api_token_required
+def update_appointment_status(appointment_id):
+    """
+    Set an appointment's status, e.g. {"status": "cancelled"}. Needs the admin API token.
+    Cancelling frees its place in the slot; reactivating takes one again (409 if the slot is full).
+    """
+    data = request.get_json(silent=True) or {}
+    status = data.get("status")
+    if status not in APPOINTMENT_STATUSES:
+        return jsonify({
+            "status": "error",
+            "message": f"status must be one of: {', '.join(APPOINTMENT_STATUSES)}"
+        }), 400
+
+    appointment = db.session.get(Appointment, appointment_id)
+    if appointment is None:
+        return jsonify({"status": "error", "message": "Appointment not found"}), 404
+
+    previous = appointment.status
+    if previous == status:
+        # Nothing changes: no slot to give back or take, no counts to move
+        return jsonify({"status": "success", "appointment": appointment.to_dict()}), 200
+    try:
+        # Compare-and-set, so two concurrent cancellations cannot both give the place back
+        changed = db.session.execute(
+            db.update(Appointment)
+            .where(Appointment.id == appointment_id, Appointment.status == previous)
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not changed:
+            db.session.rollback()
+            return jsonify({"status": "error", "message": "Appointment was modified concurrently, please retry"}), 409
+        appointment_stats.record_status_change(previous, status)
+
+        fields = {column: getattr(appointment, column)
+                  for column in ("appointment_date", "doctor_type", "appointment_time", "slot_minute")}
+        key = slots.slot_key(fields)
+        was_active, active = previous != "cancelled", status != "cancelled"
+        if key and was_active and not active:
+            slots.release(key)
+        elif key and active and not was_active and not slots.reserve(key):
+            db.session.rollback()
+            return jsonify({"status": "error", "message": slot_full_message(fields)}), 409
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error updating appointment {appointment_id}: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"Internal server error: {str(e)}"
+        }), 500
+
+    db.session.refresh(appointment)
+    logger.info(f"Appointment {appointment_id}: {previous} -> {status}")
+    return jsonify({"status": "success", "appointment": appointment.to_dict()}), 200
+
+@bp.route('/api/appointments/stats', methods=['GET'])
+def appointment_statistics():
+    """Appointment counts by status, doctor type and day (optionally date_from/date_to), from appointment_counts"""
+    try:
+        date_from = parse_iso_date(request.args["date_from"], "date_from") if request.args.get("date_from") else None
+        date_to = parse_iso_date(request.args["date_to"], "date_to") if request.args.get("date_to") else None
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify(dict(appointment_stats.summary(date_from, date_to), status="success")), 200
+
+# Invalid records listed in an import report; the rest are only counted
+IMPORT_MAX_ERRORS = 100
+
+def import_fields(record):
+    """
+    Validate one imported record, keyed by payload names (name, email, ...) or export columns
+    (patient_name, patient_email, ...). status, consultation_notes and created_at are kept when present.
+    Returns (fields, None) or (None, message).
+    """
+    data = {field: record.get(field, record.get(column)) for field, column in APPOINTMENT_FIELDS}
+    fields, error = validate_appointment_data(data)
+    if error:
+        return None, error["message"]
+    if record.get("status"):
+        if record["status"] not in APPOINTMENT_STATUSES:
+            return None, f"status must be one of: {', '.join(APPOINTMENT_STATUSES)}"
+        fields["status"] = record["status"]
+    # Every row of a chunk needs the same keys for the executemany
+    fields["consultation_notes"] = record.get("consultation_notes") or None
+    created_at = record.get("created_at")
+    if created_at:
+        try:
+            fields["created_at"] = created_at if isinstance(created_at, datetime) else \
+                datetime.fromisoformat(str(created_at))
+        except ValueError:
+            return None, "Invalid created_at. Use an ISO 8601 timestamp"
+    return fields, None
+
+def import_appointment_records(chunks):
+    """
+    Save chunks of records from appointment_transfer, one transaction and one executemany per chunk,
+    through the same duplicate, slot and stats bookkeeping as the bulk endpoint.
+    Returns the counts and the first IMPORT_MAX_ERRORS invalid records as {"row", "message"}.
+    """
+    report = {"received": 0, "saved": 0, "duplicates": 0, "full": 0, "invalid": 0, "errors": []}
+    for records in chunks:
+        pending = []
+        for record in records:
+            report["received"] += 1
+            fields, message = import_fields(record)
+            if message:
+                report["invalid"] += 1
+                if len(report["errors"]) < IMPORT_MAX_ERRORS:
+                    report["errors"].append({"row": report["received"], "message": message})
+            else:
+                pending.append((report["received"], fields))
+        saved, duplicates, full = insert_with_retry(pending, return_ids=False)
+        report["saved"] += len(saved)
+        report["duplicates"] += len(duplicates)
+        report["full"] += len(full)
+    logger.info(f"Import: {report['saved']} saved, {report['duplicates']} duplicates, {report['full']} full, "
+                f"{report['invalid']} invalid")
+    return report
+
+def check_transfer_format(fmt):
+    """The error response for an unknown format (400) or Parquet without pyarrow (501), else None."""
+    if fmt not in appointment_transfer.FORMATS:
+        return jsonify({
+            "status": "error",
+            "message": f"format must be one of: {', '.join(appointment_transfer.FORMATS)}"
+        }), 400
+    try:
+        appointment_transfer.check_format(fmt)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 501
+    return None
+
+@bp.route('/api/appointments/export', methods=['GET'])
+@api_token_required
+def export_appointments():
+    """
+    Stream the appointments table as format=csv (default) or parquet, in id order,
+    with the same status/doctor_type/date_from/date_to filters as /api/appointments.
+    Needs the admin API token.
+    """
+    fmt = request.args.get("format", "csv")
+    try:
+        statement = appointment_transfer.export_statement(*appointment_filters(request.args))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    error = check_transfer_format(fmt)
+    if error:
+        return error
+
+    logger.info(f"Exporting appointments as {fmt}")
+    body = appointment_transfer.encode(fmt, appointment_transfer.export_chunks(statement))
+    return Response(stream_with_context(body), mimetype=appointment_transfer.FORMATS[fmt],
+                    headers={"Content-Disposition": f'attachment; filename="appointments.{fmt}"'})
+
+@bp.route('/api/appointments/import', methods=['POST'])
+@api_token_required
+def import_appointments():
+    """
+    Import a CSV (text/csv) or Parquet (application/vnd.apache.parquet, or ?format=parquet) body,
+    e.g. an export from /api/appointments/export. CSV is read as it streams in. Needs the admin API token.
+    """
+    fmt = request.args.get("format") or \
+        ("parquet" if request.mimetype == appointment_transfer.FORMATS["parquet"] else "csv")
+    error = check_transfer_format(fmt)
+    if error:
+        return error
+
+    try:
+        if fmt == "parquet":
+            chunks = appointment_transfer.read_parquet(io.BytesIO(request.get_data()))
+        else:
+            chunks = appointment_transfer.read_csv(io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline=""))
+        report = import_appointment_records(chunks)
+    except (ValueError, csv.Error) as e:
+        # Undecodable text or an unreadable Parquet file; chunks before it stay saved
+        return jsonify({"status": "error", "message": f"Invalid {fmt} file: {e}"}), 400
+    except Exception as e:
+        logger.error(f"Database error in import: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"Internal server error: {str(e)}"
+        }), 500
+
+    return jsonify(dict(report, status="success")), 200
+
+# Page size limits for /api/appointments (keyset pagination)
+APPOINTMENTS_DEFAULT_LIMIT = 100
+APPOINTMENTS_MAX_LIMIT = 1000
+APPOINTMENTS_STREAM_CHUNK = 500
+
+def encode_cursor(appointment):
+    """Opaque cursor pointing just after the given appointment."""
+    raw = json.dumps([appointment.appointment_date.isoformat(), appointment.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """Return (appointment_date, id) from a cursor, or raise ValueError."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        day, apt_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(day), int(apt_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def parse_iso_date(value, param):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {param}. Use YYYY-MM-DD")
+
+def parse_limit(value):
+    """Page size from the limit parameter (default when absent), or ValueError with a fixed message."""
+    if value is None:
+        return APPOINTMENTS_DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return limit
+
+def appointment_filters(args):
+    """Criteria for the status/doctor_type/date range filters in args."""
+    criteria = []
+    if args.get("status"):
+        criteria.append(Appointment.status == args["status"])
+    if args.get("doctor_type"):
+        criteria.append(Appointment.doctor_type == args["doctor_type"])
+    if args.get("date_from"):
+        criteria.append(Appointment.appointment_date >= parse_iso_date(args["date_from"], "date_from"))
+    if args.get("date_to"):
+        criteria.append(Appointment.appointment_date <= parse_iso_date(args["date_to"], "date_to"))
+    return criteria
+
+def filtered_appointments_query(args):
+    """Build the appointment query for the status/doctor_type/date range filters in args."""
+    return Appointment.query.filter(*appointment_filters(args))
+
+def keyset_page_query(query, after, limit):
+    """Order by (appointment_date, id) descending and start after the cursor key."""
+    if after:
+        after_date, after_id = after
+        query = query.filter(db.or_(
+            Appointment.appointment_date < after_date,
+            db.and_(Appointment.appointment_date == after_date, Appointment.id < after_id)
+        ))
+    return query.order_by(Appointment.appointment_date.desc(), Appointment.id.desc()).limit(limit)
+
+def keyset_page(query, after, limit):
+    """Fetch one page of appointments after the cursor key."""
+    return keyset_page_query(query, after, limit).all()
+
+def stream_appointments_ndjson(query):
+    """Yield every matching appointment as one JSON line, one chunk in memory at a time."""
+    after = None
+    while True:
+        page = keyset_page(query, after, APPOINTMENTS_STREAM_CHUNK)
+        for apt in page:
+            yield json.dumps(apt.to_dict()) + "\n"
+        if len(page) < APPOINTMENTS_STREAM_CHUNK:
+            break
+        after = (page[-1].appointment_date, page[-1].id)
+        # Drop the chunk from the identity map so memory stays flat
+        db.session.expunge_all()
+
+@bp.route('/api/appointments', methods=['GET'])
+def get_appointments():
+    """
+    List appointments (for admin view), newest first.
+    Supports limit/cursor keyset pagination, status/doctor_type/date_from/date_to
+    filters and format=ndjson for a streamed full export.
+    """
+    try:
+        query = filtered_appointments_query(request.args)
+        after = decode_cursor(request.args["cursor"]) if request.args.get("cursor") else None
+        limit = parse_limit(request.args.get("limit"))
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+
+    try:
+        wants_ndjson = request.args.get("format") == "ndjson" or \
+            request.accept_mimetypes.best == "application/x-ndjson"
+        if wants_ndjson:
+            logger.info("Streaming appointments as NDJSON")
+            return Response(stream_with_context(stream_appointments_ndjson(query)),
+                            mimetype="application/x-ndjson")
+
+        limit = min(limit, APPOINTMENTS_MAX_LIMIT)
+        # Fetch one extra row to know whether another page exists
+        rows = keyset_page(query, after, limit + 1)
+        has_more = len(rows) > limit
+        appointments = rows[:limit]
+        logger.info(f"Retrieved {len(appointments)} appointments")
+        return jsonify({
+            "status": "success",
+            "count": len(appointments),
+            "appointments": [apt.to_dict() for apt in appointments],
+            "has_more": has_more,
+            "next_cursor": encode_cursor(appointments[-1]) if has_more else None
+        }), 200
+    except Exception as e:
+        logger.error(f"Error retrieving appointments: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
@@ -0,0 +1,160 @@
+"""Login, registration and password reset."""
+
+import hmac
+import random
+import time
+from functools import wraps
+
+from flask import Blueprint, current_app, jsonify, redirect, render_template, request, session, url_for
+
+from models import db, User
+from passwords import PasswordHashBusy
+
+bp = Blueprint("auth", __name__)
+
+
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user' not in session:
+            return redirect(url_for('auth.login_register'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def api_token_required(f):
+    """
+    For the appointment admin API: requires "Authorization: Bearer <ADMIN_API_TOKEN>".
+    Without a configured token the endpoints answer 403 to everyone.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        token = current_app.config.get("ADMIN_API_TOKEN")
+        if not token:
+            return jsonify({"status": "error", "message": "Admin API is disabled (ADMIN_API_TOKEN is not set)"}), 403
+        scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.strip().encode(), token.encode()):
+            return jsonify({"status": "error", "message": "Authentication required"}), 401, \
+                {"WWW-Authenticate": "Bearer"}
+        return f(*args, **kwargs)
+    return decorated_function
+
+def get_current_user():
+    """Get current logged-in user"""
+    if 'user' in session:
+        return User.query.filter_by(email=session['user']).first()
+    return None
+
+def reset_tokens():
+    """Reset code store of the running app (RESET_TOKEN_STORE=db|memory, see token_store.py)"""
+    return current_app.extensions["reset_tokens"]
+
+@bp.route("/")
+def root():
+    return redirect(url_for("auth.login_register"))
+
+@bp.route("/login_register", methods=["GET", "POST"])
+def login_register():
+    msg = ""
+    if request.method == "POST":
+        action = (request.form.get("action") or "").strip().lower()
+        email = (request.form.get("email") or "").strip().lower()
+        password = (request.form.get("password") or "").strip()
+
+        if action == "register":
+            if not email or not password:
+                msg = "Please enter both email and password."
+            else:
+                # Check if user already exists
+                existing_user = User.query.filter_by(email=email).first()
+                if existing_user:
+                    msg = "User already exists!"
+                else:
+                    # Create new user with hashed password
+                    new_user = User(email=email)
+                    new_user.set_password(password)
+                    db.session.add(new_user)
+                    db.session.commit()
+                    msg = "Registered successfully! Please log in."
+        elif action == "login":
+            # Find user in database
+            user = User.query.filter_by(email=email).first()
+            if user and user.check_password(password):
+                if user.password_needs_rehash():
+                    # Hashing policy changed since this password was set
+                    user.set_password(password)
+                    db.session.commit()
+                session["user"] = email
+                return redirect(url_for("pages.home"))
+            else:
+                msg = "Invalid credentials!"
+    return render_template("login_register.html", msg=msg, brand="Health Care")
+
+@bp.app_errorhandler(PasswordHashBusy)
+def password_hash_busy(e):
+    """The bounded hashing pool is full (see passwords.py)"""
+    return render_template("login_register.html", msg="Server is busy, please try again.", brand="Health Care"), 503
+
+@bp.route("/logout")
+def logout():
+    session.pop("user", None)
+    return redirect(url_for("auth.login_register"))
+
+# ---------- Forgot / Reset Password (demo: shows code on screen; no email needed) ----------
+
+@bp.route("/forgot", methods=["GET", "POST"])
+def forgot():
+    info = ""
+    code_generated = None
+    email_entered = ""
+    if request.method == "POST":
+        email_entered = (request.form.get("email") or "").strip().lower()
+        if not email_entered:
+            info = "Please enter your email."
+        else:
+            # Check if user exists in database
+            user = User.query.filter_by(email=email_entered).first()
+            if not user:
+                info = "No account found with that email."
+            else:
+                code_generated = f"{random.randint(0, 999999):06d}"
+                reset_tokens().issue(email_entered, code_generated)  # valid for 15 minutes
+                info = "Reset code generated. Use it within 15 minutes."
+    return render_template("forgot.html", info=info, code=code_generated, email=email_entered, brand="Health Care")
+
+@bp.route("/reset", methods=["GET", "POST"])
+def reset():
+    msg = ""
+    success = False
+    if request.method == "POST":
+        email = (request.form.get("email") or "").strip().lower()
+        code = (request.form.get("code") or "").strip()
+        new_pwd = (request.form.get("new_password") or "").strip()
+        confirm = (request.form.get("confirm_password") or "").strip()
+
+        if not (email and code and new_pwd and confirm):
+            msg = "Please fill all fields."
+        elif new_pwd != confirm:
+            msg = "Passwords do not match."
+        else:
+            tokens = reset_tokens()
+            saved = tokens.get(email)
+            if not saved:
+                msg = "No reset request found for this email. Please generate a code first."
+            elif time.time() > saved["expires"]:
+                tokens.discard(email)
+                msg = "Reset code expired. Please generate a new code."
+            elif code != saved["code"]:
+                msg = "Invalid code."
+            else:
+                # Find user in database
+                user = User.query.filter_by(email=email).first()
+                if not user:
+                    msg = "Account not found."
+                else:
+                    # Update password with hashing
+                    user.set_password(new_pwd)
+                    db.session.commit()
+                    tokens.discard(email)
+                    success = True
+                    msg = "Password updated. You can now log in."
+    return render_template("reset.html", msg=msg, success=success, brand="Health Care")
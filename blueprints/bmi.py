@@ -0,0 +1,101 @@
+"""BMI / fitness lab page and the cohort API; NumPy is imported on first use."""
+
+import csv
+
+from flask import Blueprint, Response, jsonify, render_template, request
+
+from blueprints.auth import login_required
+from lazy import lazy_module
+
+bmi_calculator = lazy_module("bmi_calculator")
+
+bp = Blueprint("bmi", __name__)
+
+@bp.route("/bmi", methods=["GET", "POST"])
+@login_required
+def bmi():
+    result, error = None, ""
+
+    defaults = {
+        "height_cm": "",
+        "weight_kg": "",
+        "waist_cm": "",
+        "age": "",
+        "sex": "male",
+        "activity": "moderate"
+    }
+
+    if request.method == "POST":
+        try:
+            height_cm = float(request.form.get("height_cm") or 0)
+            weight_kg = float(request.form.get("weight_kg") or 0)
+            waist_cm  = float(request.form.get("waist_cm")  or 0)
+            age       = int(float(request.form.get("age")   or 0))
+        except:
+            height_cm, weight_kg, waist_cm, age = 0, 0, 0, 0
+
+        sex       = (request.form.get("sex") or "male").lower()
+        activity  = (request.form.get("activity") or "moderate").lower()
+
+        defaults.update({
+            "height_cm": height_cm or "",
+            "weight_kg": weight_kg or "",
+            "waist_cm": waist_cm or "",
+            "age": age or "",
+            "sex": sex,
+            "activity": activity
+        })
+
+        if height_cm <= 0 or weight_kg <= 0 or age <= 0:
+            error = "Please enter valid height, weight and age."
+        elif sex not in ("male", "female"):
+            error = "Invalid sex selected."
+        else:
+            result = bmi_calculator.single_result(height_cm, weight_kg, waist_cm, age, sex, activity)
+
+    return render_template("bmi.html", result=result, error=error, defaults=defaults, brand="Health Care")
+
+# Largest cohort accepted by /api/bmi/batch
+BMI_BATCH_MAX_ROWS = 1000000
+
+@bp.route("/api/bmi/batch", methods=["POST"])
+def bmi_batch():
+    """
+    Cohort version of /bmi. Input is JSON columns ({"height_cm": [...], ...}),
+    a JSON list of row objects, or a CSV upload (file field "file" or a text/csv body)
+    with height_cm, weight_kg, waist_cm, age, sex, activity columns.
+    Returns JSON columns, or CSV when the input was CSV or ?format=csv.
+    """
+    try:
+        upload = request.files.get("file")
+        if upload or request.mimetype == "text/csv":
+            raw = upload.read() if upload else request.get_data()
+            columns = bmi_calculator.columns_from_csv(raw.decode("utf-8-sig"))
+            as_csv = request.args.get("format", "csv") == "csv"
+        else:
+            data = request.get_json(silent=True)
+            if not isinstance(data, (dict, list)):
+                raise ValueError("Send JSON columns, a JSON list of rows, or a CSV file")
+            columns = bmi_calculator.columns_from_json(data)
+            as_csv = request.args.get("format") == "csv"
+        rows = len(columns["height_cm"])
+        if any(len(values) != rows for values in columns.values()):
+            raise ValueError("All columns must have the same length")
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    if rows > BMI_BATCH_MAX_ROWS:
+        return jsonify({
+            "status": "error",
+            "message": f"Too many rows in one cohort (max {BMI_BATCH_MAX_ROWS})"
+        }), 413
+
+    metrics = bmi_calculator.compute_metrics(**columns)
+    if as_csv:
+        return Response(bmi_calculator.iter_metrics_csv(metrics), mimetype="text/csv")
+    return jsonify({
+        "status": "success",
+        "count": rows,
+        "invalid": int(rows - metrics["valid"].sum()),
+        "results": bmi_calculator.metrics_to_json(metrics)
+    }), 200
@@ -0,0 +1,147 @@
+"""
+Yoga, allopathic and ayurvedic advice, pose and medicine pages, condition search.
+
+The fuzzy index and the yoga matcher are imported on first use (see lazy.py).
+"""
+
+import hashlib
+
+from flask import Blueprint, Response, current_app, jsonify, redirect, render_template, request, session, url_for
+
+from blueprints.auth import login_required
+from knowledge_base import kb, refresh_if_changed
+from lazy import lazy_module
+from page_cache import PageCache, CACHE_CONTROL as PAGE_CACHE_CONTROL
+from wellness import record_activity
+
+fuzzy_search = lazy_module("fuzzy_search")
+yoga_suggestions = lazy_module("yoga_suggestions")
+
+bp = Blueprint("knowledge", __name__)
+
+_template_fingerprints = {}
+
+def template_fingerprint(name):
+    """Short hash of a template's source, so a changed template gets new ETags"""
+    fingerprint = _template_fingerprints.get(name)
+    if fingerprint is None:
+        env = current_app.jinja_env
+        source = env.loader.get_source(env, name)[0]
+        fingerprint = _template_fingerprints[name] = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+    return fingerprint
+
+def knowledge_page(template, key, **context):
+    """Render a read-only knowledge page with ETag / 304 support and the rendered-HTML LRU"""
+    refresh_if_changed()
+    generation = (kb.version, kb.fingerprint, template_fingerprint(template))
+    etag = PageCache.etag(generation, key)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        # Rendered /yoga/<pose> and /medicine/<name> pages, see page_cache.py
+        knowledge_pages = current_app.extensions["knowledge_pages"]
+        etag, html = knowledge_pages.get_or_render(generation, key, lambda: render_template(template, **context))
+        response = Response(html, mimetype="text/html")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = PAGE_CACHE_CONTROL
+    response.vary.add("Cookie")
+    return response
+
+@bp.route("/yoga", methods=["GET", "POST"])
+@login_required
+def yoga():
+    poses = []
+    pose_details = []
+    disease = ""
+    matched = None
+    if request.method == "POST":
+        disease = (request.form.get("disease") or "").strip()
+        if disease:
+            conditions, fuzzy = yoga_suggestions.find_conditions(disease)
+            if fuzzy and conditions:
+                matched = ", ".join(conditions)
+            poses = yoga_suggestions.poses_for(conditions)
+            # Get detailed information for each pose
+            for pose in poses:
+                details = kb.pose(pose)
+                if details:
+                    pose_details.append({
+                        "key": details.key,
+                        "data": details
+                    })
+            record_activity(session["user"], "yoga")
+    return render_template("yoga.html", poses=poses, pose_details=pose_details, disease=disease, matched=matched,
+                           brand="Health Care")
+
+@bp.route("/yoga/<pose_name>")
+@login_required
+def yoga_detail(pose_name):
+    """Detailed view for a specific yoga pose"""
+    pose = kb.pose(pose_name)
+    if not pose:
+        return redirect(url_for("knowledge.yoga"))
+    
+    return knowledge_page("yoga_detail.html", ("pose", pose.key), pose=pose, pose_name=pose.key, brand="Health Care")
+
+@bp.route("/allopathic", methods=["GET", "POST"])
+@login_required
+def allopathic():
+    suggestion = None
+    medicine_details = None
+    disease = ""
+    matched = None
+    if request.method == "POST":
+        disease = (request.form.get("disease") or "").lower().strip()
+        remedy = kb.allopathic(disease)
+        if remedy is None and (match := fuzzy_search.closest_disease(disease)):
+            matched = match[1]
+            remedy = kb.diseases[matched].allopathic
+        if remedy:
+            suggestion = remedy.text
+            if remedy.medicine:
+                medicine_details = kb.medicines.get(remedy.medicine)
+        else:
+            suggestion = "No ready suggestion found. Please consult a doctor."
+        record_activity(session["user"], "allopathic")
+    return render_template("allopathic.html", disease=disease, matched=matched, suggestion=suggestion, medicine_details=medicine_details, brand="Health Care")
+
+@bp.route("/medicine/<medicine_name>")
+@login_required
+def medicine_detail(medicine_name):
+    """Detailed view for a specific medicine"""
+    medicine = kb.medicine(medicine_name)
+    if not medicine:
+        return redirect(url_for("knowledge.allopathic"))
+    
+    return knowledge_page("medicine_detail.html", ("medicine", medicine.key),
+                          medicine=medicine, medicine_name=medicine.key, brand="Health Care")
+
+@bp.route("/ayurvedic", methods=["GET", "POST"])
+@login_required
+def ayurvedic():
+    remedy = None
+    disease = ""
+    matched = None
+    if request.method == "POST":
+        disease = (request.form.get("disease") or "").lower().strip()
+        remedy = kb.ayurvedic(disease)
+        if remedy is None and (match := fuzzy_search.closest_disease(disease)):
+            matched = match[1]
+            remedy = kb.diseases[matched].ayurvedic
+        remedy = remedy or "No standard remedy found. Consult an Ayurvedic doctor."
+        record_activity(session["user"], "ayurvedic")
+    return render_template("ayurvedic.html", disease=disease, matched=matched, remedy=remedy, brand="Health Care")
+
+@bp.route('/api/conditions/search', methods=['GET'])
+def search_conditions():
+    """Typo-tolerant lookup of condition names and synonyms, ranked by edit distance"""
+    query = request.args.get("q", "")
+    try:
+        limit = min(max(int(request.args.get("limit", 5)), 1), 50)
+    except ValueError:
+        return jsonify({"status": "error", "message": "limit must be an integer"}), 400
+    results = [
+        {"term": term, "distance": distance, "targets": [{"kind": kind, "key": key} for kind, key in sorted(targets)]}
+        for term, targets, distance in fuzzy_search.conditions_index.search(query, limit=limit)
+    ]
+    return jsonify({"status": "success", "query": query, "results": results}), 200
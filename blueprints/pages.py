@@ -0,0 +1,156 @@
+"""Logged-in pages: home, appointments, consult, wellness dashboard and feedback."""
+
+from datetime import datetime
+
+from flask import Blueprint, current_app, render_template, request, session
+
+from blueprints.auth import login_required
+from blueprints.appointments import patient_appointments_query
+from models import Feedback
+from wellness import record_activity, dashboard_stats
+from write_behind import WriteQueueFull
+
+bp = Blueprint("pages", __name__)
+
+def compute_insights(mood, sleep, stress):
+    """Return (score, condition, yoga_list, ayur_tip, allo_tip)."""
+    mood_weights = {"calm": 85, "happy": 80, "ok": 65, "sad": 45, "tired": 40, "angry": 35}
+    base = mood_weights.get(mood, 60)
+
+    # sleep adjustment
+    try:
+        s = int(sleep)
+    except:
+        s = 7
+    if 7 <= s <= 8:
+        base += 15
+    elif 6 <= s <= 9:
+        base += 5
+    elif s < 5 or s > 9:
+        base -= 10
+
+    # stress adjustment (1..10)
+    try:
+        st = int(stress)
+    except:
+        st = 4
+    base -= (st - 3) * 5
+
+    score = max(0, min(100, base))
+
+    # focus area
+    if st >= 7:
+        condition = "stress"
+    elif s <= 5:
+        condition = "fatigue"
+    elif mood in ("angry", "sad"):
+        condition = "mental balance"
+    else:
+        condition = "general wellness"
+
+    yoga_map = {
+        "stress": ["Padmasana", "Shavasana", "Anulom Vilom"],
+        "fatigue": ["Tadasana", "Balasana", "Viparita Karani"],
+        "mental balance": ["Nadi Shodhana", "Bhramari", "Child's Pose"],
+        "general wellness": ["Vajrasana", "Setu Bandhasana", "Cat-Cow Pose"],
+    }
+    ayur_map = {
+        "stress": "Ashwagandha at night + 10 min meditation.",
+        "fatigue": "Jeera–ajwain warm water + early light dinner.",
+        "mental balance": "Brahmi tea + evening walk.",
+        "general wellness": "Triphala (mild) + consistent bedtime.",
+    }
+    allo_map = {
+        "stress": "B-complex once daily; limit caffeine; deep breathing.",
+        "fatigue": "Hydration, electrolytes, and a short nap.",
+        "mental balance": "Mindfulness 10 min; consult if persistent.",
+        "general wellness": "Multivitamin (std. dose) & 30-min walk.",
+    }
+
+    return int(score), condition, yoga_map[condition], ayur_map[condition], allo_map[condition]
+
+@bp.route("/home")
+@login_required
+def home():
+    return render_template("home.html", user=session["user"], brand="Health Care")
+
+@bp.route("/appointments")
+@login_required
+def appointments():
+    """View all appointments for logged-in user"""
+    user_email = session["user"]
+    user_appointments = patient_appointments_query(user_email).all()
+    
+    return render_template("appointments.html", appointments=user_appointments, brand="Health Care")
+
+@bp.route("/consult")
+@login_required
+def consult():
+    return render_template("consult.html", brand="Health Care")
+
+# ------------------------------ Wellness Dashboard ------------------------------
+
+@bp.route("/dashboard", methods=["GET", "POST"])
+@login_required
+def dashboard():
+    # A wellness check-in (mood / sleep hours / stress 1-10) adds to the history
+    if request.method == "POST" and request.form.get("mood"):
+        score = compute_insights(request.form.get("mood").lower(), request.form.get("sleep"),
+                                 request.form.get("stress"))[0]
+        record_activity(session["user"], "wellness", score)
+
+    # Counters and wellness score come from the user's running aggregates
+    stats = dashboard_stats(session["user"])
+    wellness_score = stats["wellness_score"]
+
+    # Health tips rotation
+    health_tips = [
+        "Drink 8 glasses of water daily for optimal hydration.",
+        "Practice deep breathing for 5 minutes to reduce stress.",
+        "Get 7-8 hours of quality sleep each night.",
+        "Include leafy greens in your diet for better nutrition.",
+        "Take a 30-minute walk daily to boost your mood and energy."
+    ]
+    health_tip = health_tips[datetime.now().day % len(health_tips)]
+
+    # Demo consultations
+    recent_consultations = [
+        {"doctor": "Dr. Sharma", "topic": "General Checkup", "date": "Nov 8"},
+        {"doctor": "Dr. Patel", "topic": "Stress Management", "date": "Nov 5"}
+    ]
+
+    return render_template(
+        "dashboard.html",
+        user_email=session["user"],
+        stats=stats,
+        wellness_score=wellness_score,
+        next_appointment="Nov 15",
+        health_tip=health_tip,
+        recent_consultations=recent_consultations,
+        year=datetime.now().year,
+        brand="Health Care"
+    )
+
+# -------------------- FEEDBACK --------------------
+
+FEEDBACK_RECENT = 20
+
+@bp.route("/feedback", methods=["GET", "POST"])
+@login_required
+def feedback():
+    saved, error = False, ""
+    if request.method == "POST":
+        message = (request.form.get("message") or "").strip()
+        if message:
+            try:
+                write_queue = current_app.extensions["write_queue"]
+                write_queue.submit(Feedback, user_email=session["user"], name=request.form.get("name") or None,
+                                   message=message, created_at=datetime.utcnow())
+                saved = True
+            except WriteQueueFull:
+                error = "We are receiving a lot of feedback right now, please try again in a moment."
+    # Only the signed-in user's own entries: feedback carries names and email addresses
+    recent = Feedback.query.filter_by(user_email=session["user"]) \
+        .order_by(Feedback.created_at.desc()).limit(FEEDBACK_RECENT).all()
+    rows = [(f.name or f.user_email, f.message, f.created_at.strftime("%b %d, %Y %H:%M")) for f in recent]
+    return render_template("feedback.html", saved=saved, error=error, rows=rows, brand="Health Care")
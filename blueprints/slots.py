@@ -0,0 +1,31 @@
+"""Slot availability per day and doctor type (see slots.py)."""
+
+from flask import Blueprint, jsonify, request
+
+import slots
+from blueprints.appointments import parse_iso_date
+
+bp = Blueprint("slots", __name__)
+
+@bp.route('/api/slots', methods=['GET'])
+def available_slots():
+    """Booked and free places in each slot of a day for one doctor type: ?date=YYYY-MM-DD&doctor_type=..."""
+    doctor_type = (request.args.get("doctor_type") or "").strip()
+    try:
+        if not doctor_type:
+            raise ValueError("doctor_type is required")
+        day = parse_iso_date(request.args.get("date") or "", "date")
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    availability = slots.day_slots(day, doctor_type)
+    day_slots = availability.slots()
+    return jsonify({
+        "status": "success",
+        "date": day.isoformat(),
+        "doctor_type": doctor_type,
+        "slot_length": slots.SLOT_LENGTH,
+        "capacity": availability.capacity,
+        "free": [slot["time"] for slot in day_slots if slot["free"]],
+        "slots": day_slots
+    }), 200
@@ -0,0 +1,101 @@
+"""Symptom checker page, JSON API and batch triage; the engine is built on first use."""
+
+import json
+from itertools import chain, islice
+
+from flask import Blueprint, Response, jsonify, render_template, request, stream_with_context
+
+from blueprints.auth import login_required
+from lazy import lazy_module
+
+symptom_engine = lazy_module("symptom_engine")
+
+bp = Blueprint("symptoms", __name__)
+
+@bp.route("/symptom_checker", methods=["GET", "POST"])
+@login_required
+def symptom_checker():
+    result = None
+    selected_symptoms = []
+    
+    if request.method == "POST":
+        selected_symptoms = request.form.getlist("symptoms")
+        
+        if selected_symptoms:
+            result = symptom_engine.engine.check(selected_symptoms)
+    
+    return render_template(
+        "symptom_checker.html",
+        result=result,
+        selected_symptoms=selected_symptoms,
+        brand="Health Care"
+    )
+
+@bp.route("/api/symptom_checker", methods=["POST"])
+def symptom_checker_api():
+    """JSON version of /symptom_checker: {"symptoms": [...], "limit": 5}"""
+    data = request.get_json(silent=True) or {}
+    symptoms = data.get("symptoms")
+    if not isinstance(symptoms, list) or not symptoms or not all(isinstance(s, str) for s in symptoms):
+        return jsonify({
+            "status": "error",
+            "message": "symptoms must be a non-empty list of symptom names"
+        }), 400
+    try:
+        limit = min(int(data.get("limit", symptom_engine.engine.top_k)), 50)
+    except (TypeError, ValueError):
+        return jsonify({"status": "error", "message": "limit must be an integer"}), 400
+    unknown = [s for s in symptoms if s not in symptom_engine.engine.index]
+    return jsonify({
+        "status": "success",
+        "result": symptom_engine.engine.check(symptoms, max(limit, 1)),
+        "unknown_symptoms": unknown
+    }), 200
+
+# Largest JSON-array batch accepted by /api/symptom_checker/batch (NDJSON bodies are unbounded)
+SYMPTOM_BATCH_MAX_ITEMS = 100000
+
+def parse_ndjson_lines(stream):
+    """Yield one parsed item per non-blank line; unparseable lines become None (reported as errors)."""
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+@bp.route("/api/symptom_checker/batch", methods=["POST"])
+def symptom_checker_batch():
+    """
+    Triage many symptom sets in one call for partner clinics.
+    Body: JSON array (or {"items": [...]}) or NDJSON, each item a symptom list
+    or {"id": ..., "symptoms": [...]}. Responds with one NDJSON line per item,
+    in input order; large batches are scored in a process pool.
+    """
+    if request.mimetype == "application/x-ndjson":
+        # Read up to the pool threshold before choosing, so a short body is scored inline
+        lines = parse_ndjson_lines(request.stream)
+        head = list(islice(lines, symptom_engine.BATCH_POOL_THRESHOLD))
+        use_pool = len(head) >= symptom_engine.BATCH_POOL_THRESHOLD
+        items = chain(head, lines)
+    else:
+        data = request.get_json(silent=True)
+        items = data.get("items") if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            return jsonify({
+                "status": "error",
+                "message": "Body must be a JSON array of symptom sets or NDJSON"
+            }), 400
+        if len(items) > SYMPTOM_BATCH_MAX_ITEMS:
+            return jsonify({
+                "status": "error",
+                "message": f"Too many items in one batch (max {SYMPTOM_BATCH_MAX_ITEMS}); send NDJSON instead"
+            }), 413
+        use_pool = len(items) >= symptom_engine.BATCH_POOL_THRESHOLD
+
+    def generate():
+        for result in symptom_engine.iter_batch_results(items, use_pool):
+            yield json.dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
@@ -0,0 +1,191 @@
+"""
+Vectorized BMI / waist-to-height / BMR (Mifflin–St Jeor) / TDEE calculator.
+
+compute_metrics() takes equal-length arrays (or lists, or scalars) for a
+whole cohort and evaluates every row in one NumPy pass. The /bmi page calls
+single_result(), which runs the same code on a one-row cohort.
+"""
+
+import csv
+import io
+
+import numpy as np
+
+ACTIVITY_FACTORS = {
+    "sedentary": 1.2,
+    "light": 1.375,
+    "moderate": 1.55,
+    "active": 1.725,
+    "veryactive": 1.9
+}
+DEFAULT_ACTIVITY_FACTOR = 1.55
+
+BMI_CATEGORIES = np.array(["Underweight", "Normal", "Overweight", "Obesity"])
+BMI_BOUNDS = np.array([18.5, 25, 30])
+WHTR_CATEGORIES = np.array(["Low (possible under-fat)", "Healthy", "Increased risk", "High risk"])
+WHTR_BOUNDS = np.array([0.4, 0.5, 0.6])
+
+YOGA_SUGGESTIONS = {
+    "Underweight": ["Surya Namaskar", "Bridge Pose", "Bhujangasana"],
+    "Normal": ["Vajrasana", "Cat-Cow Pose", "Warrior Pose"],
+    "Overweight": ["Tadasana", "Balasana", "Anulom Vilom"],
+    "Obesity": ["Utkatasana (gentle)", "Viparita Karani", "Nadi Shodhana"]
+}
+TIPS = {
+    "Underweight": "Add calorie-dense nutritious foods (nuts, dairy, legumes). 3 meals + 2 snacks.",
+    "Normal": "Great balance! Maintain with regular yoga, protein, and 7–8h sleep.",
+    "Overweight": "Prioritize protein & veggies, portion control, daily walks + yoga.",
+    "Obesity": "Start low-impact movement; track intake; consider doctor guidance."
+}
+
+OUTPUT_COLUMNS = ["valid", "bmi", "bmi_cat", "whtr", "whtr_cat", "bmr", "tdee"]
+
+
+def _lookup(values, table, default):
+    """Map an array of keys through a small dict with one vector comparison per key."""
+    out = np.full(values.shape, default, dtype=float)
+    for key, mapped in table.items():
+        out[values == key] = mapped
+    return out
+
+
+def compute_metrics(height_cm, weight_kg, waist_cm, age, sex, activity):
+    """
+    Metrics for a cohort. Numeric inputs are floats (0 or NaN = missing),
+    sex is "male"/"female", activity a key of ACTIVITY_FACTORS (both lowercase).
+    Returns a dict of arrays (see OUTPUT_COLUMNS); rows with valid=False
+    (missing height/weight/age or unknown sex) have NaN metrics and empty categories.
+    """
+    h = np.atleast_1d(np.asarray(height_cm, dtype=float))
+    w = np.atleast_1d(np.asarray(weight_kg, dtype=float))
+    waist = np.atleast_1d(np.asarray(waist_cm, dtype=float))
+    a = np.atleast_1d(np.asarray(age, dtype=float))
+    sex = np.atleast_1d(np.asarray(sex, dtype=str))
+    activity = np.atleast_1d(np.asarray(activity, dtype=str))
+    male = sex == "male"
+    valid = (h > 0) & (w > 0) & (a > 0) & (male | (sex == "female"))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bmi = np.where(valid, w / (h / 100.0) ** 2, np.nan)
+        whtr = np.where(valid & (waist > 0), np.round(waist / h, 2), np.nan)
+
+    bmi_cat = np.where(valid, BMI_CATEGORIES[np.searchsorted(BMI_BOUNDS, np.nan_to_num(bmi), side="right")], "")
+    has_whtr = ~np.isnan(whtr)
+    whtr_cat = np.where(has_whtr, WHTR_CATEGORIES[np.searchsorted(WHTR_BOUNDS, np.nan_to_num(whtr), side="right")], "")
+
+    bmr = np.where(valid, 10 * w + 6.25 * h - 5 * a + np.where(male, 5, -161), np.nan)
+    tdee = bmr * _lookup(activity, ACTIVITY_FACTORS, DEFAULT_ACTIVITY_FACTOR)
+
+    return {
+        "valid": valid,
+        "bmi": np.round(bmi, 1),
+        "bmi_cat": bmi_cat,
+        "whtr": whtr,
+        "whtr_cat": whtr_cat,
+        "bmr": np.rint(bmr),
+        "tdee": np.rint(tdee),
+    }
+
+
+def single_result(height_cm, weight_kg, waist_cm, age, sex, activity):
+    """Result dict for the /bmi page, computed as a one-row cohort."""
+    m = compute_metrics([height_cm], [weight_kg], [waist_cm or 0], [age], [sex], [activity])
+    bmi_cat = str(m["bmi_cat"][0])
+    has_whtr = not np.isnan(m["whtr"][0])
+    return {
+        "bmi": float(m["bmi"][0]),
+        "bmi_cat": bmi_cat,
+        "whtr": float(m["whtr"][0]) if has_whtr else None,
+        "whtr_cat": str(m["whtr_cat"][0]) if has_whtr else None,
+        "bmr": int(m["bmr"][0]),
+        "tdee": int(m["tdee"][0]),
+        "poses": YOGA_SUGGESTIONS[bmi_cat],
+        "tip": TIPS[bmi_cat],
+        "activity": activity
+    }
+
+
+INPUT_COLUMNS = ("height_cm", "weight_kg", "waist_cm", "age", "sex", "activity")
+
+
+def _float_column(values):
+    out = np.empty(len(values), dtype=float)
+    for i, v in enumerate(values):
+        try:
+            out[i] = float(v) if v not in (None, "") else np.nan
+        except (TypeError, ValueError):
+            out[i] = np.nan
+    return out
+
+
+def columns_from_rows(rows):
+    """Column arrays from a list of dicts (JSON rows or csv.DictReader). Raises ValueError for other rows."""
+    rows = list(rows)
+    if not all(isinstance(row, dict) for row in rows):
+        raise ValueError("Each row must be an object with height_cm, weight_kg, ... fields")
+    cols = {}
+    for name in ("height_cm", "weight_kg", "waist_cm", "age"):
+        cols[name] = _float_column([row.get(name) for row in rows])
+    cols["sex"] = np.array([str(row.get("sex") or "male").lower() for row in rows])
+    cols["activity"] = np.array([str(row.get("activity") or "moderate").lower() for row in rows])
+    return cols
+
+
+def columns_from_csv(text):
+    return columns_from_rows(csv.DictReader(io.StringIO(text)))
+
+
+def columns_from_json(data):
+    """Accept {"height_cm": [...], ...} columns or a list of row objects. Raises ValueError for other shapes."""
+    if isinstance(data, list):
+        return columns_from_rows(data)
+    for name, values in data.items():
+        if name in INPUT_COLUMNS and values is not None and not isinstance(values, list):
+            raise ValueError(f"{name} must be a list of values, one per person")
+    n = len(data.get("height_cm") or [])
+    cols = {}
+    for name in ("height_cm", "weight_kg", "waist_cm", "age"):
+        values = data.get(name)
+        cols[name] = _float_column(values if values is not None else [None] * n)
+    cols["sex"] = np.array([str(v).lower() for v in (data.get("sex") or ["male"] * n)])
+    cols["activity"] = np.array([str(v).lower() for v in (data.get("activity") or ["moderate"] * n)])
+    return cols
+
+
+def metrics_to_json(metrics):
+    """Column lists with NaN/empty replaced by None."""
+    out = {}
+    for name in OUTPUT_COLUMNS:
+        column = metrics[name]
+        if column.dtype.kind == "f":
+            values = column.tolist()
+            if name in ("bmr", "tdee"):
+                out[name] = [None if v != v else int(v) for v in values]
+            else:
+                out[name] = [None if v != v else v for v in values]
+        elif column.dtype.kind == "b":
+            out[name] = column.tolist()
+        else:
+            out[name] = [v or None for v in column.tolist()]
+    return out
+
+
+def iter_metrics_csv(metrics, chunk_rows=10000):
+    """Yield the metrics as CSV text, chunk_rows rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(OUTPUT_COLUMNS)
+    n = len(metrics["valid"])
+    for start in range(0, n, chunk_rows):
+        stop = min(start + chunk_rows, n)
+        columns = [metrics[name][start:stop].tolist() for name in OUTPUT_COLUMNS]
+        for valid, bmi, bmi_cat, whtr, whtr_cat, bmr, tdee in zip(*columns):
+            writer.writerow([int(valid),
+                             "" if bmi != bmi else bmi, bmi_cat,
+                             "" if whtr != whtr else whtr, whtr_cat,
+                             "" if bmr != bmr else int(bmr), "" if tdee != tdee else int(tdee)])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if not n:
+        yield buffer.getvalue()
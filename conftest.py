@@ -0,0 +1,68 @@
+"""
+Shared pytest setup.
+Points the app at a throwaway SQLite file before app.py is imported,
+so the test run never touches instance/users.db. Also the helpers the
+test modules share: appointment payloads, logins, admin calls and apps
+on their own database.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_test_db_dir = tempfile.mkdtemp(prefix="healthcare-tests-")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(_test_db_dir, "test.db"))
+os.environ.setdefault("ADMIN_API_TOKEN", "test-admin-token")
+
+# Authorization header for the appointment admin endpoints
+ADMIN_HEADERS = {"Authorization": "Bearer " + os.environ["ADMIN_API_TOKEN"]}
+
+
+def appointment_payload(i="", prefix="patient", **overrides):
+    """A valid /api/save_appointment body; each test module picks its own prefix and overrides."""
+    data = {
+        "name": f"{prefix.title()} Patient {i}".strip(),
+        "email": f"{prefix}{i}@example.com",
+        "phone": "+1234567890",
+        "doctor_type": "General Physician",
+        "issue": "Regular checkup",
+        "appointment_date": "2025-03-01",
+        "appointment_time": "10:00",
+    }
+    data.update(overrides)
+    return data
+
+
+def login(client, email="patient@example.com"):
+    """Log the test client in as email; returns it."""
+    with client.session_transaction() as sess:
+        sess["user"] = email
+    return email
+
+
+def make_app(tmp_path, **config):
+    """A separate app on its own SQLite file in tmp_path; config overrides as for create_app."""
+    from app import create_app
+
+    return create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}", "TESTING": True, **config})
+
+
+def set_status(client, appointment_id, status):
+    """POST /api/appointments/<id>/status with the admin token."""
+    return client.post(f"/api/appointments/{appointment_id}/status", json={"status": status}, headers=ADMIN_HEADERS)
+
+
+@pytest.fixture
+def client():
+    """Flask test client on an emptied appointments table."""
+    from app import app, db
+    from models import Appointment
+
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+        Appointment.query.delete()
+        db.session.commit()
+    with app.test_client() as test_client:
+        yield test_client
@@ -0,0 +1,272 @@
+"""
+Database selection and engine profiles.
+
+DATABASE_URL picks the backend (SQLite file or a server such as PostgreSQL);
+without it the app uses instance/users.db locally and /tmp/users.db on Vercel.
+
+DB_PROFILE picks the tuning:
+  production (default) - SQLite: WAL journal, synchronous=NORMAL, busy timeout,
+                         mmap/cache sizing and a sized connection pool
+                         Server:  sized pool, pre-ping, recycling and a statement timeout
+  default              - SQLAlchemy defaults (rollback journal for SQLite)
+Individual settings can be overridden with the DB_* / SQLITE_* variables below.
+
+Schema: ensure_schema() runs db.create_all() only when the models' DDL
+fingerprint is not yet recorded in the schema_state table, so the DDL runs
+once per deployment (or `flask --app app init-db`) and every later process
+start costs a single SELECT. SCHEMA_AUTO_CREATE=0 skips even that check.
+create_all() leaves existing tables alone, so upgrade_tables() then adds
+the nullable columns, indexes and unique constraints they are missing, and
+rebuilds a unique constraint whose columns changed. Functions in
+column_backfills fill new columns of existing rows before unique indexes are
+built on them. A unique constraint that existing rows violate is listed in
+unenforced_constraints (callers fall back to checking in code) and the
+fingerprint is not recorded until it can be built.
+"""
+
+import hashlib
+import importlib.util
+import os
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import UniqueConstraint, event, inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+logger = logging.getLogger(__name__)
+
+# Names of model unique constraints missing from the database because existing rows violate them
+unenforced_constraints = set()
+# fn(conn) run by upgrade_tables() after adding columns, before building unique indexes (see slots.py)
+column_backfills = []
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def sqlite_pragmas():
+    """PRAGMAs run on every new SQLite connection in the production profile."""
+    return {
+        "journal_mode": "WAL",
+        # Safe with WAL: a crash can lose the last commits but never corrupts the file
+        "synchronous": "NORMAL",
+        # Wait for a writer lock instead of failing with "database is locked"
+        "busy_timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+        "mmap_size": _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+        # Negative values are KiB
+        "cache_size": -_env_int("SQLITE_CACHE_SIZE_KB", 64 * 1024),
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+    }
+
+
+def pool_options():
+    return {
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+    }
+
+
+def server_options(uri):
+    """Engine options for a server-backed database (PostgreSQL, MySQL)."""
+    options = dict(pool_options(),
+                   pool_pre_ping=True,
+                   pool_recycle=_env_int("DB_POOL_RECYCLE", 1800))
+    if uri.startswith("postgresql"):
+        timeout_ms = _env_int("DB_STATEMENT_TIMEOUT_MS", 15000)
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={timeout_ms}",
+            "connect_timeout": _env_int("DB_CONNECT_TIMEOUT", 10),
+        }
+    return options
+
+
+def postgres_driver():
+    """psycopg2 if installed, else psycopg 3 (SQLAlchemy's default differs between versions)."""
+    if importlib.util.find_spec("psycopg2"):
+        return "psycopg2"
+    return "psycopg"
+
+
+def resolve_database_uri(instance_path):
+    """DATABASE_URL if set, otherwise the SQLite file for this environment."""
+    url = os.environ.get("DATABASE_URL")
+    if url:
+        # Heroku/Vercel Postgres hand out postgres://, which SQLAlchemy no longer accepts
+        if url.startswith("postgres://"):
+            url = "postgresql://" + url[len("postgres://"):]
+        if url.startswith("postgresql://"):
+            url = f"postgresql+{postgres_driver()}://" + url[len("postgresql://"):]
+        return url
+    if os.environ.get("VERCEL"):
+        logger.warning("DATABASE_URL is not set; using /tmp/users.db, which is lost on every cold start")
+        return "sqlite:////tmp/users.db"
+    return f"sqlite:///{os.path.join(instance_path, 'users.db')}"
+
+
+def is_file_sqlite(uri):
+    return uri.startswith("sqlite") and ":memory:" not in uri and uri.rstrip("/") != "sqlite:"
+
+
+def configure_database(app, db):
+    """Apply the selected profile to app's config and initialise db on it."""
+    profile = os.environ.get("DB_PROFILE", "production").lower()
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    app.config["DB_PROFILE"] = profile
+
+    tuned = profile == "production" and is_file_sqlite(uri)
+    if tuned:
+        app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {}).update(pool_options())
+    elif profile == "production" and not uri.startswith("sqlite"):
+        app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {}).update(server_options(uri))
+
+    db.init_app(app)
+
+    if tuned:
+        pragmas = sqlite_pragmas()
+        with app.app_context():
+            event.listen(db.engine, "connect", lambda conn, record: apply_pragmas(conn, pragmas))
+        logger.info(f"Database profile '{profile}': {pragmas}")
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def upsert_insert(session):
+    """insert() with on_conflict_do_update() for the session's backend (SQLite or PostgreSQL)."""
+    return postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+
+def schema_fingerprint(metadata, dialect):
+    """Hash of the CREATE TABLE / CREATE INDEX statements for every model table."""
+    ddl = []
+    for table in metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        ddl.extend(str(CreateIndex(index).compile(dialect=dialect))
+                   for index in sorted(table.indexes, key=lambda index: index.name))
+    return hashlib.sha256("\n".join(ddl).encode("utf-8")).hexdigest()[:32]
+
+
+def ensure_schema(db):
+    """
+    Create missing tables unless this schema's fingerprint is already recorded.
+    Returns True when create_all() ran. Needs an app context.
+    """
+    fingerprint = schema_fingerprint(db.metadata, db.engine.dialect)
+    with db.engine.connect() as conn:
+        try:
+            if conn.execute(text("SELECT 1 FROM schema_state WHERE fingerprint = :f"),
+                            {"f": fingerprint}).first():
+                return False
+        except DBAPIError:
+            # No schema_state table yet: a fresh database
+            conn.rollback()
+
+    db.create_all()
+    with db.engine.begin() as conn:
+        missing = upgrade_tables(db.metadata, conn, column_backfills)
+    unenforced_constraints.clear()
+    unenforced_constraints.update(missing)
+    if missing:
+        logger.error(f"Unique constraints not enforced, existing rows violate them: {', '.join(sorted(missing))}")
+        return True
+
+    with db.engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS schema_state "
+                          "(fingerprint VARCHAR(64) PRIMARY KEY, created_at VARCHAR(32) NOT NULL)"))
+        if not conn.execute(text("SELECT 1 FROM schema_state WHERE fingerprint = :f"),
+                            {"f": fingerprint}).first():
+            conn.execute(text("INSERT INTO schema_state (fingerprint, created_at) VALUES (:f, :t)"),
+                         {"f": fingerprint, "t": datetime.utcnow().isoformat()})
+    logger.info(f"Database schema {fingerprint} created")
+    return True
+
+
+def upgrade_tables(metadata, conn, backfills=()):
+    """
+    Add to existing tables the nullable columns, indexes and unique constraints (as unique
+    indexes) of their models, calling each of backfills with conn once the columns exist.
+    Returns the names of the unique constraints that could not be built.
+    """
+    inspector = inspect(conn)
+    quote = conn.dialect.identifier_preparer.quote
+    existing = set(inspector.get_table_names())
+    tables = [table for table in metadata.sorted_tables if table.name in existing]
+    for table in tables:
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns and column.nullable and not column.primary_key:
+                conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} "
+                                  f"{column.type.compile(dialect=conn.dialect)}"))
+                logger.info(f"Added column {table.name}.{column.name}")
+    for backfill in backfills:
+        backfill(conn)
+
+    failed = set()
+    for table in tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+        unique = {tuple(found["column_names"]) for found in inspector.get_unique_constraints(table.name)}
+        unique |= {tuple(found["column_names"]) for found in inspector.get_indexes(table.name) if found["unique"]}
+        for constraint in table.constraints:
+            if not isinstance(constraint, UniqueConstraint):
+                continue
+            names = tuple(column.name for column in constraint.columns)
+            if names in unique:
+                continue
+            try:
+                # Dropping the old version goes back too if the new one cannot be built
+                with conn.begin_nested():
+                    _drop_unique(conn, inspector, table.name, constraint.name)
+                    conn.execute(text(f"CREATE UNIQUE INDEX {quote(constraint.name)} ON {quote(table.name)} "
+                                      f"({', '.join(quote(name) for name in names)})"))
+                logger.info(f"Created unique index {constraint.name}")
+            except IntegrityError:
+                failed.add(constraint.name)
+    return failed
+
+
+def _drop_unique(conn, inspector, table_name, name):
+    """Drop the unique constraint or index called name, left from when it covered other columns."""
+    quote = conn.dialect.identifier_preparer.quote
+    # SQLite cannot drop a constraint declared in CREATE TABLE; its name does not clash with an index
+    if conn.dialect.name != "sqlite" and \
+            any(found["name"] == name for found in inspector.get_unique_constraints(table_name)):
+        conn.execute(text(f"ALTER TABLE {quote(table_name)} DROP CONSTRAINT {quote(name)}"))
+    elif any(found["name"] == name for found in inspector.get_indexes(table_name)):
+        conn.execute(text(f"DROP INDEX {quote(name)}"))
+
+
+def install_schema_check(app, db):
+    """Run ensure_schema() before the first request this process serves (unless SCHEMA_AUTO_CREATE=0)."""
+    if os.environ.get("SCHEMA_AUTO_CREATE", "1") != "1":
+        return
+    state = {"ready": False}
+    lock = threading.Lock()
+
+    @app.before_request
+    def _ensure_schema_once():
+        if state["ready"]:
+            return
+        with lock:
+            if not state["ready"]:
+                try:
+                    ensure_schema(db)
+                except DBAPIError as e:
+                    # Another process may be creating the same tables; the next request retries
+                    logger.error(f"Schema check failed: {e}")
+                    return
+                state["ready"] = True
@@ -0,0 +1,201 @@
+"""
+Typo-tolerant search over condition names and synonyms.
+
+FuzzyIndex keeps a posting list (NumPy array of term ids) per trigram of
+"  term ". One edit (insert, delete, substitute, swap adjacent letters)
+touches at most 4 trigrams, so a term within k edits of the query shares at
+least max(|grams(query)|, |grams(term)|) - 4k trigrams with it. A query
+counts shared trigrams for every term in one np.bincount over its postings,
+applies that bound and a length filter, and runs the bounded edit distance
+only on the survivors. Results are ranked by edit distance, then by shared
+trigrams.
+
+conditions_index covers the knowledge base (diseases and aliases, yoga
+conditions and synonyms, symptoms and symptom conditions) and is built once
+at import.
+"""
+
+import numpy as np
+
+from knowledge_base import kb, normalize
+
+
+# Everyday words within one edit of a condition name, and frequent words that
+# fill free text; none of them is taken for a misspelt condition
+COMMON_WORDS = frozenset("""
+    about after again also always another around because been before being
+    between both came come could does doing done down during each even ever
+    every feel feeling felt from going gone good have having here hold into
+    just keep know last like little long made make many might more most much
+    must need never next night none nothing often only other over please
+    quite really right same seems should since some something sometimes still
+    such take than that their them then there these they thing think this
+    those though through today told tomorrow tonight took under until very
+    want week well were what when where which while will with without would
+    year yesterday your
+    cola couch dough fewer gold lever mention pension rough sever tough
+""".split())
+
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def default_max_distance(length):
+    """Edits tolerated for a query of this length: none below 5 letters, 2 from 10 letters on."""
+    if length < 5:
+        return 0
+    return 1 if length < 10 else 2
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance, or limit + 1 once it is certain to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        ca = a[i - 1]
+        for j in range(1, len(b) + 1):
+            cost = 0 if ca == b[j - 1] else 1
+            value = min(prev[j] + 1, current[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, prev2[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        prev2, prev = prev, current
+    return prev[-1] if prev[-1] <= limit else limit + 1
+
+
+class FuzzyIndex:
+    def __init__(self, terms):
+        """terms: mapping of term -> payload (any object); terms are normalized on the way in."""
+        self.terms = []
+        self.payloads = []
+        self._exact = {}
+        postings = {}
+        for term, payload in terms.items():
+            term = normalize(term)
+            if not term or term in self._exact:
+                continue
+            tid = len(self.terms)
+            self.terms.append(term)
+            self.payloads.append(payload)
+            self._exact[term] = tid
+            for gram in trigrams(term):
+                postings.setdefault(gram, []).append(tid)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._lengths = np.array([len(term) for term in self.terms], dtype=np.int32)
+        self._gram_counts = np.array([len(trigrams(term)) for term in self.terms], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def search(self, query, limit=5, max_distance=None):
+        """[(term, payload, distance)] for the closest terms, best first."""
+        query = normalize(query)
+        if not query or not self.terms:
+            return []
+        if max_distance is None:
+            max_distance = 0 if query in COMMON_WORDS else default_max_distance(len(query))
+        exact = self._exact.get(query)
+        if max_distance == 0:
+            return [(query, self.payloads[exact], 0)] if exact is not None else []
+
+        grams = trigrams(query)
+        lists = [self._postings[g] for g in grams if g in self._postings]
+        if lists:
+            shared = np.bincount(np.concatenate(lists), minlength=len(self.terms))
+        else:
+            shared = np.zeros(len(self.terms), dtype=np.int64)
+        slack = 4 * max_distance
+        if len(grams) - slack > 0:
+            # Cheap first cut on the query side of the bound, then the full bound on the survivors
+            candidates = np.flatnonzero(shared >= len(grams) - slack)
+        else:
+            # So short a query may share no trigram at all with a match
+            candidates = np.arange(len(self.terms))
+        counts = shared[candidates]
+        keep = ((counts >= np.maximum(self._gram_counts[candidates], len(grams)) - slack)
+                & (np.abs(self._lengths[candidates] - len(query)) <= max_distance))
+
+        terms = self.terms
+        results = []
+        for tid, count in zip(candidates[keep].tolist(), counts[keep].tolist()):
+            distance = edit_distance(query, terms[tid], max_distance)
+            if distance <= max_distance:
+                results.append((distance, -count, terms[tid], tid))
+        results.sort()
+        return [(term, self.payloads[tid], distance) for distance, _, term, tid in results[:limit]]
+
+    def best(self, query, accept=None, max_distance=None):
+        """Closest (term, payload, distance) whose payload passes accept(payload), or None."""
+        for match in self.search(query, limit=10, max_distance=max_distance):
+            if accept is None or accept(match[1]):
+                return match
+        return None
+
+
+def build_conditions_index(knowledge_base=kb):
+    """term -> frozenset of (kind, key) targets, kind in disease / yoga / symptom / condition."""
+    targets = {}
+
+    def add(term, kind, key):
+        targets.setdefault(normalize(term), set()).add((kind, key))
+
+    for disease in knowledge_base.diseases.values():
+        for term in (disease.key, *disease.aliases):
+            add(term, "disease", disease.key)
+    for condition in knowledge_base.yoga.conditions:
+        add(condition, "yoga", condition)
+    for word, condition in knowledge_base.yoga.synonyms.items():
+        add(word, "yoga", condition)
+    for symptom, entries in knowledge_base.symptoms.conditions.items():
+        add(symptom.replace("_", " "), "symptom", symptom)
+        for entry in entries:
+            name = entry if isinstance(entry, str) else entry[0]
+            add(name, "condition", name)
+    return FuzzyIndex({term: frozenset(kinds) for term, kinds in targets.items()})
+
+
+conditions_index = build_conditions_index()
+
+
+def kind_filter(kind):
+    return lambda payload: any(k == kind for k, _ in payload)
+
+
+def target_key(payload, kind):
+    return next(key for k, key in payload if k == kind)
+
+
+def closest_disease(text):
+    """(matched term, disease key) for a misspelt disease name, or None."""
+    match = conditions_index.best(text, accept=kind_filter("disease"))
+    return (match[0], target_key(match[1], "disease")) if match else None
+
+
+def closest_yoga_conditions(text, min_word_length=5):
+    """
+    Yoga conditions named in free text with typos. Words (and word pairs)
+    shorter than min_word_length, common words and pairs of them are skipped
+    so everyday words do not fuzzy-match a condition.
+    """
+    words = normalize(text).split()
+    pairs = [pair for pair in zip(words, words[1:]) if not all(word in COMMON_WORDS for word in pair)]
+    phrases = [" ".join(pair) for pair in pairs] + [word for word in words if word not in COMMON_WORDS]
+    found = []
+    for phrase in phrases:
+        if len(phrase) < min_word_length:
+            continue
+        match = conditions_index.best(phrase, accept=kind_filter("yoga"))
+        if match:
+            condition = target_key(match[1], "yoga")
+            if condition not in found:
+                found.append(condition)
+    return found
@@ -0,0 +1,232 @@
+"""
+Idempotency-Key support for retried POSTs (Make.com retries on timeouts).
+
+A request carrying an Idempotency-Key header is run at most once per key and
+endpoint; the response it produced is replayed for every retry:
+  1. A per-process LRU of finished responses answers most retries without a
+     database round trip, validation or a look at the appointments table.
+  2. Otherwise the first request claims the key by inserting its row in
+     idempotency_keys (primary key (scope, key)), so of two retries racing
+     each other exactly one wins. The loser polls the row until the winner
+     has stored its response (IDEMPOTENCY_WAIT seconds), then replays it,
+     or answers 409 if the winner is still running.
+  3. Responses below 500 are stored; on a 5xx or an exception the claim is
+     released so the next retry runs the request again.
+
+Reusing a key with a different body is a client bug and gets a 422. Claims
+left behind by a crashed worker are taken over after IDEMPOTENCY_LOCK_TIMEOUT
+seconds; stored responses expire after IDEMPOTENCY_TTL seconds.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, jsonify, request
+from sqlalchemy.exc import IntegrityError
+
+from models import db, IdempotencyKey
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", str(24 * 3600)))
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", "10000"))
+IDEMPOTENCY_WAIT = float(os.environ.get("IDEMPOTENCY_WAIT", "5"))
+IDEMPOTENCY_LOCK_TIMEOUT = float(os.environ.get("IDEMPOTENCY_LOCK_TIMEOUT", "60"))
+
+
+class KeyReused(Exception):
+    """The key was first used with a different request body."""
+
+
+class KeyInProgress(Exception):
+    """Another request holding the key has not finished within the wait."""
+
+
+class IdempotencyStore:
+    def __init__(self, ttl=IDEMPOTENCY_TTL, max_entries=IDEMPOTENCY_CACHE_SIZE, wait=IDEMPOTENCY_WAIT,
+                 lock_timeout=IDEMPOTENCY_LOCK_TIMEOUT, poll_interval=0.02, sweep_interval=60):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait = wait
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.sweep_interval = sweep_interval
+        self._responses = OrderedDict()  # (scope, key) -> (fingerprint, status, body, expires)
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self.hits = 0
+
+    # ---- per-process LRU of finished responses ----
+
+    def cached(self, scope, key, fingerprint):
+        """(status, body) from the LRU, or None. Raises KeyReused on a fingerprint mismatch."""
+        with self._lock:
+            entry = self._responses.get((scope, key))
+            if entry is None:
+                return None
+            if entry[3] <= time.time():
+                del self._responses[(scope, key)]
+                return None
+            self._responses.move_to_end((scope, key))
+            self.hits += 1
+        if entry[0] != fingerprint:
+            raise KeyReused()
+        return entry[1], entry[2]
+
+    def _remember(self, scope, key, fingerprint, status, body, created_at):
+        with self._lock:
+            self._responses[(scope, key)] = (fingerprint, status, body, created_at + self.ttl)
+            self._responses.move_to_end((scope, key))
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+    def __len__(self):
+        return len(self._responses)
+
+    # ---- claims in idempotency_keys ----
+
+    def claim(self, scope, key, fingerprint):
+        """
+        Claim the key for this request. Returns None when the caller should run
+        the request, or the stored (status, body) when it already ran.
+        Raises KeyReused or KeyInProgress.
+        """
+        now = time.time()
+        if now - self._last_sweep > self.sweep_interval:
+            self.sweep()
+        deadline = now + self.wait
+        while True:
+            if self._insert(scope, key, fingerprint):
+                return None
+            row = self._row(scope, key)
+            if row is None:
+                continue  # released or swept in between; try the insert again
+            now = time.time()
+            expired = row.created_at <= now - self.ttl
+            abandoned = row.status_code is None and row.created_at <= now - self.lock_timeout
+            if expired or abandoned:
+                if self._take_over(scope, key, fingerprint, row.created_at):
+                    return None
+                continue
+            if row.fingerprint != fingerprint:
+                raise KeyReused()
+            if row.status_code is not None:
+                self._remember(scope, key, row.fingerprint, row.status_code, row.body, row.created_at)
+                return row.status_code, row.body
+            if now >= deadline:
+                raise KeyInProgress()
+            time.sleep(self.poll_interval)
+
+    def complete(self, scope, key, fingerprint, status, body):
+        """Store the response of a claimed request."""
+        db.session.execute(
+            db.update(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            .values(status_code=status, body=body)
+        )
+        db.session.commit()
+        self._remember(scope, key, fingerprint, status, body, time.time())
+
+    def release(self, scope, key):
+        """Drop an unfinished claim so that the next retry runs the request again."""
+        db.session.rollback()
+        db.session.execute(
+            db.delete(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None))
+        )
+        db.session.commit()
+
+    def sweep(self):
+        """Delete expired rows; returns how many were removed."""
+        self._last_sweep = time.time()
+        removed = db.session.execute(
+            db.delete(IdempotencyKey).where(IdempotencyKey.created_at <= self._last_sweep - self.ttl)
+        ).rowcount
+        db.session.commit()
+        return removed
+
+    def _insert(self, scope, key, fingerprint):
+        try:
+            db.session.execute(db.insert(IdempotencyKey).values(
+                scope=scope, key=key, fingerprint=fingerprint, created_at=time.time()))
+            db.session.commit()
+            return True
+        except IntegrityError:
+            db.session.rollback()
+            return False
+
+    def _row(self, scope, key):
+        row = db.session.execute(
+            db.select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.body,
+                      IdempotencyKey.created_at)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        ).first()
+        db.session.rollback()  # end the read so the next poll sees the winner's commit
+        return row
+
+    def _take_over(self, scope, key, fingerprint, created_at):
+        """Reclaim an expired or abandoned row; only one of several contenders succeeds."""
+        taken = db.session.execute(
+            db.update(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key,
+                   IdempotencyKey.created_at == created_at)
+            .values(fingerprint=fingerprint, status_code=None, body=None, created_at=time.time())
+        ).rowcount
+        db.session.commit()
+        return taken == 1
+
+
+def _error(message, status):
+    return jsonify({"status": "error", "message": message}), status
+
+
+def _replay(status, body):
+    response = Response(body, status=status, mimetype="application/json")
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def idempotent(view):
+    """Honour an Idempotency-Key header on a JSON view (see the module docstring)."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return _error(f"{HEADER} must be 1-{MAX_KEY_LENGTH} characters", 400)
+
+        store = current_app.extensions["idempotency"]
+        scope = request.endpoint
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        try:
+            stored = store.cached(scope, key, fingerprint) or store.claim(scope, key, fingerprint)
+        except KeyReused:
+            return _error(f"{HEADER} was already used with a different request body", 422)
+        except KeyInProgress:
+            response, status = _error(f"A request with this {HEADER} is still being processed", 409)
+            response.headers["Retry-After"] = "1"
+            return response, status
+        if stored is not None:
+            return _replay(*stored)
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            store.release(scope, key)
+            raise
+        if response.status_code >= 500:
+            store.release(scope, key)
+        else:
+            store.complete(scope, key, fingerprint, response.status_code, response.get_data(as_text=True))
+        return response
+    return wrapper
@@ -0,0 +1,273 @@
+"""
+Durable ingestion queue for appointment webhooks (async mode of /api/save_appointment).
+
+The request handler validates the payload, appends it to a local SQLite
+file (separate from the main database, so the caller never waits on its
+locks) and answers 202 with a ticket id. A pool of worker threads claims
+queued tickets in batches and hands each batch to process(payloads), which
+runs the duplicate check and the inserts in one transaction of the main
+database, then records every ticket's outcome for GET .../ingest/<ticket>.
+
+Ticket states: queued -> processing -> saved | duplicate | error.
+Tickets survive restarts: a "processing" ticket whose worker has not
+finished it within INGEST_LEASE seconds (a crashed process) goes back to
+"queued". A batch that raises is retried up to INGEST_MAX_ATTEMPTS times. If a worker dies between the main commit and
+recording the outcome, the retried batch finds its own rows and its tickets
+end up "duplicate" rather than being inserted twice. Finished tickets are
+deleted after INGEST_TICKET_TTL seconds.
+
+Config: INGEST_QUEUE_PATH (default: ingest_queue.db next to the SQLite
+database, else in the instance folder), INGEST_WORKERS, INGEST_BATCH_SIZE,
+INGEST_POLL_MS (how often idle workers look for tickets queued by other
+processes), INGEST_QUEUE_SYNCHRONOUS (SQLite synchronous pragma for the
+queue file).
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy.engine import make_url
+
+from database import is_file_sqlite
+
+logger = logging.getLogger(__name__)
+
+QUEUED, PROCESSING, SAVED, DUPLICATE, ERROR = "queued", "processing", "saved", "duplicate", "error"
+FINISHED = (SAVED, DUPLICATE, ERROR)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    appointment_id INTEGER,
+    message TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_tickets_state_seq ON tickets (state, seq);
+"""
+
+
+class IngestQueue:
+    def __init__(self, app, path, process, workers=2, batch_size=200, poll_ms=500, max_attempts=5,
+                 lease=300, ticket_ttl=7 * 24 * 3600, synchronous="NORMAL"):
+        self.app = app
+        self.path = path
+        self.process = process
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_ms / 1000.0
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.ticket_ttl = ticket_ttl
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._queued_hint = 0  # tickets this process queued and no worker has picked up yet
+        self._threads = []
+        self._closed = False
+        self._last_sweep = 0.0
+        self._stats = {"enqueued": 0, "saved": 0, "duplicate": 0, "error": 0, "batches": 0, "retries": 0,
+                       "last_batch_size": 0, "last_batch_ms": 0.0}
+        atexit.register(self.close)
+
+    # ---- request side ----
+
+    def enqueue(self, payload):
+        """Durably queue one payload; returns its ticket id."""
+        ticket = uuid.uuid4().hex
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO tickets (id, payload, state, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (ticket, json.dumps(payload), QUEUED, now, now))
+        self.start()
+        with self._wakeup:
+            self._stats["enqueued"] += 1
+            self._queued_hint += 1
+            self._wakeup.notify()
+        return ticket
+
+    def status(self, ticket):
+        """The ticket's state and outcome, or None for an unknown (or expired) ticket."""
+        self.start()  # someone is waiting on the queue: make sure tickets from a previous run get drained
+        row = self._connection().execute(
+            "SELECT id, state, attempts, appointment_id, message, created_at, updated_at FROM tickets WHERE id = ?",
+            (ticket,)).fetchone()
+        if row is None:
+            return None
+        return {"ticket": row[0], "state": row[1], "attempts": row[2], "appointment_id": row[3],
+                "message": row[4], "created_at": row[5], "updated_at": row[6]}
+
+    def metrics(self):
+        counts = dict(self._connection().execute("SELECT state, COUNT(*) FROM tickets GROUP BY state").fetchall())
+        with self._lock:
+            stats = dict(self._stats)
+        stats["last_batch_ms"] = round(stats["last_batch_ms"], 2)
+        stats["workers"] = len(self._threads)
+        stats["tickets"] = {state: counts.get(state, 0) for state in (QUEUED, PROCESSING) + FINISHED}
+        return stats
+
+    def wait_idle(self, timeout=10):
+        """Block until no ticket is queued or processing. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            pending = self._connection().execute(
+                "SELECT COUNT(*) FROM tickets WHERE state IN (?, ?)", (QUEUED, PROCESSING)).fetchone()[0]
+            if not pending:
+                return True
+            time.sleep(0.01)
+        return False
+
+    # ---- worker pool ----
+
+    def start(self):
+        """Start the worker pool (once); tickets left by a previous run are picked up too."""
+        if self._threads or self._closed:
+            return
+        with self._lock:
+            if self._threads or self._closed:
+                return
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"ingest-worker-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def close(self, timeout=10):
+        """Stop the workers after their current batch; queued tickets stay for the next start."""
+        if self._closed:
+            return
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        while not self._closed:
+            try:
+                batch = self._claim()
+            except sqlite3.Error:
+                logger.exception("Could not claim ingest tickets")
+                batch = []
+            if batch:
+                self._handle(batch)
+                continue
+            with self._wakeup:
+                if not self._closed and self._queued_hint <= 0:
+                    self._wakeup.wait(self.poll_interval)
+                self._queued_hint = 0
+            self._maybe_sweep()
+
+    def _claim(self):
+        """Atomically move up to batch_size queued tickets to processing; returns [(seq, payload, attempts)]."""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "UPDATE tickets SET state = ?, attempts = attempts + 1, updated_at = ? WHERE seq IN "
+                "(SELECT seq FROM tickets WHERE state = ? ORDER BY seq LIMIT ?) RETURNING seq, payload, attempts",
+                (PROCESSING, time.time(), QUEUED, self.batch_size)).fetchall()
+        rows.sort()
+        return rows
+
+    def _handle(self, batch):
+        started = time.perf_counter()
+        try:
+            with self.app.app_context():
+                results = self.process([json.loads(payload) for _, payload, _ in batch])
+        except Exception as e:
+            logger.exception("Ingest batch of %d tickets failed", len(batch))
+            now = time.time()
+            retry = [(QUEUED, seq) for seq, _, attempts in batch if attempts < self.max_attempts]
+            give_up = [(ERROR, f"Could not save the appointment: {e}", now, seq)
+                       for seq, _, attempts in batch if attempts >= self.max_attempts]
+            with self._transaction() as conn:
+                conn.executemany("UPDATE tickets SET state = ? WHERE seq = ?", retry)
+                conn.executemany("UPDATE tickets SET state = ?, message = ?, updated_at = ? WHERE seq = ?", give_up)
+            with self._lock:
+                self._stats["retries"] += len(retry)
+                self._stats["error"] += len(give_up)
+            if retry:
+                time.sleep(self.poll_interval)  # back off before the batch is claimed again
+            return
+
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE tickets SET state = ?, appointment_id = ?, message = ?, updated_at = ? WHERE seq = ?",
+                [(result["state"], result.get("appointment_id"), result.get("message"), now, seq)
+                 for (seq, _, _), result in zip(batch, results)])
+        with self._lock:
+            for result in results:
+                self._stats[result["state"]] += 1
+            self._stats["batches"] += 1
+            self._stats["last_batch_size"] = len(batch)
+            self._stats["last_batch_ms"] = (time.perf_counter() - started) * 1000
+
+    def _maybe_sweep(self):
+        """Requeue tickets whose lease ran out and delete expired finished ones, at most once a minute."""
+        now = time.time()
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        with self._transaction() as conn:
+            conn.execute("UPDATE tickets SET state = ? WHERE state = ? AND updated_at <= ?",
+                         (QUEUED, PROCESSING, now - self.lease))
+            conn.execute("DELETE FROM tickets WHERE state IN (?, ?, ?) AND updated_at <= ?",
+                         FINISHED + (now - self.ticket_ttl,))
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _connection(self):
+        """One connection per thread, in autocommit mode (transactions are explicit)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+
+def default_queue_path(app):
+    """ingest_queue.db next to a SQLite database, otherwise in the instance folder (/tmp on Vercel)."""
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    if is_file_sqlite(uri):
+        folder = os.path.dirname(os.path.abspath(make_url(uri).database))
+    else:
+        folder = "/tmp" if os.environ.get("VERCEL") else app.instance_path
+    return os.path.join(folder, "ingest_queue.db")
+
+
+def create_ingest_queue(app, process):
+    return IngestQueue(
+        app,
+        os.environ.get("INGEST_QUEUE_PATH") or default_queue_path(app),
+        process,
+        workers=int(os.environ.get("INGEST_WORKERS", "2")),
+        batch_size=int(os.environ.get("INGEST_BATCH_SIZE", "200")),
+        poll_ms=int(os.environ.get("INGEST_POLL_MS", "500")),
+        max_attempts=int(os.environ.get("INGEST_MAX_ATTEMPTS", "5")),
+        lease=int(os.environ.get("INGEST_LEASE", "300")),
+        synchronous=os.environ.get("INGEST_QUEUE_SYNCHRONOUS", "NORMAL"),
+    )
@@ -4,6 +4,8 @@ Simple Database Initialization Script
 Creates all tables with the simplified schema and adds sample data
 """
 
+import appointment_stats
+import slots
 from app import app, db
 from models import User, Appointment
 from datetime import datetime, timedelta
@@ -57,6 +59,10 @@ def init_database():
         
         # Commit all changes
         db.session.commit()
+
+        # Fill slot_minute, slot_bookings and appointment_counts for the sample data
+        slots.rebuild()
+        appointment_stats.check(repair=True)
         
         print("Sample data created successfully!")
         print("\nSample Login Credentials:")
@@ -0,0 +1,269 @@
+"""
+Health knowledge base: remedies, medicines, yoga poses and symptom data.
+
+The content lives in a versioned JSON file (data/knowledge_base.json, or the
+path in KNOWLEDGE_BASE_PATH) so it can be updated without touching code.
+refresh_if_changed() loads a new KnowledgeBase when the file changes and swaps
+it into kb in one assignment, so a request sees either the old content or the
+new, never a mix; remedy, medicine and pose lookups follow immediately, while
+the symptom index, yoga matcher and fuzzy index are built at import and follow
+on restart.
+kb reads the file on first use rather than at import. Each load is compiled
+into frozen, slotted records plus alias indexes, so a lookup is one
+normalisation and one dict probe:
+
+    kb.allopathic("Lower back pain")  -> Remedy for "back pain"
+    kb.medicine("Acetaminophen")      -> Medicine "paracetamol"
+    kb.pose("Padmasana (Lotus Pose)") -> Pose "Padmasana"
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, asdict
+from types import MappingProxyType
+from typing import Optional
+
+from lazy import LazyObject
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+# Seconds between checks of the data file's mtime and size in refresh_if_changed()
+CHECK_INTERVAL = float(os.environ.get("KNOWLEDGE_BASE_CHECK_INTERVAL", "30"))
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "knowledge_base.json")
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize(text):
+    """Lowercase, with punctuation and repeated whitespace collapsed to single spaces."""
+    return _NON_WORD.sub(" ", (text or "").lower()).strip()
+
+
+@dataclass(frozen=True, slots=True)
+class Remedy:
+    text: str
+    medicine: Optional[str] = None  # key into KnowledgeBase.medicines
+
+
+@dataclass(frozen=True, slots=True)
+class Disease:
+    key: str
+    aliases: tuple
+    allopathic: Optional[Remedy]
+    ayurvedic: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class Medicine:
+    key: str
+    name: str
+    generic_name: str
+    image: str
+    type: str
+    dosage: str
+    max_daily: str
+    uses: tuple
+    side_effects: tuple
+    precautions: tuple
+    aliases: tuple = ()
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class Pose:
+    key: str
+    name: str
+    image: str
+    video: str
+    duration: str
+    difficulty: str
+    benefits: tuple
+    steps: tuple
+    precautions: str
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class SymptomData:
+    conditions: MappingProxyType   # symptom -> tuple of condition names or (name, weight) pairs
+    specialists: MappingProxyType  # condition -> specialist
+    urgent: frozenset
+    home_care: MappingProxyType    # symptom -> tip, in display order
+    default_home_care: str
+    default_specialist: str
+
+
+@dataclass(frozen=True, slots=True)
+class YogaData:
+    conditions: MappingProxyType   # condition -> tuple of pose names, best first
+    synonyms: MappingProxyType     # extra keyword -> condition
+    default_poses: tuple
+
+
+def _freeze(value):
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+class KnowledgeBase:
+    __slots__ = ("version", "fingerprint", "diseases", "medicines", "poses", "symptoms", "yoga",
+                 "_disease_index", "_medicine_index", "_pose_index",
+                 "source", "_stat", "_next_check")
+
+    def __init__(self, data, source=None):
+        self.source = source
+        self._stat = _file_stat(source) if source else None
+        self._next_check = 0.0
+        if data.get("schema") != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported knowledge base schema {data.get('schema')!r} (expected {SCHEMA_VERSION})")
+        self.version = str(data["version"])
+        # Changes with the content even when an edit forgets to bump "version"
+        self.fingerprint = hashlib.sha1(
+            json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:12]
+
+        self.medicines = MappingProxyType({
+            key: Medicine(key=key, **{k: _freeze(v) for k, v in fields.items()})
+            for key, fields in data.get("medicines", {}).items()
+        })
+        self.poses = MappingProxyType({
+            key: Pose(key=key, **{k: _freeze(v) for k, v in fields.items()})
+            for key, fields in data.get("poses", {}).items()
+        })
+
+        diseases = {}
+        for key, fields in data.get("diseases", {}).items():
+            allopathic = fields.get("allopathic")
+            if allopathic and allopathic.get("medicine") not in (None, *self.medicines):
+                raise ValueError(f"Disease '{key}' refers to unknown medicine '{allopathic['medicine']}'")
+            diseases[key] = Disease(key=key, aliases=tuple(fields.get("aliases", ())),
+                                    allopathic=Remedy(**allopathic) if allopathic else None,
+                                    ayurvedic=fields.get("ayurvedic"))
+        self.diseases = MappingProxyType(diseases)
+
+        symptoms = data.get("symptoms", {})
+        self.symptoms = SymptomData(
+            conditions=_freeze(symptoms.get("conditions", {})),
+            specialists=_freeze(symptoms.get("specialists", {})),
+            urgent=frozenset(symptoms.get("urgent", ())),
+            home_care=_freeze(symptoms.get("home_care", {})),
+            default_home_care=symptoms.get("default_home_care", ""),
+            default_specialist=symptoms.get("default_specialist", ""),
+        )
+        yoga = data.get("yoga", {})
+        self.yoga = YogaData(
+            conditions=_freeze(yoga.get("conditions", {})),
+            synonyms=_freeze(yoga.get("synonyms", {})),
+            default_poses=tuple(yoga.get("default_poses", ())),
+        )
+
+        self._disease_index = self._build_index((d.key, (d.key, *d.aliases)) for d in diseases.values())
+        self._medicine_index = self._build_index(
+            (m.key, (m.key, m.name, m.generic_name, *m.aliases)) for m in self.medicines.values())
+        # "Padmasana (Lotus Pose)" is reachable as the key, the full name and the English name
+        self._pose_index = self._build_index(
+            (p.key, (p.key, p.name, p.name.split("(")[0], *re.findall(r"\(([^)]*)\)", p.name)))
+            for p in self.poses.values())
+
+    @staticmethod
+    def _build_index(entries):
+        """
+        name -> key for every name as written and normalized; the first entry
+        to claim a name keeps it. Names spelled as in the data skip normalize().
+        """
+        index = {}
+        for key, names in entries:
+            for name in names:
+                index.setdefault(name, key)
+                index.setdefault(normalize(name), key)
+        return index
+
+    @staticmethod
+    def _probe(index, text):
+        key = index.get(text)
+        return key if key is not None else index.get(normalize(text))
+
+    def disease(self, text) -> Optional[Disease]:
+        key = self._probe(self._disease_index, text)
+        return self.diseases[key] if key else None
+
+    def allopathic(self, text) -> Optional[Remedy]:
+        disease = self.disease(text)
+        return disease.allopathic if disease else None
+
+    def ayurvedic(self, text) -> Optional[str]:
+        disease = self.disease(text)
+        return disease.ayurvedic if disease else None
+
+    def medicine(self, name) -> Optional[Medicine]:
+        key = self._probe(self._medicine_index, name)
+        return self.medicines[key] if key else None
+
+    def pose(self, name) -> Optional[Pose]:
+        """Pose by key, full or English name; "Sanskrit (anything)" falls back to the Sanskrit part."""
+        key = self._probe(self._pose_index, name)
+        if key is None and "(" in (name or ""):
+            key = self._pose_index.get(normalize(name.split("(")[0]))
+        return self.poses[key] if key else None
+
+
+    def reload_if_changed(self, interval=CHECK_INTERVAL):
+        """
+        A new KnowledgeBase from source if the file changed, else None; the file
+        is stat'ed at most once per interval seconds. A file that fails to parse
+        or validate is logged and None returned. This object is left as it is.
+        """
+        now = time.monotonic()
+        if not self.source or now < self._next_check:
+            return None
+        self._next_check = now + interval
+        try:
+            if _file_stat(self.source) == self._stat:
+                return None
+            with open(self.source, encoding="utf-8") as f:
+                data = json.load(f)
+            fresh = KnowledgeBase(data, self.source)
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.exception("Keeping knowledge base %s; reloading %s failed", self.version, self.source)
+            return None
+        fresh._next_check = now + interval
+        return fresh
+
+
+def _file_stat(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_knowledge_base(path=None):
+    path = path or os.environ.get("KNOWLEDGE_BASE_PATH") or DEFAULT_PATH
+    with open(path, encoding="utf-8") as f:
+        return KnowledgeBase(json.load(f), path)
+
+
+# Loaded on first attribute access (see lazy.py)
+kb = LazyObject(load_knowledge_base)
+
+
+def refresh_if_changed(proxy=None, interval=CHECK_INTERVAL):
+    """
+    Swap a reloaded knowledge base into proxy (kb by default) if its file
+    changed. Returns True when new content was loaded.
+    """
+    proxy = kb if proxy is None else proxy
+    fresh = proxy.reload_if_changed(interval)
+    if fresh is None:
+        return False
+    proxy.swap(fresh)
+    return True
@@ -0,0 +1,58 @@
+"""
+Deferred loading for a fast cold start.
+
+LazyObject(factory) stands in for factory()'s result and builds it on first
+attribute access; lazy_module(name) does the same for an import. Views bind
+the heavy modules (NumPy-backed calculators, the fuzzy index, the symptom
+engine) this way, so a process only pays for what its requests use.
+"""
+
+import importlib
+import threading
+
+
+class LazyObject:
+    """Proxy that calls factory() once, on first use, and forwards attribute reads and writes."""
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_target", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @property
+    def loaded(self):
+        return self._target is not None
+
+    def _resolve(self):
+        target = self._target
+        if target is None:
+            with self._lock:
+                target = self._target
+                if target is None:
+                    target = self._factory()
+                    object.__setattr__(self, "_target", target)
+        return target
+
+    def swap(self, target):
+        """Replace the object behind the proxy; readers see the old or the new one, never a mix."""
+        object.__setattr__(self, "_target", target)
+
+    # Only reached for names the proxy itself does not have
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._resolve(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._resolve(), name)
+
+    def __repr__(self):
+        if self._target is None:
+            return f"<lazy {self._factory!r} (not loaded)>"
+        return repr(self._target)
+
+
+def lazy_module(name):
+    """The module `name`, imported on first attribute access."""
+    return LazyObject(lambda: importlib.import_module(name))
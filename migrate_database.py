@@ -8,6 +8,49 @@ import sqlite3
 import os
 from datetime import datetime
 
+from validators import appointment_validator
+
+# Indexes declared on models.Appointment; create_all() only adds them to new tables
+APPOINTMENT_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_appointments_patient_slot ON appointments (patient_email, appointment_date, slot_minute);",
+    "CREATE INDEX IF NOT EXISTS ix_appointments_date_id ON appointments (appointment_date, id);",
+    "CREATE INDEX IF NOT EXISTS ix_appointments_status_date_id ON appointments (status, appointment_date, id);",
+    "CREATE INDEX IF NOT EXISTS ix_appointments_doctor_date_id ON appointments (doctor_type, appointment_date, id);",
+    "CREATE INDEX IF NOT EXISTS ix_appointments_date_doctor_slot ON appointments (appointment_date, doctor_type, slot_minute);",
+]
+
+def migrate_appointment_indexes(cursor):
+    """Add the appointment indexes to an existing appointments table"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='appointments';")
+    if not cursor.fetchone():
+        return
+    
+    cursor.execute("PRAGMA table_info(appointments);")
+    if "slot_minute" not in [row[1] for row in cursor.fetchall()]:
+        # Filled in (with slot_bookings) by `flask --app app rebuild-slots`
+        cursor.execute("ALTER TABLE appointments ADD COLUMN slot_minute INTEGER;")
+        print("Added column: slot_minute (run `flask --app app rebuild-slots` to recount slot_bookings)")
+
+    # The unique index below is keyed on slot_minute, so fill it first
+    cursor.execute("SELECT id, appointment_time FROM appointments WHERE slot_minute IS NULL;")
+    cursor.executemany("UPDATE appointments SET slot_minute = ? WHERE id = ?;", [
+        (appointment_validator.parse_minute(value.strip()), apt_id) for apt_id, value in cursor.fetchall()
+        if value and appointment_validator.TIME_RE.match(value.strip())])
+    # Built by earlier versions of this script on the free-text appointment_time
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type='index' AND name='uq_appointments_patient_slot';")
+    row = cursor.fetchone()
+    if row and "appointment_time" in row[0]:
+        cursor.execute("DROP INDEX uq_appointments_patient_slot;")
+
+    print("Found appointments table, checking indexes...")
+    for statement in APPOINTMENT_INDEXES:
+        try:
+            cursor.execute(statement)
+        except sqlite3.IntegrityError as e:
+            # Existing duplicate bookings must be cleaned up before the unique index can be built
+            print(f"Could not create index ({e}): {statement}")
+    print("Appointment indexes are up to date")
+
 def migrate_database():
     """Add missing columns to existing database"""
     
@@ -64,6 +107,8 @@ def migrate_database():
                     conn.commit()
                     print("Migration completed successfully!")
                 
+                migrate_appointment_indexes(cursor)
+                conn.commit()
                 conn.close()
                 
             except Exception as e:
@@ -1,5 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from passwords import hash_password, verify_password, needs_rehash
 from datetime import datetime, date, timedelta
 import json
 
@@ -13,10 +13,14 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self) -> bool:
+        """True when the stored hash was made under an older hashing policy."""
+        return needs_rehash(self.password_hash)
     
     def to_dict(self):
         return {
@@ -25,9 +29,57 @@ class User(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+# ---------- Password reset codes (see token_store.py) ----------
+class ResetToken(db.Model):
+    __tablename__ = 'reset_tokens'
+
+    email = db.Column(db.String(120), primary_key=True)
+    code = db.Column(db.String(6), nullable=False)
+    expires = db.Column(db.Float, nullable=False, index=True)  # epoch seconds
+
+# ---------- Wellness activity (see wellness.py) ----------
+class UserActivity(db.Model):
+    """Append-only log of tracked actions: yoga, allopathic, ayurvedic, wellness check-ins."""
+    __tablename__ = 'user_activity'
+    __table_args__ = (
+        db.Index('ix_user_activity_email_id', 'user_email', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_email = db.Column(db.String(120), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)
+    score = db.Column(db.Integer)  # wellness check-ins only
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class UserStats(db.Model):
+    """Running aggregates over a user's activity log, updated on every write."""
+    __tablename__ = 'user_stats'
+
+    user_email = db.Column(db.String(120), primary_key=True)
+    yoga_sessions = db.Column(db.Integer, nullable=False, default=0)
+    allopathic_count = db.Column(db.Integer, nullable=False, default=0)
+    ayurvedic_count = db.Column(db.Integer, nullable=False, default=0)
+    wellness_count = db.Column(db.Integer, nullable=False, default=0)
+    wellness_sum = db.Column(db.Integer, nullable=False, default=0)
+    recent_scores = db.Column(db.Text, nullable=False, default='[]')  # JSON list, oldest first
+    recent_sum = db.Column(db.Integer, nullable=False, default=0)
+
 # ---------- Simple Appointment System ----------
 class Appointment(db.Model):
     __tablename__ = 'appointments'
+    __table_args__ = (
+        # One booking per patient per time; lets the database do the duplicate check.
+        # slot_minute, not the free-text time, so "10:00 AM" and "10:00" are the same booking.
+        # Its (patient_email, appointment_date) prefix also serves the /appointments page.
+        db.UniqueConstraint('patient_email', 'appointment_date', 'slot_minute',
+                            name='uq_appointments_patient_slot'),
+        # Keyset pagination for /api/appointments, optionally filtered by status or doctor_type
+        db.Index('ix_appointments_date_id', 'appointment_date', 'id'),
+        db.Index('ix_appointments_status_date_id', 'status', 'appointment_date', 'id'),
+        db.Index('ix_appointments_doctor_date_id', 'doctor_type', 'appointment_date', 'id'),
+        # Who is booked in a given slot (overlaps, rebuilding slot_bookings)
+        db.Index('ix_appointments_date_doctor_slot', 'appointment_date', 'doctor_type', 'slot_minute'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     patient_name = db.Column(db.String(100), nullable=False)
@@ -37,6 +89,7 @@ class Appointment(db.Model):
     health_issue = db.Column(db.Text)
     appointment_date = db.Column(db.Date, nullable=False)
     appointment_time = db.Column(db.String(10), nullable=False)
+    slot_minute = db.Column(db.Integer)  # appointment_time as minutes since midnight (see slots.py)
     status = db.Column(db.String(20), default='pending')  # pending, confirmed, completed, cancelled
     consultation_notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -54,15 +107,59 @@ class Appointment(db.Model):
             'health_issue': self.health_issue,
             'appointment_date': self.appointment_date.strftime('%Y-%m-%d') if self.appointment_date else None,
             'appointment_time': self.appointment_time,
+            'slot_minute': self.slot_minute,
             'status': self.status,
             'consultation_notes': self.consultation_notes,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
-# ---------- Optional: store consultation requests ----------
+# ---------- Bookings per day, doctor type and slot (see slots.py) ----------
+class SlotBooking(db.Model):
+    """Active (not cancelled) appointments per slot, kept in step with appointments in the same transaction."""
+    __tablename__ = 'slot_bookings'
+
+    appointment_date = db.Column(db.Date, primary_key=True)
+    doctor_type = db.Column(db.String(50), primary_key=True)
+    slot_minute = db.Column(db.Integer, primary_key=True)  # start of the slot, minutes since midnight
+    booked = db.Column(db.Integer, nullable=False, default=0)
+
+# ---------- Appointment counts for the admin view (see appointment_stats.py) ----------
+class AppointmentCount(db.Model):
+    """Appointments per status, doctor type and day, updated in the same transaction as the appointments."""
+    __tablename__ = 'appointment_counts'
+
+    dimension = db.Column(db.String(20), primary_key=True)  # status, doctor_type or day
+    value = db.Column(db.String(120), primary_key=True)  # days as YYYY-MM-DD, so ranges sort correctly
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# ---------- Idempotency-Key claims and stored responses (see idempotency.py) ----------
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+
+    scope = db.Column(db.String(100), primary_key=True)  # endpoint name
+    key = db.Column(db.String(255), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)  # sha256 of the request body
+    status_code = db.Column(db.Integer)  # NULL while the first request is still running
+    body = db.Column(db.Text)
+    created_at = db.Column(db.Float, nullable=False, index=True)  # epoch seconds
+
+# ---------- Consultation requests (written through write_behind.py) ----------
 class Consultation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100))
     issue = db.Column(db.String(200))
     message = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# ---------- Feedback (written through write_behind.py) ----------
+class Feedback(db.Model):
+    __table_args__ = (
+        # A user's own feedback, newest first, on /feedback
+        db.Index('ix_feedback_user_created', 'user_email', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_email = db.Column(db.String(120))
+    name = db.Column(db.String(100))
+    message = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,64 @@
+"""
+Response cache for read-only knowledge pages (/yoga/<pose>, /medicine/<name>).
+
+A page's ETag is derived from the knowledge-base version, the template
+source and the page key, so it is known before rendering: a conditional GET
+with a matching If-None-Match gets a 304 without touching Jinja. Rendered
+HTML is kept in a per-process LRU keyed by page; the whole LRU is dropped
+when the knowledge-base version or template fingerprint changes.
+
+KNOWLEDGE_PAGE_CACHE_CONTROL sets the Cache-Control header. The pages sit
+behind login_required, so the default only lets browsers cache them
+("private"); deployments that serve them publicly can switch to e.g.
+"public, max-age=300, s-maxage=3600" for CDN edge caching.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+CACHE_CONTROL = os.environ.get("KNOWLEDGE_PAGE_CACHE_CONTROL", "private, max-age=300, stale-while-revalidate=60")
+MAX_ENTRIES = int(os.environ.get("KNOWLEDGE_PAGE_CACHE_SIZE", "512"))
+
+
+class PageCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._pages = OrderedDict()  # key -> rendered HTML
+        self._generation = None      # (kb version, template fingerprint) the pages were rendered for
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def etag(generation, key):
+        return hashlib.sha1(repr((generation, key)).encode("utf-8")).hexdigest()[:20]
+
+    def get_or_render(self, generation, key, render):
+        """Cached HTML for key, calling render() on a miss. Returns (etag, html)."""
+        with self._lock:
+            if generation != self._generation:
+                self._pages.clear()
+                self._generation = generation
+            html = self._pages.get(key)
+            if html is not None:
+                self._pages.move_to_end(key)
+                self.hits += 1
+                return self.etag(generation, key), html
+            self.misses += 1
+
+        html = render()
+        with self._lock:
+            if generation == self._generation:
+                self._pages[key] = html
+                while len(self._pages) > self.max_entries:
+                    self._pages.popitem(last=False)
+        return self.etag(generation, key), html
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def __len__(self):
+        return len(self._pages)
@@ -0,0 +1,103 @@
+"""
+Password hashing policy.
+
+The algorithm and cost come from the environment:
+  PASSWORD_HASH_ALGORITHM  scrypt (default), pbkdf2:sha256 or pbkdf2:sha512
+  PASSWORD_HASH_COST       scrypt N (default 32768) or PBKDF2 iterations (default 600000)
+  PASSWORD_HASH_WORKERS    >0 runs hashing in a bounded thread pool of that size
+  PASSWORD_HASH_QUEUE      max hash jobs waiting for the pool before logins are refused
+
+Hashes made under an older policy still verify; User.password_needs_rehash()
+tells login_register to re-hash them with the current policy.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_COSTS = {"scrypt": 2 ** 15, "pbkdf2": 600000}
+
+
+class PasswordHashBusy(Exception):
+    """Raised when the hashing pool queue is full."""
+
+
+class PasswordPolicy:
+    def __init__(self, algorithm="scrypt", cost=None):
+        family = algorithm.split(":")[0]
+        if family not in DEFAULT_COSTS:
+            raise ValueError(f"Unsupported password hash algorithm '{algorithm}'")
+        if family == "pbkdf2" and ":" not in algorithm:
+            algorithm = "pbkdf2:sha256"
+        self.algorithm = algorithm
+        self.cost = int(cost or DEFAULT_COSTS[family])
+
+    @property
+    def method(self):
+        """Werkzeug method string, which is also the prefix stored in the hash."""
+        if self.algorithm == "scrypt":
+            return f"scrypt:{self.cost}:8:1"
+        return f"{self.algorithm}:{self.cost}"
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method)
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split("$", 1)[0] != self.method
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get("PASSWORD_HASH_ALGORITHM", "scrypt"),
+                   os.environ.get("PASSWORD_HASH_COST"))
+
+
+class HashWorkerPool:
+    """
+    Bounded thread pool for hash work. hashlib releases the GIL while hashing,
+    so capping the workers caps the cores a login storm can take, and the
+    queue limit refuses excess logins instead of piling up request threads.
+    """
+
+    def __init__(self, workers, max_queue):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self.slots = threading.BoundedSemaphore(workers + max_queue)
+
+    def run(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            raise PasswordHashBusy("Too many logins in progress, please retry")
+        try:
+            return self.executor.submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+
+policy = PasswordPolicy.from_env()
+_workers = int(os.environ.get("PASSWORD_HASH_WORKERS", "0"))
+pool = HashWorkerPool(_workers, int(os.environ.get("PASSWORD_HASH_QUEUE", "64"))) if _workers > 0 else None
+
+
+def configure(algorithm=None, cost=None, workers=None, max_queue=64):
+    """Replace the active policy and/or hashing pool (used by tests and benchmarks)."""
+    global policy, pool
+    if algorithm is not None:
+        policy = PasswordPolicy(algorithm, cost)
+    if workers is not None:
+        pool = HashWorkerPool(workers, max_queue) if workers > 0 else None
+
+
+def hash_password(password):
+    if pool:
+        return pool.run(policy.hash, password)
+    return policy.hash(password)
+
+
+def verify_password(password_hash, password):
+    if pool:
+        return pool.run(check_password_hash, password_hash, password)
+    return check_password_hash(password_hash, password)
+
+
+def needs_rehash(password_hash):
+    return policy.needs_rehash(password_hash)
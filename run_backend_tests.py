@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Backend test harness
+Runs the pytest route suite once per database backend:
+  sqlite     - a fresh SQLite file
+  postgresql - TEST_POSTGRES_URL if set, otherwise a throwaway local
+               cluster started with initdb/pg_ctl on a free port
+A backend whose server or driver is unavailable is reported as skipped.
+
+Usage: python run_backend_tests.py [sqlite|postgresql ...] [-- extra pytest args]
+"""
+
+import glob
+import importlib.util
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Scripts that need a live server on localhost:5000 rather than the test client
+LIVE_SERVER_SCRIPTS = ["quick_test.py", "test_api_endpoints.py"]
+
+
+class BackendUnavailable(Exception):
+    pass
+
+
+@contextmanager
+def sqlite_backend():
+    with tempfile.TemporaryDirectory(prefix="healthcare-sqlite-") as tmp:
+        yield "sqlite:///" + os.path.join(tmp, "test.db")
+
+
+def find_pg_bin(name):
+    found = shutil.which(name)
+    if found:
+        return found
+    candidates = sorted(glob.glob(f"/usr/lib/postgresql/*/bin/{name}")) + \
+        sorted(glob.glob(f"/usr/local/opt/postgresql*/bin/{name}"))
+    return candidates[-1] if candidates else None
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def postgresql_backend():
+    if not (importlib.util.find_spec("psycopg2") or importlib.util.find_spec("psycopg")):
+        raise BackendUnavailable("no PostgreSQL driver installed (pip install psycopg2-binary)")
+
+    if os.environ.get("TEST_POSTGRES_URL"):
+        yield os.environ["TEST_POSTGRES_URL"]
+        return
+
+    initdb, pg_ctl = find_pg_bin("initdb"), find_pg_bin("pg_ctl")
+    if not (initdb and pg_ctl):
+        raise BackendUnavailable("initdb/pg_ctl not found and TEST_POSTGRES_URL is not set")
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        raise BackendUnavailable("initdb refuses to run as root; set TEST_POSTGRES_URL instead")
+
+    with tempfile.TemporaryDirectory(prefix="healthcare-pg-") as tmp:
+        data_dir = os.path.join(tmp, "data")
+        port = free_port()
+        subprocess.run([initdb, "-D", data_dir, "-U", "postgres", "-A", "trust"],
+                       check=True, capture_output=True)
+        subprocess.run([pg_ctl, "-D", data_dir, "-l", os.path.join(tmp, "server.log"), "-w",
+                        "-o", f"-p {port} -k {tmp} -c listen_addresses=127.0.0.1 -c fsync=off",
+                        "start"], check=True, capture_output=True)
+        try:
+            wait_for_port(port)
+            yield f"postgresql://postgres@127.0.0.1:{port}/postgres"
+        finally:
+            subprocess.run([pg_ctl, "-D", data_dir, "-m", "fast", "stop"], capture_output=True)
+
+
+def wait_for_port(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise BackendUnavailable(f"PostgreSQL did not start on port {port}")
+
+
+BACKENDS = {
+    "sqlite": sqlite_backend,
+    "postgresql": postgresql_backend,
+}
+
+
+def run_suite(name, pytest_args):
+    try:
+        with BACKENDS[name]() as url:
+            print(f"=== {name}: {url}")
+            cmd = [sys.executable, "-m", "pytest", "-q"]
+            cmd += [f"--ignore={script}" for script in LIVE_SERVER_SCRIPTS] + pytest_args
+            return subprocess.run(cmd, cwd=ROOT, env=dict(os.environ, DATABASE_URL=url)).returncode
+    except BackendUnavailable as e:
+        print(f"=== {name}: skipped ({e})")
+        return None
+
+
+def main(argv):
+    if "--" in argv:
+        split = argv.index("--")
+        names, pytest_args = argv[:split], argv[split + 1:]
+    else:
+        names, pytest_args = argv, []
+    names = names or list(BACKENDS)
+
+    results = {name: run_suite(name, pytest_args) for name in names}
+
+    print("\nBackend results:")
+    for name, code in results.items():
+        status = "SKIPPED" if code is None else ("PASS" if code == 0 else "FAIL")
+        print(f"  {name:<12} {status}")
+    return 1 if any(code for code in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
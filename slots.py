@@ -0,0 +1,234 @@
+"""
+Appointment slots: capacity per doctor type and the availability of a day.
+
+appointment_time is free text ("10:00 AM", "10:00"); the validator also
+stores it as Appointment.slot_minute (minutes since midnight). The day is cut
+into SLOT_LENGTH-minute slots and slot_bookings counts the active (not
+cancelled) appointments per (date, doctor_type, slot). Each insert takes its
+place in the same transaction, with one conditional upsert:
+
+    INSERT ... ON CONFLICT DO UPDATE SET booked = booked + n WHERE booked + n <= capacity
+
+The database applies it atomically (one writer at a time on SQLite, a row
+lock on PostgreSQL), so concurrent bookings never take a slot past its
+capacity. Cancelling an appointment gives its place back.
+
+SLOT_CAPACITY is the number of appointments a slot takes per doctor type,
+e.g. "3" or "Cardiologist=1,General Physician=4,*=2". Empty (the default)
+means unlimited: slots are counted for /api/slots but never refused.
+SLOT_LENGTH, SLOT_DAY_START and SLOT_DAY_END shape the day's grid.
+
+`flask --app app rebuild-slots` fills slot_minute on older rows and recounts
+slot_bookings from the appointments table.
+"""
+
+import os
+
+import database
+from database import upsert_insert
+from models import db, Appointment, SlotBooking
+from validators import appointment_validator
+
+SLOT_LENGTH = int(os.environ.get("SLOT_LENGTH", "30"))  # minutes
+DAY_MINUTES = 24 * 60
+
+
+def _minute(value):
+    return appointment_validator.parse_minute(value)
+
+
+SLOT_DAY_START = _minute(os.environ.get("SLOT_DAY_START", "09:00"))
+SLOT_DAY_END = _minute(os.environ.get("SLOT_DAY_END", "18:00"))
+
+
+class SlotCapacity:
+    """Places per slot by doctor type; None means unlimited."""
+
+    def __init__(self, default=None, per_doctor=None):
+        self.default = default
+        self.per_doctor = per_doctor or {}
+
+    @classmethod
+    def parse(cls, spec):
+        """"3" -> 3 for everyone; "Cardiologist=1,*=2" -> 1 for cardiologists, 2 for the rest."""
+        default, per_doctor = None, {}
+        for part in filter(None, (part.strip() for part in (spec or "").split(","))):
+            name, sep, value = part.rpartition("=")
+            if not sep or name.strip() == "*":
+                default = int(value)
+            else:
+                per_doctor[name.strip().lower()] = int(value)
+        return cls(default, per_doctor)
+
+    def for_doctor(self, doctor_type):
+        places = self.per_doctor.get(doctor_type.lower(), self.default)
+        return places if places else None
+
+
+capacity = SlotCapacity.parse(os.environ.get("SLOT_CAPACITY", ""))
+
+
+def slot_start(minute):
+    return minute - minute % SLOT_LENGTH
+
+
+def format_minute(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def slot_key(fields):
+    """(date, doctor_type, slot start) for a validated appointment, or None without a slot_minute."""
+    if fields.get("slot_minute") is None:
+        return None
+    return fields["appointment_date"], fields["doctor_type"], slot_start(fields["slot_minute"])
+
+
+def reserve(key, count=1):
+    """Take count places in the slot, in the current transaction. False (and nothing taken) if they do not fit."""
+    day, doctor_type, slot = key
+    places = capacity.for_doctor(doctor_type)
+    if places is not None and count > places:
+        return False
+    statement = upsert_insert(db.session)(SlotBooking).values(
+        appointment_date=day, doctor_type=doctor_type, slot_minute=slot, booked=count
+    ).on_conflict_do_update(
+        index_elements=[SlotBooking.appointment_date, SlotBooking.doctor_type, SlotBooking.slot_minute],
+        set_={"booked": SlotBooking.booked + count},
+        where=(SlotBooking.booked + count <= places) if places is not None else None,
+    )
+    return db.session.execute(statement).rowcount == 1
+
+
+def reserve_rows(rows):
+    """
+    Reserve a place for each (index, fields) pair; returns the indexes that got none.
+    Cancelled rows (from an import) take no place.
+    Slots without a capacity are counted with one batched upsert. Rows sharing a
+    capped slot are reserved with one statement when they all fit, otherwise one
+    at a time until the slot is full.
+    """
+    groups = {}
+    for index, fields in rows:
+        key = slot_key(fields)
+        if key is not None and fields.get("status") != "cancelled":
+            groups.setdefault(key, []).append(index)
+    refused, unlimited = set(), {}
+    for key, indexes in groups.items():
+        if capacity.for_doctor(key[1]) is None:
+            unlimited[key] = len(indexes)
+        elif not reserve(key, len(indexes)):
+            for position in range(len(indexes)):
+                if not reserve(key):
+                    refused.update(indexes[position:])
+                    break
+    if unlimited:
+        _count(unlimited)
+    return refused
+
+
+def _count(bookings):
+    """Add {key: places} to uncapped slots with one executemany, in key order (the lock order on PostgreSQL)."""
+    insert = upsert_insert(db.session)(SlotBooking)
+    statement = insert.on_conflict_do_update(
+        index_elements=[SlotBooking.appointment_date, SlotBooking.doctor_type, SlotBooking.slot_minute],
+        set_={"booked": SlotBooking.booked + insert.excluded.booked},
+    )
+    db.session.execute(statement, [
+        {"appointment_date": day, "doctor_type": doctor_type, "slot_minute": slot, "booked": places}
+        for (day, doctor_type, slot), places in sorted(bookings.items())])
+
+
+def release(key):
+    """Give one place back (an appointment was cancelled), in the current transaction."""
+    day, doctor_type, slot = key
+    db.session.execute(
+        db.update(SlotBooking)
+        .where(SlotBooking.appointment_date == day, SlotBooking.doctor_type == doctor_type,
+               SlotBooking.slot_minute == slot, SlotBooking.booked > 0)
+        .values(booked=SlotBooking.booked - 1)
+    )
+
+
+class DaySlots:
+    """
+    One day's bookings for a doctor type: a count per slot and a bitmap of the
+    full slots (bit i is slot i of the day), built from one primary-key range
+    read of slot_bookings.
+    """
+
+    def __init__(self, day, doctor_type, booked_by_minute):
+        self.day = day
+        self.doctor_type = doctor_type
+        self.capacity = capacity.for_doctor(doctor_type)
+        # Rounded up: with a SLOT_LENGTH that does not divide the day, the last slot is short
+        self.booked = [0] * -(-DAY_MINUTES // SLOT_LENGTH)
+        self.full = 0
+        for minute, booked in booked_by_minute:
+            index = minute // SLOT_LENGTH
+            self.booked[index] = booked
+            if self.capacity is not None and booked >= self.capacity:
+                self.full |= 1 << index
+
+    def is_free(self, minute):
+        return not self.full >> (minute // SLOT_LENGTH) & 1
+
+    def slots(self):
+        """The day's grid (SLOT_DAY_START to SLOT_DAY_END) plus any booked slot outside it."""
+        grid = set(range(slot_start(SLOT_DAY_START), SLOT_DAY_END, SLOT_LENGTH))
+        grid.update(index * SLOT_LENGTH for index, booked in enumerate(self.booked) if booked)
+        result = []
+        for minute in sorted(grid):
+            booked = self.booked[minute // SLOT_LENGTH]
+            result.append({
+                "time": format_minute(minute),
+                "minute": minute,
+                "booked": booked,
+                "available": None if self.capacity is None else max(self.capacity - booked, 0),
+                "free": self.is_free(minute),
+            })
+        return result
+
+
+def day_slots(day, doctor_type):
+    rows = db.session.execute(
+        db.select(SlotBooking.slot_minute, SlotBooking.booked)
+        .where(SlotBooking.appointment_date == day, SlotBooking.doctor_type == doctor_type)
+    ).all()
+    return DaySlots(day, doctor_type, rows)
+
+
+def fill_slot_minutes(conn):
+    """Set slot_minute on rows written before it existed; returns the number of rows filled."""
+    table = Appointment.__table__
+    missing = conn.execute(
+        db.select(table.c.id, table.c.appointment_time).where(table.c.slot_minute.is_(None))
+    ).all()
+    updates = [{"row_id": apt_id, "minute": _minute(value.strip())}
+               for apt_id, value in missing if value and appointment_validator.TIME_RE.match(value.strip())]
+    if updates:
+        conn.execute(db.update(table).where(table.c.id == db.bindparam("row_id"))
+                     .values(slot_minute=db.bindparam("minute")), updates)
+    return len(updates)
+
+
+# Before uq_appointments_patient_slot is built on (patient_email, appointment_date, slot_minute)
+database.column_backfills.append(fill_slot_minutes)
+
+
+def rebuild():
+    """Fill slot_minute where it is missing and recount slot_bookings; returns (rows filled, slots counted)."""
+    filled = fill_slot_minutes(db.session.connection())
+
+    db.session.execute(db.delete(SlotBooking))
+    start = Appointment.slot_minute - Appointment.slot_minute % SLOT_LENGTH
+    counted = db.session.execute(
+        db.insert(SlotBooking).from_select(
+            ["appointment_date", "doctor_type", "slot_minute", "booked"],
+            db.select(Appointment.appointment_date, Appointment.doctor_type, start, db.func.count())
+            .where(Appointment.slot_minute.isnot(None),
+                   db.or_(Appointment.status.is_(None), Appointment.status != "cancelled"))
+            .group_by(Appointment.appointment_date, Appointment.doctor_type, start)
+        )
+    ).rowcount
+    db.session.commit()
+    return filled, counted
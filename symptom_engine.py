@@ -0,0 +1,172 @@
+"""
+Symptom scoring engine behind /symptom_checker and /api/symptom_checker.
+
+The symptom -> condition knowledge base is compiled once into an inverted
+index of condition-id postings. Scoring a request only touches the postings
+of the selected symptoms and counts them in one C-level Counter.update;
+the top k conditions come from a heap instead of sorting every candidate.
+"""
+
+import heapq
+import multiprocessing
+import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from operator import itemgetter
+
+from knowledge_base import kb
+
+# Knowledge base content (data/knowledge_base.json), as plain containers
+_symptoms = kb.symptoms
+# Symptom -> conditions it points to. Entries may be a name (weight 1) or a (name, weight) pair.
+SYMPTOM_CONDITIONS = {symptom: list(entries) for symptom, entries in _symptoms.conditions.items()}
+SPECIALIST_MAP = dict(_symptoms.specialists)
+URGENT_SYMPTOMS = set(_symptoms.urgent)
+# Shown in this order for the selected symptoms
+HOME_CARE_TIPS = dict(_symptoms.home_care)
+DEFAULT_HOME_CARE = _symptoms.default_home_care
+DEFAULT_SPECIALIST = _symptoms.default_specialist
+
+
+class SymptomEngine:
+    def __init__(self, symptom_conditions, specialist_map=None, urgent_symptoms=(),
+                 home_care_tips=None, top_k=5):
+        self.top_k = top_k
+        self.specialist_map = dict(specialist_map or {})
+        self.urgent_symptoms = frozenset(urgent_symptoms)
+        self.home_care_tips = list((home_care_tips or {}).items())
+
+        self.conditions = []
+        condition_ids = {}
+        self.index = {}      # symptom -> condition ids with weight 1
+        self.weighted = {}   # symptom -> (condition id, weight) for other weights
+        for symptom, entries in symptom_conditions.items():
+            postings, weighted = [], []
+            for entry in entries:
+                name, weight = (entry, 1) if isinstance(entry, str) else entry
+                if name not in condition_ids:
+                    condition_ids[name] = len(self.conditions)
+                    self.conditions.append(name)
+                if weight == 1:
+                    postings.append(condition_ids[name])
+                else:
+                    weighted.append((condition_ids[name], weight))
+            self.index[symptom] = tuple(postings)
+            if weighted:
+                self.weighted[symptom] = tuple(weighted)
+
+    @property
+    def symptoms(self):
+        return list(self.index)
+
+    def score(self, symptoms):
+        """Return a Counter of condition id -> score over the postings of the given symptoms."""
+        index = self.index
+        scores = Counter(chain.from_iterable(index.get(symptom, ()) for symptom in symptoms))
+        if self.weighted:
+            for symptom in symptoms:
+                for cid, weight in self.weighted.get(symptom, ()):
+                    scores[cid] += weight
+        return scores
+
+    def top_conditions(self, symptoms, k=None):
+        """[(condition, score)] for the k best matches, highest score first."""
+        scores = self.score(symptoms)
+        # nlargest is stable like sorted(), so ties keep first-seen order as before
+        best = heapq.nlargest(k or self.top_k, scores.items(), key=itemgetter(1))
+        return [(self.conditions[cid], score) for cid, score in best]
+
+    def check(self, symptoms, k=None):
+        """Full triage result for one symptom list, as rendered by symptom_checker.html."""
+        top = self.top_conditions(symptoms, k)
+        selected = set(symptoms)
+        home_care = [tip for symptom, tip in self.home_care_tips if symptom in selected]
+        specialist = DEFAULT_SPECIALIST
+        if top:
+            specialist = self.specialist_map.get(top[0][0], DEFAULT_SPECIALIST)
+        return {
+            "possible_conditions": [name for name, _ in top],
+            "match_count": [score for _, score in top],
+            "is_urgent": not self.urgent_symptoms.isdisjoint(selected),
+            "specialist": specialist,
+            "home_care": home_care or [DEFAULT_HOME_CARE],
+            "symptom_count": len(symptoms)
+        }
+
+
+engine = SymptomEngine(SYMPTOM_CONDITIONS, SPECIALIST_MAP, URGENT_SYMPTOMS, HOME_CARE_TIPS)
+
+
+# ------------------------------ Batch triage ------------------------------
+
+BATCH_CHUNK_SIZE = 500
+# Below this many items a batch is scored in the request thread
+BATCH_POOL_THRESHOLD = int(os.environ.get("SYMPTOM_BATCH_POOL_THRESHOLD", "2000"))
+BATCH_WORKERS = int(os.environ.get("SYMPTOM_BATCH_WORKERS", os.cpu_count() or 1))
+# Workers never fork the app process: its ingest, write-behind and metrics threads could leave
+# a lock held in the child. forkserver where the platform has it, else spawn.
+BATCH_START_METHOD = os.environ.get(
+    "SYMPTOM_BATCH_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+_pool = None
+
+
+def batch_item_result(index, item):
+    """Result line for one batch item: a symptom list or {"id", "symptoms"}."""
+    item_id = None
+    symptoms = item
+    if isinstance(item, dict):
+        item_id, symptoms = item.get("id"), item.get("symptoms")
+    if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
+        return {"index": index, "id": item_id, "status": "error",
+                "message": "symptoms must be a list of symptom names"}
+    result = engine.check(symptoms)
+    return dict(result, index=index, id=item_id, status="success")
+
+
+def check_chunk(chunk):
+    """Score a list of (index, item) pairs; runs inside the process pool."""
+    return [batch_item_result(index, item) for index, item in chunk]
+
+
+def _chunks(indexed_items, size):
+    chunk = []
+    for pair in indexed_items:
+        chunk.append(pair)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS,
+                                    mp_context=multiprocessing.get_context(BATCH_START_METHOD))
+    return _pool
+
+
+def iter_batch_results(items, use_pool):
+    """
+    Yield one result dict per item, in input order.
+    With use_pool, chunks are scored in worker processes with at most
+    two chunks per worker in flight, so memory stays bounded for any batch size.
+    """
+    chunks = _chunks(enumerate(items), BATCH_CHUNK_SIZE)
+    if not use_pool or BATCH_WORKERS < 2:
+        for chunk in chunks:
+            yield from check_chunk(chunk)
+        return
+
+    pool = _get_pool()
+    in_flight = deque()
+    for chunk in chunks:
+        in_flight.append(pool.submit(check_chunk, chunk))
+        if len(in_flight) >= BATCH_WORKERS * 2:
+            yield from in_flight.popleft().result()
+    while in_flight:
+        yield from in_flight.popleft().result()
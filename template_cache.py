@@ -0,0 +1,182 @@
+"""
+Jinja fragment cache and render profiler.
+
+Fragment cache: templates wrap expensive, rarely changing parts in
+
+    {% cache "pose-cards", disease, ttl=600 %} ... {% endcache %}
+
+The rendered fragment is stored in an LRU bounded by
+TEMPLATE_FRAGMENT_CACHE_SIZE entries. Its key is the template name plus the
+given key values. An entry lives for ttl seconds, or TEMPLATE_FRAGMENT_TTL
+when no ttl is given. A ttl of 0 disables caching for that fragment.
+
+Render profiler: with TEMPLATE_PROFILE=1, every render_template() call is
+timed per template. Every {% block %} and {% cache %} fragment is timed
+too, inclusive of nested ones. GET /api/render_profile reports the totals.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import before_render_template, template_rendered
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+STRING_TEMPLATE = "<string>"  # name used for templates built from a string
+DEFAULT_TTL = float(os.environ.get("TEMPLATE_FRAGMENT_TTL", "300"))
+MAX_ENTRIES = int(os.environ.get("TEMPLATE_FRAGMENT_CACHE_SIZE", "1024"))
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered fragments with a per-entry expiry."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, default_ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (expires, html)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, html, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, html)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RenderProfiler:
+    """Accumulates render time per template and per template:block."""
+
+    def __init__(self):
+        self._stats = {}  # name -> [count, total seconds, max seconds]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, name, seconds):
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                self._stats[name] = [1, seconds, seconds]
+            else:
+                stat[0] += 1
+                stat[1] += seconds
+                stat[2] = max(stat[2], seconds)
+
+    def report(self):
+        """Rows sorted by total time, slowest first."""
+        with self._lock:
+            rows = [{"name": name, "count": count, "total_ms": round(total * 1000, 3),
+                     "mean_ms": round(total / count * 1000, 4), "max_ms": round(peak * 1000, 3)}
+                    for name, (count, total, peak) in self._stats.items()]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    # Flask signals bracket each render_template() call
+    def _before_render(self, sender, template, context, **extra):
+        self._wrap_blocks(template)
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(time.perf_counter())
+
+    def _rendered(self, sender, template, context, **extra):
+        stack = getattr(self._local, "stack", None)
+        if stack:
+            self.record(template.name or STRING_TEMPLATE, time.perf_counter() - stack.pop())
+
+    def _wrap_blocks(self, template):
+        """Replace each block's render function with a timed one (once per template)."""
+        if getattr(template, "_profiled", False):
+            return
+        for name, render in list(template.blocks.items()):
+            template.blocks[name] = self._timed_block(f"{template.name or STRING_TEMPLATE}:{name}", render)
+        template._profiled = True
+
+    def _timed_block(self, label, render):
+        def timed(context):
+            started = time.perf_counter()
+            try:
+                yield from render(context)
+            finally:
+                self.record(label, time.perf_counter() - started)
+        return timed
+
+
+class FragmentCacheExtension(Extension):
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=FragmentCache(), render_profiler=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key_parts = [nodes.Const(parser.name or STRING_TEMPLATE)]
+        ttl = nodes.Const(None)
+        while parser.stream.current.type != "block_end":
+            if key_parts[1:]:
+                parser.stream.expect("comma")
+            if parser.stream.current.test("name:ttl") and parser.stream.look().test("assign"):
+                parser.stream.skip(2)
+                ttl = parser.parse_expression()
+            else:
+                key_parts.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        call = self.call_method("_render_fragment", [nodes.List(key_parts), ttl])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_fragment(self, key_parts, ttl, caller):
+        cache = self.environment.fragment_cache
+        key = tuple(key_parts)
+        html = cache.get(key)
+        if html is not None:
+            return html
+        profiler = self.environment.render_profiler
+        started = time.perf_counter()
+        html = caller()
+        if profiler is not None:
+            profiler.record(f"{key_parts[0]}:cache:{key_parts[1] if len(key_parts) > 1 else ''}",
+                            time.perf_counter() - started)
+        cache.set(key, html, ttl)
+        return html
+
+
+def init_app(app, profile=None):
+    """Install the {% cache %} tag on app.jinja_env and, if enabled, the render profiler."""
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    if profile is None:
+        profile = os.environ.get("TEMPLATE_PROFILE", "0") == "1"
+    if profile:
+        profiler = RenderProfiler()
+        app.jinja_env.render_profiler = profiler
+        before_render_template.connect(profiler._before_render, app)
+        template_rendered.connect(profiler._rendered, app)
+    return app.jinja_env.render_profiler
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for the application factory, once-per-deployment schema creation and lazy loading
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+from sqlalchemy import text
+
+import database
+from conftest import appointment_payload, make_app
+from database import ensure_schema
+from lazy import LazyObject
+from models import db
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_schema_is_created_once_per_fingerprint(tmp_path):
+    first = make_app(tmp_path)
+    assert first.test_client().get("/api/health").status_code == 200
+    with first.app_context():
+        assert db.session.execute(text("SELECT COUNT(*) FROM schema_state")).scalar() == 1
+        assert db.session.execute(text("SELECT COUNT(*) FROM appointments")).scalar() == 0
+
+    # Another process on the same database finds the fingerprint and skips the DDL
+    second = make_app(tmp_path)
+    with second.app_context():
+        assert ensure_schema(db) is False
+        db.session.execute(text("DELETE FROM schema_state"))
+        db.session.commit()
+        assert ensure_schema(db) is True
+
+
+# appointments as created before the unique slot constraint and slot_minute existed
+OLD_APPOINTMENTS = """
+CREATE TABLE appointments (
+    id INTEGER PRIMARY KEY, patient_name VARCHAR(100) NOT NULL, patient_email VARCHAR(120) NOT NULL,
+    patient_phone VARCHAR(20), doctor_type VARCHAR(50) NOT NULL, health_issue TEXT,
+    appointment_date DATE NOT NULL, appointment_time VARCHAR(10) NOT NULL, status VARCHAR(20),
+    consultation_notes TEXT, created_at DATETIME)
+"""
+OLD_ROW = ("INSERT INTO appointments (patient_name, patient_email, doctor_type, appointment_date, appointment_time) "
+           "VALUES ('Old', 'old@example.com', 'Dentist', '2025-03-01', '10:00')")
+BOOKING = appointment_payload(prefix="old", name="Old", doctor_type="Dentist", issue="Toothache")
+
+
+def old_database(tmp_path, *statements):
+    conn = sqlite3.connect(tmp_path / "app.db")  # the database of make_app(tmp_path)
+    for statement in (OLD_APPOINTMENTS,) + statements:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+def test_existing_tables_get_the_unique_slot_index(tmp_path):
+    old_database(tmp_path)
+    app = make_app(tmp_path)
+    client = app.test_client()
+    assert client.post("/api/save_appointment", json=BOOKING).status_code == 200
+    assert client.post("/api/save_appointment", json=BOOKING).status_code == 409
+    with app.app_context():
+        indexes = {row[0] for row in db.session.execute(text("SELECT name FROM sqlite_master WHERE type='index'"))}
+        assert {"uq_appointments_patient_slot", "ix_appointments_date_doctor_slot"} <= indexes
+        assert db.session.execute(text("SELECT slot_minute FROM appointments")).scalar() == 600
+        assert db.session.execute(text("SELECT COUNT(*) FROM schema_state")).scalar() == 1
+
+
+def test_duplicates_are_refused_while_the_unique_index_cannot_be_built(tmp_path):
+    old_database(tmp_path, OLD_ROW, OLD_ROW)
+    app = make_app(tmp_path)
+    try:
+        client = app.test_client()
+        assert client.post("/api/save_appointment", json=BOOKING).status_code == 409
+        assert database.unenforced_constraints == {"uq_appointments_patient_slot"}
+        with app.app_context():
+            assert db.session.execute(text("SELECT COUNT(*) FROM appointments")).scalar() == 2
+            # Not recorded, so every process start tries again
+            assert ensure_schema(db) is True
+            db.session.execute(text("DELETE FROM appointments WHERE id = 2"))
+            db.session.commit()
+            assert ensure_schema(db) is True
+            assert database.unenforced_constraints == set()
+            assert ensure_schema(db) is False
+    finally:
+        database.unenforced_constraints.clear()
+
+
+def test_a_unique_index_on_the_old_columns_is_rebuilt(tmp_path):
+    # As built by an earlier upgrade, when the key was the free-text appointment_time
+    old_database(tmp_path, OLD_ROW.replace("'10:00'", "'10:00 AM'"),
+                 "CREATE UNIQUE INDEX uq_appointments_patient_slot "
+                 "ON appointments (patient_email, appointment_date, appointment_time)")
+    app = make_app(tmp_path)
+    # The old row gets its slot_minute, so the other spelling of its time is a duplicate
+    assert app.test_client().post("/api/save_appointment", json=BOOKING).status_code == 409
+    with app.app_context():
+        sql = db.session.execute(text("SELECT sql FROM sqlite_master WHERE name = 'uq_appointments_patient_slot'"))
+        assert "slot_minute" in sql.scalar()
+        assert db.session.execute(text("SELECT slot_minute FROM appointments")).scalar() == 600
+    assert database.unenforced_constraints == set()
+
+
+def test_apps_are_independent(tmp_path):
+    one, two = make_app(tmp_path), make_app(tmp_path)
+    assert one.extensions["write_queue"] is not two.extensions["write_queue"]
+    assert one.extensions["knowledge_pages"] is not two.extensions["knowledge_pages"]
+    assert "knowledge.yoga" in one.view_functions and "auth.login_register" in one.view_functions
+
+
+def test_lazy_object_builds_once_and_forwards_writes():
+    calls = []
+
+    class Target:
+        value = 1
+
+    def factory():
+        calls.append(1)
+        return Target()
+
+    proxy = LazyObject(factory)
+    assert not proxy.loaded and calls == []
+    assert proxy.value == 1
+    proxy.value = 2
+    assert proxy.value == 2 and calls == [1]
+
+
+def test_heavy_modules_load_on_first_use(tmp_path):
+    # A fresh interpreter, since this test process has already imported everything
+    script = f"""
+import json, sys
+from app import create_app
+from knowledge_base import kb
+app = create_app({{"SQLALCHEMY_DATABASE_URI": "sqlite:///{tmp_path / 'lazy.db'}"}})
+client = app.test_client()
+heavy = ("numpy", "fuzzy_search", "symptom_engine", "bmi_calculator")
+seen = {{"login": client.get("/login_register").status_code}}
+seen["after_login"] = [m for m in heavy if m in sys.modules] + (["kb"] if kb.loaded else [])
+seen["bmi"] = client.post("/api/bmi/batch", json={{"height_cm": [170], "weight_kg": [70], "age": [30]}}).status_code
+seen["after_bmi"] = [m for m in heavy if m in sys.modules] + (["kb"] if kb.loaded else [])
+print(json.dumps(seen))
+"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("DATABASE_URL", None)
+    out = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    seen = json.loads(out.strip().splitlines()[-1])
+    assert seen["login"] == 200 and seen["after_login"] == []
+    assert seen["bmi"] == 200 and seen["after_bmi"] == ["numpy", "bmi_calculator"]
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the materialized appointment counts, /api/appointments/stats and the consistency checker
+"""
+
+import threading
+from functools import partial
+
+import pytest
+
+import appointment_stats
+from app import app, db
+from conftest import appointment_payload, set_status
+from models import Appointment, AppointmentCount
+
+
+appointment = partial(appointment_payload, prefix="stats", appointment_date="2025-06-01")
+
+
+@pytest.fixture
+def stats_client(client):
+    with app.app_context():
+        AppointmentCount.query.delete()
+        db.session.commit()
+    return client
+
+
+def stats(client, query=""):
+    response = client.get(f"/api/appointments/stats{query}")
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_counts_follow_inserts_and_status_changes(stats_client):
+    client = stats_client
+    first = client.post("/api/save_appointment", json=appointment(1)).get_json()["appointment_id"]
+    client.post("/api/save_appointment", json=appointment(1))  # duplicate, rolled back with its counts
+    client.post("/api/save_appointments/bulk", json=[
+        appointment(2, doctor_type="Cardiologist"),
+        appointment(3, appointment_date="2025-06-02"),
+        appointment(4, email="invalid"),
+    ])
+    set_status(client, first, "cancelled")
+
+    data = stats(client)
+    assert data["total"] == 3
+    assert data["by_status"] == {"cancelled": 1, "confirmed": 2}
+    assert data["by_doctor_type"] == {"Cardiologist": 1, "General Physician": 2}
+    assert data["by_day"] == {"2025-06-01": 2, "2025-06-02": 1}
+    assert stats(client, "?date_from=2025-06-02")["by_day"] == {"2025-06-02": 1}
+    assert client.get("/api/appointments/stats?date_to=June").status_code == 400
+
+    with app.app_context():
+        assert appointment_stats.check() == []
+
+
+def test_setting_the_same_status_again_changes_nothing(stats_client):
+    client = stats_client
+    first = client.post("/api/save_appointment", json=appointment(7)).get_json()["appointment_id"]
+    for status in ("confirmed", "confirmed", "pending", "pending", "pending"):
+        response = set_status(client, first, status)
+        assert response.status_code == 200 and response.get_json()["appointment"]["status"] == status
+    data = stats(client)
+    assert data["by_status"] == {"pending": 1} and data["total"] == 1
+    with app.app_context():
+        # Also when the stats are asked to move a count onto itself
+        appointment_stats.record_status_change("pending", "pending")
+        db.session.commit()
+        assert appointment_stats.check() == []
+
+
+def test_async_ingest_updates_counts(stats_client):
+    client = stats_client
+    client.post("/api/save_appointment?mode=async", json=appointment(5))
+    assert app.extensions["ingest_queue"].wait_idle()
+    assert stats(client)["by_status"] == {"confirmed": 1}
+
+
+def test_checker_finds_and_repairs_drift(stats_client):
+    client = stats_client
+    client.post("/api/save_appointment", json=appointment(6))
+    with app.app_context():
+        # A row written behind the API's back
+        db.session.add(Appointment(patient_name="Manual", patient_email="manual@example.com",
+                                   doctor_type="Dentist", appointment_date=Appointment.query.first().appointment_date,
+                                   appointment_time="11:00", status=None))
+        db.session.commit()
+        differences = appointment_stats.check()
+        assert {(d["dimension"], d["value"], d["stored"], d["expected"]) for d in differences} == {
+            ("status", "pending", 0, 1), ("doctor_type", "Dentist", 0, 1), ("day", "2025-06-01", 1, 2)}
+        assert appointment_stats.check(repair=True) == differences
+        assert appointment_stats.check() == []
+    assert stats(client)["total"] == 2
+
+
+def test_concurrent_writers_keep_counts_exact(stats_client):
+    threads, per_thread = 8, 15
+
+    def book(n):
+        test_client = app.test_client()
+        for i in range(per_thread):
+            payload = appointment(f"{n}-{i}", appointment_date=f"2025-07-{i % 3 + 1:02d}")
+            saved = test_client.post("/api/save_appointment", json=payload).get_json()
+            if i % 5 == 0:
+                set_status(test_client, saved["appointment_id"], "completed")
+
+    pool = [threading.Thread(target=book, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    data = stats(stats_client)
+    assert data["total"] == threads * per_thread
+    assert data["by_status"] == {"completed": threads * 3, "confirmed": threads * (per_thread - 3)}
+    with app.app_context():
+        assert appointment_stats.check() == []
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tests for the CSV/Parquet export and import of appointments (endpoints and CLI)
+"""
+
+import csv
+import io
+
+import pytest
+
+import appointment_stats
+import appointment_transfer
+from app import app, db
+from conftest import ADMIN_HEADERS, appointment_payload, set_status
+from models import Appointment, AppointmentCount, SlotBooking
+
+
+def appointment(i, **overrides):
+    # A comma in the issue for the CSV quoting, and a different hour per patient
+    return appointment_payload(i, "transfer", **{"doctor_type": "Dermatologist", "issue": "Rash, itching",
+                                                 "appointment_date": "2025-08-01",
+                                                 "appointment_time": f"{9 + i % 8}:00", **overrides})
+
+
+@pytest.fixture
+def transfer_client(client):
+    """The test client on empty tables, sending the admin token with every request."""
+    empty_tables()
+    client.environ_base["HTTP_AUTHORIZATION"] = ADMIN_HEADERS["Authorization"]
+    return client
+
+
+def empty_tables():
+    with app.app_context():
+        for model in (Appointment, AppointmentCount, SlotBooking):
+            model.query.delete()
+        db.session.commit()
+
+
+def book(client, count):
+    for i in range(count):
+        assert client.post("/api/save_appointment", json=appointment(i)).status_code == 200
+
+
+def rows(body):
+    return list(csv.DictReader(io.StringIO(body.decode())))
+
+
+def test_csv_export_and_import_round_trip(transfer_client):
+    client = transfer_client
+    book(client, 5)
+    first = client.get("/api/appointments?limit=1").get_json()["appointments"][0]["id"]
+    set_status(client, first, "cancelled")
+
+    response = client.get("/api/appointments/export")
+    assert response.status_code == 200 and response.mimetype == "text/csv"
+    assert "appointments.csv" in response.headers["Content-Disposition"]
+    exported = rows(response.data)
+    assert [row["patient_email"] for row in exported] == [f"transfer{i}@example.com" for i in range(5)]
+    assert exported[0]["health_issue"] == "Rash, itching" and exported[0]["slot_minute"] == "540"
+    assert rows(client.get("/api/appointments/export?status=cancelled").data)[0]["id"] == str(first)
+    assert client.get("/api/appointments/export?date_from=soon").status_code == 400
+    assert client.get("/api/appointments/export?format=xlsx").status_code == 400
+
+    empty_tables()
+    imported = client.post("/api/appointments/import", data=response.data, content_type="text/csv").get_json()
+    assert (imported["received"], imported["saved"], imported["invalid"]) == (5, 5, 0)
+    again = rows(client.get("/api/appointments/export").data)
+    assert [{k: v for k, v in row.items() if k != "id"} for row in again] == \
+           [{k: v for k, v in row.items() if k != "id"} for row in exported]
+
+    with app.app_context():
+        assert appointment_stats.check() == []
+        # The cancelled appointment came back cancelled and holds no place
+        assert sum(db.session.scalars(db.select(SlotBooking.booked))) == 4
+    # Importing the same file twice only finds duplicates
+    assert client.post("/api/appointments/import", data=response.data,
+                       content_type="text/csv").get_json()["duplicates"] == 5
+
+
+def test_transfer_endpoints_need_the_admin_token(transfer_client):
+    book(transfer_client, 1)
+    anonymous = app.test_client()
+    assert anonymous.get("/api/appointments/export").status_code == 401
+    response = anonymous.post("/api/appointments/import", data=b"name,email\n", content_type="text/csv")
+    assert response.status_code == 401
+
+
+def test_csv_cells_are_not_formulas(transfer_client):
+    client = transfer_client
+    texts = ["=HYPERLINK(\"http://example.com\",\"x\")", "+1 headache", "-", "@SUM(A1)", "'=quoted", "it's fine"]
+    for i, issue in enumerate(texts):
+        assert client.post("/api/save_appointment", json=appointment(i, issue=issue)).status_code == 200
+    exported = client.get("/api/appointments/export").data
+    cells = [row["health_issue"] for row in rows(exported)]
+    assert cells == ["'" + text for text in texts[:5]] + ["it's fine"]
+    assert all(row["patient_phone"] == "'+1234567890" for row in rows(exported))
+
+    # Read back as written
+    empty_tables()
+    assert client.post("/api/appointments/import", data=exported, content_type="text/csv").get_json()["saved"] == 6
+    with app.app_context():
+        assert [a.health_issue for a in Appointment.query.order_by(Appointment.id)] == texts
+        assert {a.patient_phone for a in Appointment.query} == {"+1234567890"}
+
+
+def test_import_reports_invalid_rows(transfer_client):
+    client = transfer_client
+    body = io.StringIO()
+    writer = csv.DictWriter(body, fieldnames=list(appointment(0)) + ["status"])
+    writer.writeheader()
+    writer.writerow(dict(appointment(0), status=""))
+    writer.writerow(dict(appointment(1, email="not-an-email"), status=""))
+    writer.writerow(dict(appointment(2), status="lost"))
+    writer.writerow(dict(appointment(0), status="completed"))  # same slot as the first row
+
+    report = client.post("/api/appointments/import", data=body.getvalue(), content_type="text/csv").get_json()
+    assert report["status"] == "success"
+    assert (report["saved"], report["duplicates"], report["invalid"]) == (1, 1, 2)
+    assert [error["row"] for error in report["errors"]] == [2, 3]
+    assert report["errors"][0]["message"] == "Invalid email format"
+
+    bad = client.post("/api/appointments/import", data=b"\xff\xfe\x00", content_type="text/csv")
+    assert bad.status_code == 400
+
+
+def test_export_reads_in_chunks(transfer_client):
+    book(transfer_client, 5)
+    with app.app_context():
+        chunks = list(appointment_transfer.export_chunks(appointment_transfer.export_statement(), chunk=2))
+    assert [len(rows) for rows in chunks] == [2, 2, 1]
+    assert rows(b"".join(appointment_transfer.encode("csv", iter([])))) == []
+
+
+def test_cli_round_trip(transfer_client, tmp_path):
+    book(transfer_client, 3)
+    runner = app.test_cli_runner()
+    path = tmp_path / "appointments.csv"
+    result = runner.invoke(args=["export-appointments", str(path)])
+    assert result.exit_code == 0 and "3 appointments written" in result.output
+
+    empty_tables()
+    result = runner.invoke(args=["import-appointments", str(path), "--batch-size", "2"])
+    assert result.exit_code == 0 and "3 records: 3 saved" in result.output
+    assert transfer_client.get("/api/appointments/stats").get_json()["total"] == 3
+
+
+def test_parquet_round_trip(transfer_client):
+    pytest.importorskip("pyarrow")
+    client = transfer_client
+    book(client, 4)
+    response = client.get("/api/appointments/export?format=parquet")
+    assert response.status_code == 200 and response.data[:4] == b"PAR1"
+
+    empty_tables()
+    report = client.post("/api/appointments/import", data=response.data,
+                         content_type=appointment_transfer.FORMATS["parquet"]).get_json()
+    assert report["saved"] == 4
+
+
+def test_parquet_without_pyarrow(transfer_client):
+    try:
+        import pyarrow  # noqa: F401
+        pytest.skip("pyarrow is installed")
+    except ImportError:
+        pass
+    client = transfer_client
+    assert client.get("/api/appointments/export?format=parquet").status_code == 501
+    assert client.post("/api/appointments/import?format=parquet", data=b"PAR1").status_code == 501
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for GET /api/appointments
+Keyset pagination, filters and the NDJSON export mode
+"""
+
+import itertools
+import json
+from datetime import date, timedelta
+
+from app import app, db
+from conftest import appointment_payload
+from models import Appointment
+
+_patient_ids = itertools.count()
+
+
+def add_appointments(count, start=date(2025, 1, 1), **overrides):
+    """Insert `count` appointments, one per day starting at `start`."""
+    with app.app_context():
+        for i in range(count):
+            patient = next(_patient_ids)
+            fields = {
+                "patient_name": f"Patient {patient}",
+                "patient_email": f"patient{patient}@example.com",
+                "doctor_type": "General Physician",
+                "appointment_date": start + timedelta(days=i % 10),
+                "appointment_time": "10:00 AM",
+                "status": "confirmed",
+            }
+            fields.update(overrides)
+            db.session.add(Appointment(**fields))
+        db.session.commit()
+
+
+def test_pages_cover_every_row_once(client):
+    add_appointments(25)
+    seen, cursor = [], None
+    while True:
+        url = "/api/appointments?limit=7" + (f"&cursor={cursor}" if cursor else "")
+        data = client.get(url).get_json()
+        assert data["status"] == "success"
+        assert data["count"] <= 7
+        seen.extend(data["appointments"])
+        cursor = data["next_cursor"]
+        if not data["has_more"]:
+            assert cursor is None
+            break
+
+    assert len(seen) == 25
+    assert len({a["id"] for a in seen}) == 25
+    keys = [(a["appointment_date"], a["id"]) for a in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filters(client):
+    add_appointments(6)
+    add_appointments(4, doctor_type="Cardiologist", status="cancelled")
+
+    data = client.get("/api/appointments?doctor_type=Cardiologist").get_json()
+    assert data["count"] == 4
+    assert {a["status"] for a in data["appointments"]} == {"cancelled"}
+
+    data = client.get("/api/appointments?status=confirmed&date_from=2025-01-02&date_to=2025-01-04").get_json()
+    assert [a["appointment_date"] for a in data["appointments"]] == ["2025-01-04", "2025-01-03", "2025-01-02"]
+
+
+def test_bad_parameters_are_rejected(client):
+    assert client.get("/api/appointments?cursor=not-a-cursor").status_code == 400
+    assert client.get("/api/appointments?limit=0").status_code == 400
+    for limit in ("ten", "1.5", ""):
+        response = client.get(f"/api/appointments?limit={limit}")
+        assert response.status_code == 400
+        assert response.get_json()["message"] == "limit must be a positive integer"
+    assert client.get("/api/appointments?date_from=01/02/2025").status_code == 400
+
+
+def test_ndjson_export_streams_all_rows(client):
+    add_appointments(1205)
+    response = client.get("/api/appointments?format=ndjson&status=confirmed")
+    assert response.mimetype == "application/x-ndjson"
+    assert response.is_streamed
+
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(rows) == 1205
+    assert len({r["id"] for r in rows}) == 1205
+
+
+def test_duplicate_booking_is_rejected_by_the_database(client):
+    payload = appointment_payload(email="Dup@Example.com", appointment_time="10:00 AM")
+    assert client.post("/api/save_appointment", json=payload).status_code == 200
+    payload["email"] = "dup@example.com"
+    response = client.post("/api/save_appointment", json=payload)
+    assert response.status_code == 409
+    with app.app_context():
+        assert Appointment.query.count() == 1
+
+
+def test_two_spellings_of_one_time_are_one_booking(client):
+    payload = appointment_payload(prefix="spelling", appointment_time="10:00 AM")
+    assert client.post("/api/save_appointment", json=payload).status_code == 200
+    assert client.post("/api/save_appointment", json=dict(payload, appointment_time="10:00")).status_code == 409
+    bulk = client.post("/api/save_appointments/bulk", json=[
+        dict(payload, appointment_time="10:00"),
+        dict(payload, appointment_time="2:30 PM"),
+        dict(payload, appointment_time="14:30"),
+    ]).get_json()
+    assert [result["status"] for result in bulk["results"]] == ["duplicate", "success", "duplicate"]
+    with app.app_context():
+        assert Appointment.query.count() == 2
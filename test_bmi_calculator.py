@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorized BMI/BMR/TDEE calculator and /api/bmi/batch
+"""
+
+import csv
+import io
+import random
+
+import numpy as np
+
+import bmi_calculator
+from bmi_calculator import compute_metrics, single_result, ACTIVITY_FACTORS
+from conftest import login
+
+
+def legacy_metrics(height_cm, weight_kg, waist_cm, age, sex, activity):
+    """Scalar formulas as the /bmi view used to compute them."""
+    h_m = height_cm / 100.0
+    bmi_val = weight_kg / (h_m * h_m)
+    if bmi_val < 18.5:
+        bmi_cat = "Underweight"
+    elif bmi_val < 25:
+        bmi_cat = "Normal"
+    elif bmi_val < 30:
+        bmi_cat = "Overweight"
+    else:
+        bmi_cat = "Obesity"
+
+    whtr = round((waist_cm / height_cm), 2) if waist_cm > 0 else None
+    whtr_cat = None
+    if whtr is not None:
+        if whtr < 0.4:
+            whtr_cat = "Low (possible under-fat)"
+        elif whtr < 0.5:
+            whtr_cat = "Healthy"
+        elif whtr < 0.6:
+            whtr_cat = "Increased risk"
+        else:
+            whtr_cat = "High risk"
+
+    if sex == "male":
+        bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age + 5
+    else:
+        bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age - 161
+    tdee = bmr * ACTIVITY_FACTORS.get(activity, 1.55)
+    return {"bmi": round(bmi_val, 1), "bmi_cat": bmi_cat, "whtr": whtr, "whtr_cat": whtr_cat,
+            "bmr": int(round(bmr)), "tdee": int(round(tdee))}
+
+
+def random_person(rng):
+    return (round(rng.uniform(140, 200), 1), round(rng.uniform(35, 150), 1),
+            rng.choice([0, round(rng.uniform(55, 130), 1)]), rng.randint(15, 90),
+            rng.choice(["male", "female"]), rng.choice(list(ACTIVITY_FACTORS) + ["unknown"]))
+
+
+def test_single_result_matches_the_legacy_view():
+    rng = random.Random(7)
+    for _ in range(2000):
+        person = random_person(rng)
+        result = single_result(*person)
+        expected = legacy_metrics(*person)
+        assert {k: result[k] for k in expected} == expected
+        assert result["poses"] == bmi_calculator.YOGA_SUGGESTIONS[expected["bmi_cat"]]
+
+
+def test_cohort_matches_rows_and_flags_invalid_rows():
+    rng = random.Random(8)
+    people = [random_person(rng) for _ in range(500)]
+    people += [(0, 70, 80, 30, "male", "light"), (170, 70, 80, 30, "other", "light"),
+               (float("nan"), 70, 0, 30, "female", "light")]
+    metrics = compute_metrics(*map(list, zip(*people)))
+
+    assert metrics["valid"].tolist() == [True] * 500 + [False] * 3
+    assert np.isnan(metrics["bmi"][-3:]).all() and metrics["bmi_cat"][-1] == ""
+    rows = bmi_calculator.metrics_to_json(metrics)
+    for i, person in enumerate(people[:500]):
+        expected = legacy_metrics(*person)
+        assert {k: rows[k][i] for k in expected} == expected
+    assert rows["bmr"][-1] is None and rows["whtr_cat"][-1] is None
+
+
+def test_bmi_page_renders_result(client):
+    login(client)
+    page = client.post("/bmi", data={"height_cm": "175", "weight_kg": "70", "waist_cm": "80",
+                                     "age": "30", "sex": "male", "activity": "light"})
+    assert page.status_code == 200
+    assert "Normal" in page.get_data(as_text=True)
+
+
+def test_batch_api_json_columns_and_rows(client):
+    columns = {"height_cm": [175, 160, 0], "weight_kg": [70, 90, 60], "waist_cm": [80, None, 70],
+               "age": [30, 45, 20], "sex": ["male", "Female", "male"]}
+    data = client.post("/api/bmi/batch", json=columns).get_json()
+    assert data["count"] == 3 and data["invalid"] == 1
+    assert data["results"]["bmi_cat"] == ["Normal", "Obesity", None]
+    assert data["results"]["tdee"][0] == legacy_metrics(175, 70, 80, 30, "male", "moderate")["tdee"]
+
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    assert client.post("/api/bmi/batch", json=rows).get_json()["results"] == data["results"]
+
+    columns["age"] = [30]
+    assert client.post("/api/bmi/batch", json=columns).status_code == 400
+    assert client.post("/api/bmi/batch", data="nope", content_type="text/plain").status_code == 400
+
+
+def test_batch_api_rejects_json_of_the_wrong_shape(client):
+    # One person as scalars instead of columns, and rows that are not objects
+    for body in ({"weight_kg": 70, "height_cm": 170}, [1, 2], [{"height_cm": 170}, "row"]):
+        response = client.post("/api/bmi/batch", json=body)
+        assert response.status_code == 400 and response.get_json()["status"] == "error"
+
+
+def test_batch_api_csv_upload_streams_csv(client):
+    body = "height_cm,weight_kg,waist_cm,age,sex,activity\n175,70,80,30,male,active\n150,,,40,female,\n"
+    response = client.post("/api/bmi/batch", data={"file": (io.BytesIO(body.encode()), "cohort.csv")},
+                           content_type="multipart/form-data")
+    assert response.mimetype == "text/csv"
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row["valid"] for row in rows] == ["1", "0"]
+    assert rows[0]["tdee"] == str(legacy_metrics(175, 70, 80, 30, "male", "active")["tdee"])
+    assert rows[1]["bmi"] == ""
+
+    as_json = client.post("/api/bmi/batch?format=json", data=body, content_type="text/csv").get_json()
+    assert as_json["results"]["valid"] == [True, False]
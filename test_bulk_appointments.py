@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for POST /api/save_appointments/bulk
+JSON array and NDJSON bodies, per-item results and duplicate handling
+"""
+
+import json
+from functools import partial
+
+import blueprints.appointments
+from app import app, db
+from conftest import appointment_payload
+from models import Appointment
+
+
+appointment = partial(appointment_payload, prefix="bulk", appointment_date="2025-02-01",
+                      appointment_time="10:00 AM")
+
+
+def test_bulk_json_array_reports_each_item(client):
+    assert client.post("/api/save_appointment", json=appointment(0)).status_code == 200
+
+    items = [
+        appointment(0),                          # already booked
+        appointment(1),
+        appointment(2),
+        appointment(2),                          # duplicate within the batch
+        appointment(3, email="not-an-email"),
+        {"name": "Only a name"},
+    ]
+    response = client.post("/api/save_appointments/bulk", json=items)
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert (data["received"], data["saved"], data["duplicates"], data["invalid"]) == (6, 2, 2, 2)
+    statuses = [r["status"] for r in data["results"]]
+    assert statuses == ["duplicate", "success", "success", "duplicate", "error", "error"]
+    assert [r["index"] for r in data["results"]] == list(range(6))
+    assert "missing_fields" in data["results"][5]
+
+    with app.app_context():
+        assert Appointment.query.count() == 3
+        saved = db.session.get(Appointment, data["results"][1]["appointment_id"])
+        assert saved.patient_email == "bulk1@example.com"
+        assert saved.status == "confirmed"
+
+
+def test_bulk_ndjson_body(client):
+    body = "\n".join(json.dumps(appointment(i, appointment_time="11:30")) for i in range(50)) + "\n"
+    response = client.post("/api/save_appointments/bulk", data=body, content_type="application/x-ndjson")
+    data = response.get_json()
+    assert data["saved"] == 50
+    with app.app_context():
+        assert Appointment.query.count() == 50
+
+
+def test_bulk_rejects_non_array_body(client):
+    response = client.post("/api/save_appointments/bulk", json={"name": "x"})
+    assert response.status_code == 400
+
+
+def test_slot_booked_after_the_lookup_is_rechecked(client, monkeypatch):
+    assert client.post("/api/save_appointment", json=appointment(0)).status_code == 200
+    lookup = blueprints.appointments.find_booked_slots
+    calls = []
+
+    def stale_lookup(keys):
+        # The first lookup misses appointment 0, as if it was booked just after
+        calls.append(keys)
+        return set() if len(calls) == 1 else lookup(keys)
+
+    monkeypatch.setattr(blueprints.appointments, "find_booked_slots", stale_lookup)
+    data = client.post("/api/save_appointments/bulk", json=[appointment(0), appointment(1)]).get_json()
+    assert len(calls) == 2
+    assert [result["status"] for result in data["results"]] == ["duplicate", "success"]
+    with app.app_context():
+        assert Appointment.query.count() == 2
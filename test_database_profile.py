@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for database selection and the engine profiles in database.py
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app import app, db
+from database import resolve_database_uri, server_options
+
+sqlite_production = pytest.mark.skipif(
+    app.config["DB_PROFILE"] != "production" or not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"),
+    reason="production SQLite profile not active")
+
+
+def pragma(name):
+    with app.app_context():
+        return db.session.execute(text(f"PRAGMA {name}")).scalar()
+
+
+@sqlite_production
+def test_production_profile_is_applied_on_connect():
+    assert pragma("journal_mode") == "wal"
+    assert pragma("synchronous") == 1          # NORMAL
+    assert pragma("busy_timeout") == 5000
+    assert pragma("cache_size") == -64 * 1024
+
+
+@sqlite_production
+def test_pool_is_sized():
+    with app.app_context():
+        assert db.engine.pool.size() == 10
+
+
+def test_database_url_selection(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgres://u:p@db.example.com/health")
+    assert resolve_database_uri("/srv/instance").endswith("://u:p@db.example.com/health")
+    assert resolve_database_uri("/srv/instance").startswith("postgresql+psycopg")
+
+    monkeypatch.delenv("DATABASE_URL")
+    monkeypatch.delenv("VERCEL", raising=False)
+    assert resolve_database_uri("/srv/instance") == "sqlite:////srv/instance/users.db"
+
+    monkeypatch.setenv("VERCEL", "1")
+    assert resolve_database_uri("/tmp") == "sqlite:////tmp/users.db"
+
+
+def test_server_engine_options(monkeypatch):
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "2500")
+    options = server_options("postgresql://db.example.com/health")
+    assert options["pool_pre_ping"] is True
+    assert options["pool_size"] == 10
+    assert options["connect_args"]["options"] == "-c statement_timeout=2500"
+    assert "connect_args" not in server_options("mysql://db.example.com/health")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the typo-tolerant condition search and the routes that fall back to it
+"""
+
+import random
+import string
+
+from conftest import login
+from fuzzy_search import FuzzyIndex, edit_distance, conditions_index, closest_disease
+from yoga_suggestions import suggest_yoga, find_conditions, YOGA_CONDITIONS
+
+
+def reference_distance(a, b):
+    """Plain optimal string alignment distance."""
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+
+def typo(rng, word, edits):
+    letters = list(word)
+    for _ in range(edits):
+        i = rng.randrange(len(letters))
+        op = rng.choice("ids")
+        if op == "i":
+            letters.insert(i, rng.choice(string.ascii_lowercase))
+        elif op == "d" and len(letters) > 1:
+            del letters[i]
+        else:
+            letters[i] = rng.choice(string.ascii_lowercase)
+    return "".join(letters)
+
+
+def test_bounded_edit_distance():
+    rng = random.Random(1)
+    for _ in range(2000):
+        a = "".join(rng.choice("abcde") for _ in range(rng.randint(0, 8)))
+        b = "".join(rng.choice("abcde") for _ in range(rng.randint(0, 8)))
+        expected = reference_distance(a, b)
+        assert edit_distance(a, b, 2) == min(expected, 3)
+    assert edit_distance("diabetes", "diabetse", 1) == 1
+
+
+def test_index_finds_every_term_a_full_scan_finds():
+    rng = random.Random(2)
+    vocabulary = {"".join(rng.choice("abcdefghijkl") for _ in range(rng.randint(4, 12))): None for _ in range(1500)}
+    index = FuzzyIndex(vocabulary)
+    for _ in range(100):
+        query = typo(rng, rng.choice(list(vocabulary)), rng.randint(0, 2))
+        k = 2
+        # edit_distance itself is checked against the reference above
+        expected = sorted(term for term in vocabulary if edit_distance(query, term, k) <= k)
+        found = sorted(term for term, _, _ in index.search(query, limit=len(vocabulary), max_distance=k))
+        assert found == expected
+
+
+def test_conditions_index_ranks_closest_first():
+    assert conditions_index.search("astma")[0][0] == "asthma"
+    assert closest_disease("diabetis") == ("diabetic", "diabetes")
+    assert closest_disease("hedache")[1] == "headache"
+    assert closest_disease("zzz") is None
+    assert conditions_index.search("flu", max_distance=0)[0][2] == 0
+
+
+def test_suggest_yoga_tolerates_typos():
+    assert suggest_yoga("my diabetis is acting up") == YOGA_CONDITIONS["diabetes"]
+    assert suggest_yoga("I told my doctor") != YOGA_CONDITIONS["cold"]
+
+
+def test_everyday_words_are_not_typos():
+    for word in ("could", "gold", "cola", "never", "fewer", "lever", "rough", "pension"):
+        assert closest_disease(word) is None, word
+    assert find_conditions("I could never sleep well") == ([], True)
+    assert find_conditions("fewer than seven") == ([], True)
+    # Short words match exactly or not at all; real typos still match
+    assert closest_disease("fevr") is None and closest_disease("fever")[1] == "fever"
+    assert find_conditions("my diabetis is worse") == (["diabetes"], True)
+
+
+def test_routes_fall_back_to_fuzzy_matches(client):
+    login(client, "fuzzy@example.com")
+    page = client.post("/allopathic", data={"disease": "diabetis"}).get_data(as_text=True)
+    assert "Metformin 500 mg" in page and "Showing results for" in page
+    assert "Karela juice" in client.post("/ayurvedic", data={"disease": "diabetis"}).get_data(as_text=True)
+    page = client.post("/yoga", data={"disease": "astma"}).get_data(as_text=True)
+    assert 'Showing results for "asthma"' in page
+    assert "Showing results for" not in client.post("/yoga", data={"disease": "asthma"}).get_data(as_text=True)
+
+    data = client.get("/api/conditions/search?q=migrane&limit=3").get_json()
+    assert data["results"][0]["term"] == "migraine"
+    assert {"kind": "yoga", "key": "headache"} in data["results"][0]["targets"]
+    assert client.get("/api/conditions/search?q=x&limit=abc").status_code == 400
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for Idempotency-Key handling on POST /api/save_appointment
+Replays from the LRU and from the database, key reuse, released claims and
+parallel duplicate submissions
+"""
+
+import threading
+import time
+from functools import partial
+
+import pytest
+
+import blueprints.appointments
+from app import app, db
+from conftest import appointment_payload
+from models import Appointment, IdempotencyKey
+
+
+appointment = partial(appointment_payload, prefix="retry", appointment_time="09:30")
+
+
+@pytest.fixture
+def store(client):
+    store = app.extensions["idempotency"]
+    store.clear()
+    with app.app_context():
+        IdempotencyKey.query.delete()
+        db.session.commit()
+    return store
+
+
+def post(client, key, data):
+    return client.post("/api/save_appointment", json=data, headers={"Idempotency-Key": key})
+
+
+def test_replay_skips_validation_and_the_appointments_table(client, store, monkeypatch):
+    first = post(client, "key-1", appointment())
+    assert first.status_code == 200 and "Idempotent-Replayed" not in first.headers
+
+    def fail(data):
+        raise AssertionError("validation ran for a replayed key")
+    monkeypatch.setattr(blueprints.appointments, "validate_appointment_data", fail)
+
+    # From the in-process LRU
+    replay = post(client, "key-1", appointment())
+    assert replay.status_code == 200 and replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.get_json() == first.get_json()
+    assert store.hits == 1
+
+    # From idempotency_keys, as another worker would see it
+    store.clear()
+    replay = post(client, "key-1", appointment())
+    assert replay.status_code == 200 and replay.get_json() == first.get_json()
+    with app.app_context():
+        assert Appointment.query.count() == 1
+
+
+def test_key_reuse_with_another_body_is_rejected(client, store):
+    assert post(client, "key-2", appointment()).status_code == 200
+    assert post(client, "key-2", appointment(appointment_time="10:30")).status_code == 422
+    store.clear()
+    assert post(client, "key-2", appointment(appointment_time="10:30")).status_code == 422
+    assert post(client, "", appointment()).status_code == 400
+
+
+def test_client_errors_are_stored_and_server_errors_released(client, store, monkeypatch):
+    invalid = appointment(email="not-an-email")
+    assert post(client, "key-3", invalid).status_code == 400
+    assert post(client, "key-3", invalid).headers["Idempotent-Replayed"] == "true"
+
+    real_validate = blueprints.appointments.validate_appointment_data
+
+    def broken(data):
+        raise RuntimeError("database went away")
+    monkeypatch.setattr(blueprints.appointments, "validate_appointment_data", broken)
+    assert post(client, "key-4", appointment()).status_code == 500
+    monkeypatch.setattr(blueprints.appointments, "validate_appointment_data", real_validate)
+    retried = post(client, "key-4", appointment())
+    assert retried.status_code == 200 and "Idempotent-Replayed" not in retried.headers
+
+
+def test_abandoned_claim_is_taken_over(client, store):
+    with app.app_context():
+        db.session.add(IdempotencyKey(scope="appointments.save_appointment", key="key-5", fingerprint="x",
+                                      created_at=time.time() - store.lock_timeout - 1))
+        db.session.commit()
+    response = post(client, "key-5", appointment())
+    assert response.status_code == 200 and "Idempotent-Replayed" not in response.headers
+
+
+def test_requests_without_a_key_are_unchanged(client, store):
+    assert client.post("/api/save_appointment", json=appointment()).status_code == 200
+    assert client.post("/api/save_appointment", json=appointment()).status_code == 409
+    assert len(store) == 0
+
+
+def test_parallel_duplicates_insert_once(client, store, monkeypatch):
+    real_validate = blueprints.appointments.validate_appointment_data
+
+    def slow_validate(data):
+        time.sleep(0.05)  # keep the winner in flight while the others arrive
+        return real_validate(data)
+    monkeypatch.setattr(blueprints.appointments, "validate_appointment_data", slow_validate)
+
+    threads = 8
+    barrier = threading.Barrier(threads)
+    responses = [None] * threads
+
+    def submit(i):
+        test_client = app.test_client()
+        barrier.wait()
+        responses[i] = post(test_client, "key-parallel", appointment())
+
+    pool = [threading.Thread(target=submit, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    assert [r.status_code for r in responses] == [200] * threads
+    assert sum("Idempotent-Replayed" not in r.headers for r in responses) == 1
+    assert len({r.get_json()["appointment_id"] for r in responses}) == 1
+    with app.app_context():
+        assert Appointment.query.count() == 1
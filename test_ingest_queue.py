@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the async mode of POST /api/save_appointment and the durable ingest queue
+"""
+
+from functools import partial
+
+from flask import Flask
+
+from app import app, db
+from conftest import appointment_payload
+from ingest_queue import IngestQueue
+from models import Appointment
+
+
+appointment = partial(appointment_payload, prefix="queued", appointment_date="2025-04-01",
+                      appointment_time="14:00")
+
+
+def test_async_save_returns_a_ticket_and_saves_in_the_background(client):
+    response = client.post("/api/save_appointment?mode=async", json=appointment(1))
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body["status"] == "accepted" and response.headers["Location"] == body["status_url"]
+
+    assert app.extensions["ingest_queue"].wait_idle()
+    status = client.get(body["status_url"]).get_json()
+    assert status["state"] == "saved"
+    with app.app_context():
+        saved = db.session.get(Appointment, status["appointment_id"])
+        assert saved.patient_email == "queued1@example.com"
+
+
+def test_async_duplicates_and_invalid_payloads(client):
+    prefer = {"Prefer": "respond-async"}
+    tickets = [client.post("/api/save_appointment", json=appointment(2), headers=prefer).get_json()["ticket"]
+               for _ in range(2)]
+    # Validation still runs inline, so a bad payload never gets a ticket
+    invalid = client.post("/api/save_appointment", json=appointment(3, email="nope"), headers=prefer)
+    assert invalid.status_code == 400 and "ticket" not in invalid.get_json()
+
+    assert app.extensions["ingest_queue"].wait_idle()
+    states = sorted(client.get(f"/api/appointments/ingest/{ticket}").get_json()["state"] for ticket in tickets)
+    assert states == ["duplicate", "saved"]
+    assert client.get("/api/appointments/ingest/no-such-ticket").status_code == 404
+    with app.app_context():
+        assert Appointment.query.filter_by(patient_email="queued2@example.com").count() == 1
+
+
+def make_queue(tmp_path, process, **options):
+    options = {"workers": 2, "batch_size": 10, "poll_ms": 10, **options}
+    return IngestQueue(Flask(__name__), str(tmp_path / "queue.db"), process, **options)
+
+
+def saved_all(payloads):
+    return [{"state": "saved", "appointment_id": payload["n"]} for payload in payloads]
+
+
+def test_tickets_survive_a_restart(tmp_path):
+    stopped = make_queue(tmp_path, saved_all)
+    stopped.close()  # a queue that was shut down still accepts tickets, but never drains them
+    tickets = [stopped.enqueue({"n": n}) for n in range(25)]
+    assert stopped.status(tickets[0])["state"] == "queued"
+
+    batches = []
+
+    def process(payloads):
+        batches.append(len(payloads))
+        return saved_all(payloads)
+
+    restarted = make_queue(tmp_path, process)
+    restarted.start()
+    assert restarted.wait_idle()
+    assert [restarted.status(t)["appointment_id"] for t in tickets] == list(range(25))
+    assert sum(batches) == 25 and max(batches) <= 10
+    assert restarted.metrics()["tickets"]["saved"] == 25
+    restarted.close()
+
+
+def test_failed_batches_are_retried_then_marked_as_errors(tmp_path):
+    calls = []
+
+    def flaky(payloads):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return saved_all(payloads)
+
+    queue = make_queue(tmp_path, flaky, workers=1)
+    ticket = queue.enqueue({"n": 7})
+    assert queue.wait_idle()
+    assert queue.status(ticket)["state"] == "saved" and queue.status(ticket)["attempts"] == 2
+    queue.close()
+
+    def broken(payloads):
+        raise RuntimeError("database is gone")
+
+    queue = make_queue(tmp_path, broken, workers=1, max_attempts=2)
+    ticket = queue.enqueue({"n": 8})
+    assert queue.wait_idle()
+    status = queue.status(ticket)
+    assert status["state"] == "error" and "database is gone" in status["message"]
+    queue.close()
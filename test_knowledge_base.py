@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled knowledge base and the pages that read it
+"""
+
+import dataclasses
+import json
+
+import pytest
+
+from conftest import login
+from knowledge_base import kb, KnowledgeBase, load_knowledge_base, normalize, DEFAULT_PATH
+
+
+def kb_data():
+    with open(DEFAULT_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_records_are_frozen_and_slotted():
+    pose = kb.poses["Padmasana"]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        pose.name = "changed"
+    assert not hasattr(pose, "__dict__")
+    assert isinstance(pose.benefits, tuple)
+    with pytest.raises(TypeError):
+        kb.medicines["x"] = None
+
+
+def test_alias_lookups():
+    assert normalize("  Lower-Back   PAIN! ") == "lower back pain"
+    assert kb.allopathic("Lower back pain").medicine == "ibuprofen"
+    assert kb.allopathic("FEVER").text.startswith("Paracetamol")
+    assert kb.ayurvedic("diabetic") == kb.ayurvedic("diabetes")
+    assert kb.allopathic("sprained wrist") is None
+
+    assert kb.medicine("Acetaminophen").key == "paracetamol"
+    assert kb.medicine("Withania Somnifera").key == "ashwagandha"
+    assert kb.pose("Padmasana (Lotus Pose)").key == "Padmasana"
+    assert kb.pose("lotus pose").key == "Padmasana"
+    assert kb.pose("Marjaryasana-Bitilasana (Cat–Cow)").key == "Marjaryasana-Bitilasana"
+
+
+def test_loader_checks_schema_and_references(tmp_path):
+    data = kb_data()
+    data["version"] = "test-2"
+    path = tmp_path / "kb.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    assert load_knowledge_base(str(path)).version == "test-2"
+
+    with pytest.raises(ValueError):
+        KnowledgeBase(dict(data, schema=99))
+    data["diseases"]["fever"]["allopathic"]["medicine"] = "missing"
+    with pytest.raises(ValueError):
+        KnowledgeBase(data)
+
+
+def test_pages_use_the_knowledge_base(client):
+    login(client, "kb@example.com")
+    page = client.post("/allopathic", data={"disease": "Backache"}).get_data(as_text=True)
+    assert "Ibuprofen 400 mg" in page
+    assert "Mahanarayan" in client.post("/ayurvedic", data={"disease": "lower back pain"}).get_data(as_text=True)
+    assert "Acetaminophen" in client.get("/medicine/acetaminophen").get_data(as_text=True)
+    assert "Lotus Pose" in client.get("/yoga/Padmasana").get_data(as_text=True)
+    assert client.get("/yoga/Unknown").status_code == 302
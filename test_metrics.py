@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tests for request metrics and the /api/metrics endpoint
+"""
+
+import re
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+from conftest import make_app
+from metrics import RequestMetrics, instrument_engine
+
+
+def scrape(client):
+    """Prometheus text -> {(metric name, frozenset of labels): value}"""
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.get_data(as_text=True).splitlines():
+        if line.startswith("#"):
+            continue
+        match = re.fullmatch(r'(\w+)(?:\{(.*)\})? (\S+)', line)
+        assert match, line
+        labels = frozenset(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ""))
+        samples[(match.group(1), labels)] = float(match.group(3))
+    return samples
+
+
+def labels(endpoint, method="GET", status=200, **extra):
+    return frozenset({"endpoint": endpoint, "method": method, "status": str(status),
+                      **{k: str(v) for k, v in extra.items()}}.items())
+
+
+def test_latency_size_and_queries_per_endpoint(tmp_path):
+    app = make_app(tmp_path)
+    client = app.test_client()
+    client.get("/login_register")  # the first request also runs the schema check
+    for _ in range(3):
+        assert client.get("/api/health").status_code == 200
+    client.get("/no/such/page")
+    samples = scrape(client)
+
+    health = labels("api.health_check")
+    assert samples[("http_request_duration_seconds_count", health)] == 3
+    assert samples[("http_request_duration_seconds_bucket", labels("api.health_check", le="+Inf"))] == 3
+    assert samples[("http_request_duration_seconds_sum", health)] > 0
+    assert samples[("http_response_size_bytes_count", health)] == 3
+    assert samples[("http_response_size_bytes_sum", health)] > 0
+    # SELECT 1 per health check
+    assert samples[("db_queries_total", health)] == 3
+    assert samples[("db_query_seconds_total", health)] > 0
+    assert samples[("http_request_duration_seconds_count", labels("<unmatched>", status=404))] == 1
+    # Only the scrape itself is in flight
+    assert samples[("http_requests_in_flight", frozenset())] == 1
+
+
+def test_concurrent_requests_are_all_counted(tmp_path):
+    app = make_app(tmp_path)
+    threads, per_thread = 8, 100
+
+    def worker():
+        client = app.test_client()
+        for _ in range(per_thread):
+            client.get("/login_register")
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    samples = scrape(app.test_client())
+    assert samples[("http_request_duration_seconds_count", labels("auth.login_register"))] == threads * per_thread
+    assert samples[("http_requests_in_flight", frozenset())] == 1
+
+
+def test_shards_of_exited_threads_are_retired(tmp_path):
+    app = make_app(tmp_path)
+    metrics = app.extensions["metrics"]
+    app.test_client().get("/login_register")  # schema check
+    threads = 200
+
+    # One short-lived thread per request, as on a thread-per-request server
+    for _ in range(threads):
+        thread = threading.Thread(target=lambda: app.test_client().get("/api/health"))
+        thread.start()
+        thread.join()
+
+    assert metrics.live_shards <= 2  # this thread's, and none left over from the workers
+    samples = scrape(app.test_client())
+    assert samples[("http_request_duration_seconds_count", labels("api.health_check"))] == threads
+    assert samples[("db_queries_total", labels("api.health_check"))] == threads
+    assert samples[("http_requests_in_flight", frozenset())] == 1
+
+
+def test_in_flight_gauge(tmp_path):
+    app = make_app(tmp_path)
+    entered, release = threading.Event(), threading.Event()
+
+    @app.route("/test/slow")
+    def slow():
+        entered.set()
+        release.wait(5)
+        return "done"
+
+    thread = threading.Thread(target=lambda: app.test_client().get("/test/slow"))
+    thread.start()
+    try:
+        assert entered.wait(5)
+        assert scrape(app.test_client())[("http_requests_in_flight", frozenset())] == 2
+    finally:
+        release.set()
+        thread.join()
+    assert scrape(app.test_client())[("http_requests_in_flight", frozenset())] == 1
+
+
+def test_background_queries_and_disabled_endpoint(tmp_path):
+    app = make_app(tmp_path)
+    from models import db
+    with app.app_context():
+        db.session.execute(text("SELECT 1"))
+        db.session.rollback()
+    assert scrape(app.test_client())[("db_queries_total", frozenset({("endpoint", "<background>")}))] >= 1
+
+    disabled = make_app(tmp_path, METRICS_ENABLED=False)
+    assert "metrics" not in disabled.extensions
+    assert disabled.test_client().get("/api/metrics").status_code == 404
+
+
+def best_per_call(func, calls, rounds=7):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, (time.perf_counter() - started) / calls)
+    return best
+
+
+def best_difference(func, reference, calls, rounds=15):
+    """How much slower func is than reference, from interleaved rounds so both see the same machine load."""
+    best, best_reference = float("inf"), float("inf")
+    for _ in range(rounds):
+        best_reference = min(best_reference, best_per_call(reference, calls, rounds=1))
+        best = min(best, best_per_call(func, calls, rounds=1))
+    return max(0.0, best - best_reference)
+
+
+def test_overhead_stays_below_five_percent(tmp_path):
+    # Timed piece by piece: whole-request A/B timings swing by more than the overhead itself.
+    # Cost of recording one request with one query, against a request on an app without metrics.
+    baseline_client = make_app(tmp_path, METRICS_ENABLED=False).test_client()
+    request_seconds = best_per_call(lambda: baseline_client.get("/login_register"), 200)
+
+    recorder = RequestMetrics()
+
+    def record():
+        recorder.request_started()
+        recorder.query_executed(0.0001)
+        recorder.request_finished("auth.login_register", "GET", 200, 5120)
+        recorder.request_closed()
+
+    recorder_seconds = best_per_call(record, 2000)
+
+    # What the execute listeners add to one statement
+    plain = create_engine(f"sqlite:///{tmp_path / 'plain.db'}")
+    timed = create_engine(f"sqlite:///{tmp_path / 'timed.db'}")
+    instrument_engine(timed, RequestMetrics())
+    with plain.connect() as plain_conn, timed.connect() as timed_conn:
+        listener_seconds = best_difference(lambda: timed_conn.execute(text("SELECT 1")),
+                                           lambda: plain_conn.execute(text("SELECT 1")), 1000)
+
+    overhead = (recorder_seconds + listener_seconds) / request_seconds
+    assert overhead < 0.05, (f"{overhead:.1%}: recorder {recorder_seconds * 1e6:.1f}us, "
+                             f"listeners {listener_seconds * 1e6:.1f}us, request {request_seconds * 1e6:.1f}us")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for ETag / 304 handling and the rendered-page LRU on knowledge pages
+"""
+
+import json
+import os
+
+from conftest import login
+from knowledge_base import kb, load_knowledge_base, refresh_if_changed, DEFAULT_PATH
+from lazy import LazyObject
+from page_cache import PageCache
+
+
+def test_conditional_get_returns_304(client):
+    login(client)
+    first = client.get("/yoga/Padmasana")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert "max-age" in first.headers["Cache-Control"] and "Cookie" in first.headers["Vary"]
+
+    again = client.get("/yoga/Padmasana", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.get_data() == b""
+    assert again.headers["ETag"] == etag
+
+    # An alias resolves to the same page and ETag
+    assert client.get("/yoga/lotus pose").headers["ETag"] == etag
+    assert client.get("/medicine/paracetamol").headers["ETag"] != etag
+
+
+def test_rendered_html_is_reused_until_the_version_changes(client, monkeypatch):
+    from app import app
+    login(client)
+    cache = app.extensions["knowledge_pages"]
+    body = client.get("/medicine/ibuprofen").get_data()
+    hits = cache.hits
+    assert client.get("/medicine/Brufen").get_data() == body
+    assert cache.hits == hits + 1
+
+    etag = client.get("/medicine/ibuprofen").headers["ETag"]
+    monkeypatch.setattr(kb, "version", "test-next")
+    fresh = client.get("/medicine/ibuprofen", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != etag
+    assert len(cache) == 1
+
+
+def test_lru_evicts_least_recently_used():
+    cache = PageCache(max_entries=2)
+    renders = []
+    render = lambda key: (lambda: renders.append(key) or f"<p>{key}</p>")
+    for key in ("a", "b", "a", "c", "a", "b"):
+        cache.get_or_render("v1", key, render(key))
+    assert renders == ["a", "b", "c", "b"]
+    cache.get_or_render("v2", "a", render("a"))
+    assert renders[-1] == "a" and len(cache) == 1
+
+
+def test_knowledge_base_reloads_when_the_file_changes(tmp_path):
+    with open(DEFAULT_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    path = tmp_path / "kb.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    local = LazyObject(lambda: load_knowledge_base(str(path)))
+    assert refresh_if_changed(local, interval=0) is False
+    before, fingerprint = local._target, local.fingerprint
+
+    data["version"] = "reloaded"
+    data["poses"]["Padmasana"]["duration"] = "1 minute"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, (1, 1))
+    assert refresh_if_changed(local, interval=0) is True
+    assert local.version == "reloaded" and local.pose("lotus pose").duration == "1 minute"
+    # Swapped whole: a request still holding the old object sees all of the old content
+    assert local._target is not before and before.version != "reloaded"
+    assert before.pose("lotus pose").duration != "1 minute"
+
+    # An edit that keeps the version still changes the fingerprint
+    data["poses"]["Padmasana"]["duration"] = "2 minutes"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, (1, 1))  # same mtime, the size differs
+    assert refresh_if_changed(local, interval=0) is True
+    assert local.version == "reloaded" and local.fingerprint not in (fingerprint, before.fingerprint)
+
+    path.write_text("{broken", encoding="utf-8")
+    os.utime(path, (2, 2))
+    assert refresh_if_changed(local, interval=0) is False
+    assert local.version == "reloaded"
+
+
+def test_etag_follows_content_without_a_version_bump(client, monkeypatch):
+    login(client)
+    etag = client.get("/medicine/ibuprofen").headers["ETag"]
+    monkeypatch.setattr(kb, "fingerprint", "edited")
+    fresh = client.get("/medicine/ibuprofen", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != etag
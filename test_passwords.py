@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the password hashing policy, rehash-on-login and the hashing pool
+"""
+
+import threading
+
+import pytest
+
+import passwords
+from app import app, db
+from models import User
+
+
+@pytest.fixture
+def cheap_policy():
+    saved_policy, saved_pool = passwords.policy, passwords.pool
+    passwords.configure("pbkdf2:sha256", 1000)
+    yield
+    passwords.policy, passwords.pool = saved_policy, saved_pool
+
+
+def login(client, email, password):
+    return client.post("/login_register", data={"action": "login", "email": email, "password": password})
+
+
+def test_policy_method_strings():
+    assert passwords.PasswordPolicy("scrypt", 16384).method == "scrypt:16384:8:1"
+    assert passwords.PasswordPolicy("pbkdf2", 1000).method == "pbkdf2:sha256:1000"
+    with pytest.raises(ValueError):
+        passwords.PasswordPolicy("md5")
+
+
+def test_login_rehashes_under_a_new_policy(client, cheap_policy):
+    with app.app_context():
+        User.query.filter_by(email="rehash@example.com").delete()
+        user = User(email="rehash@example.com")
+        user.set_password("s3cret")
+        db.session.add(user)
+        db.session.commit()
+
+    passwords.configure("pbkdf2:sha256", 2000)
+    assert login(client, "rehash@example.com", "wrong").status_code == 200
+    with app.app_context():
+        assert User.query.filter_by(email="rehash@example.com").one().password_hash.startswith("pbkdf2:sha256:1000$")
+
+    assert login(client, "rehash@example.com", "s3cret").status_code == 302
+    with app.app_context():
+        user = User.query.filter_by(email="rehash@example.com").one()
+        assert user.password_hash.startswith("pbkdf2:sha256:2000$")
+        assert not user.password_needs_rehash()
+        assert user.check_password("s3cret")
+
+
+def test_pool_refuses_work_beyond_its_queue(cheap_policy):
+    pool = passwords.HashWorkerPool(workers=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    worker = threading.Thread(target=pool.run, args=(slow,))
+    worker.start()
+    started.wait(5)
+    with pytest.raises(passwords.PasswordHashBusy):
+        pool.run(lambda: None)
+    release.set()
+    worker.join()
+    assert pool.run(lambda: "ok") == "ok"
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression tests for the Appointment hot paths
+Runs EXPLAIN QUERY PLAN on each query and fails on a full table scan or an extra sort
+"""
+
+import re
+from datetime import date
+
+import pytest
+
+from app import app, db
+from blueprints.appointments import (patient_appointments_query, filtered_appointments_query, keyset_page_query,
+                                     booked_slots_query)
+from models import Appointment
+
+FULL_SCAN = re.compile(r"^SCAN (TABLE )?appointments$")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR ORDER BY")
+
+
+def query_plan(query):
+    """Return the EXPLAIN QUERY PLAN detail lines for an ORM query."""
+    # render_postcompile expands IN lists into one placeholder per value
+    compiled = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(
+        value.isoformat() if isinstance(value, date) else value
+        for value in (compiled.params[name] for name in compiled.positiontup)
+    )
+    with db.engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params)]
+
+
+def assert_indexed(query):
+    plan = query_plan(query)
+    assert not any(FULL_SCAN.match(line) for line in plan), plan
+    assert not any(TEMP_SORT.search(line) for line in plan), plan
+    return plan
+
+
+HOT_QUERIES = {
+    "patient_page": lambda: patient_appointments_query("patient@example.com"),
+    "duplicate_check": lambda: Appointment.query.filter_by(
+        patient_email="patient@example.com", appointment_date=date(2025, 1, 1), slot_minute=600),
+    "admin_first_page": lambda: keyset_page_query(
+        filtered_appointments_query({}), None, 100),
+    "admin_next_page": lambda: keyset_page_query(
+        filtered_appointments_query({}), (date(2025, 1, 1), 500), 100),
+    "admin_by_status": lambda: keyset_page_query(
+        filtered_appointments_query({"status": "confirmed"}), (date(2025, 1, 1), 500), 100),
+    "admin_by_doctor": lambda: keyset_page_query(
+        filtered_appointments_query({"doctor_type": "Cardiologist"}), None, 100),
+    "admin_date_range": lambda: keyset_page_query(
+        filtered_appointments_query({"date_from": "2025-01-01", "date_to": "2025-01-31"}), None, 100),
+    "bulk_duplicate_lookup": lambda: booked_slots_query(
+        [("a@example.com", date(2025, 1, 1), "10:00"), ("b@example.com", date(2025, 1, 2), "11:00")]),
+    "slot_overlap": lambda: Appointment.query.filter_by(
+        appointment_date=date(2025, 1, 1), doctor_type="Cardiologist", slot_minute=600),
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    with app.app_context():
+        db.create_all()
+        if db.engine.dialect.name != "sqlite":
+            pytest.skip("EXPLAIN QUERY PLAN checks are SQLite specific")
+        yield
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(name):
+    with app.app_context():
+        plan = assert_indexed(HOT_QUERIES[name]())
+        assert any("INDEX" in line for line in plan), plan
+
+
+def test_duplicate_check_is_a_unique_lookup():
+    with app.app_context():
+        plan = query_plan(HOT_QUERIES["duplicate_check"]())
+        # The inline UNIQUE constraint shows up as sqlite_autoindex_appointments_N
+        assert any("(patient_email=? AND appointment_date=? AND slot_minute=?)" in line
+                   for line in plan), plan
+
+
+def test_bulk_duplicate_lookup_seeks_per_patient():
+    with app.app_context():
+        plan = query_plan(HOT_QUERIES["bulk_duplicate_lookup"]())
+        # Not "SCAN appointments USING COVERING INDEX", which reads the whole index per chunk
+        assert any(line.startswith("SEARCH appointments") and "(patient_email=?)" in line for line in plan), plan
@@ -68,7 +68,7 @@ def test_core_functions():
     """Test core application functions"""
     print("\nTesting core functions...")
     try:
-        from app import compute_insights
+        from blueprints.pages import compute_insights
         
         # Test compute_insights function
         score, condition, yoga_list, ayur_tip, allo_tip = compute_insights("happy", "7", "3")
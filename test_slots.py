@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for slot capacity, /api/slots, cancellations and concurrent bookings
+"""
+
+import threading
+from collections import Counter
+from functools import partial
+
+import pytest
+
+import slots
+from app import app, db
+from conftest import appointment_payload, login, set_status
+from models import Appointment, SlotBooking
+from slots import SlotCapacity
+
+
+appointment = partial(appointment_payload, prefix="slot", doctor_type="Cardiologist", issue="Chest pain",
+                      appointment_date="2025-05-01", appointment_time="10:00 AM")
+
+
+@pytest.fixture
+def capacity(client, monkeypatch):
+    with app.app_context():
+        SlotBooking.query.delete()
+        db.session.commit()
+    monkeypatch.setattr(slots, "capacity", SlotCapacity.parse("Cardiologist=2,*=0"))
+    return client
+
+
+def day(client, doctor_type="Cardiologist", date="2025-05-01"):
+    response = client.get(f"/api/slots?date={date}&doctor_type={doctor_type}")
+    assert response.status_code == 200
+    body = response.get_json()
+    return body, {slot["time"]: slot for slot in body["slots"]}
+
+
+def test_times_are_normalized_to_minutes():
+    parse = slots.appointment_validator.parse_minute
+    assert parse("10:00 AM") == parse("10:00") == 600
+    assert parse("12:15 AM") == 15 and parse("12:00 PM") == 720 and parse("1:30 pm") == parse("13:30") == 810
+    assert SlotCapacity.parse("3").for_doctor("Anyone") == 3
+    assert SlotCapacity.parse("").for_doctor("Anyone") is None
+
+
+def test_slot_capacity_and_availability(capacity):
+    client = capacity
+    assert client.post("/api/save_appointment", json=appointment(1)).status_code == 200
+    # "10:15" falls in the same 30 minute slot as "10:00 AM"
+    saved = client.post("/api/save_appointment", json=appointment(2, appointment_time="10:15"))
+    assert saved.status_code == 200 and saved.get_json()["appointment"]["slot_minute"] == 615
+    full = client.post("/api/save_appointment", json=appointment(3, appointment_time="10:00"))
+    assert full.status_code == 409 and "No free Cardiologist slot" in full.get_json()["message"]
+    # Other doctor types are unlimited here
+    assert client.post("/api/save_appointment",
+                       json=appointment(3, doctor_type="General Physician")).status_code == 200
+
+    body, by_time = day(client)
+    assert body["capacity"] == 2 and body["slot_length"] == 30
+    assert by_time["10:00"] == {"time": "10:00", "minute": 600, "booked": 2, "available": 0, "free": False}
+    assert by_time["09:00"]["available"] == 2 and "10:00" not in body["free"] and "10:30" in body["free"]
+    assert len(body["slots"]) == 18  # 09:00 to 18:00
+
+    assert client.get("/api/slots?date=2025-05-01").status_code == 400
+    assert client.get("/api/slots?date=tomorrow&doctor_type=Cardiologist").status_code == 400
+
+
+def test_slot_length_that_does_not_divide_the_day(capacity, monkeypatch):
+    client = capacity
+    monkeypatch.setattr(slots, "SLOT_LENGTH", 50)
+    saved = client.post("/api/save_appointment", json=appointment(1, appointment_time="23:50"))
+    assert saved.status_code == 200
+    body, by_time = day(client)
+    # 23:20 starts the day's last, 40 minute slot
+    assert by_time["23:20"]["booked"] == 1 and by_time["23:20"]["free"]
+
+
+def test_cancelling_frees_the_place(capacity):
+    client = capacity
+    first = client.post("/api/save_appointment", json=appointment(1)).get_json()["appointment_id"]
+    client.post("/api/save_appointment", json=appointment(2))
+
+    cancel = set_status(client, first, "cancelled")
+    assert cancel.status_code == 200 and cancel.get_json()["appointment"]["status"] == "cancelled"
+    assert day(client)[1]["10:00"]["booked"] == 1
+    # Cancelling twice gives nothing back twice
+    set_status(client, first, "cancelled")
+    assert day(client)[1]["10:00"]["booked"] == 1
+
+    assert client.post("/api/save_appointment", json=appointment(3)).status_code == 200
+    # The slot is full again, so the cancelled appointment cannot come back
+    assert set_status(client, first, "confirmed").status_code == 409
+    assert set_status(client, first, "gone").status_code == 400
+    assert set_status(client, 999999, "cancelled").status_code == 404
+
+
+def test_status_changes_need_the_admin_token(capacity, monkeypatch):
+    client = capacity
+    first = client.post("/api/save_appointment", json=appointment(1)).get_json()["appointment_id"]
+    url = f"/api/appointments/{first}/status"
+    anonymous = client.post(url, json={"status": "cancelled"})
+    assert anonymous.status_code == 401 and anonymous.headers["WWW-Authenticate"] == "Bearer"
+    wrong = client.post(url, json={"status": "cancelled"}, headers={"Authorization": "Bearer guess"})
+    assert wrong.status_code == 401
+    login(client)  # a logged-in patient is not an admin
+    assert client.post(url, json={"status": "cancelled"}).status_code == 401
+
+    monkeypatch.setitem(app.config, "ADMIN_API_TOKEN", None)
+    assert set_status(client, first, "cancelled").status_code == 403
+    assert day(client)[1]["10:00"]["booked"] == 1
+
+
+def test_bulk_and_rebuild(capacity):
+    client = capacity
+    items = [appointment(i, appointment_time="11:00") for i in range(5)]
+    data = client.post("/api/save_appointments/bulk", json=items).get_json()
+    assert (data["saved"], data["full"]) == (2, 3)
+    assert [r["status"] for r in data["results"]] == ["success", "success", "full", "full", "full"]
+
+    with app.app_context():
+        db.session.execute(db.update(Appointment).values(slot_minute=None))
+        db.session.execute(db.delete(SlotBooking))
+        db.session.commit()
+        assert slots.rebuild() == (2, 1)
+    assert day(client)[1]["11:00"]["booked"] == 2
+
+
+def test_concurrent_bookings_never_exceed_capacity(capacity):
+    times = ["09:00", "09:30", "10:00"]
+    threads, per_thread = 8, 12
+    statuses = Counter()
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def book(n):
+        test_client = app.test_client()
+        barrier.wait()
+        mine = Counter()
+        for i in range(per_thread):
+            payload = appointment(f"{n}-{i}", appointment_time=times[i % len(times)])
+            if i % 4 == 3:
+                response = test_client.post("/api/save_appointments/bulk", json=[payload])
+                mine[response.get_json()["results"][0]["status"]] += 1
+            else:
+                mine[test_client.post("/api/save_appointment", json=payload).status_code] += 1
+        with lock:
+            statuses.update(mine)
+
+    pool = [threading.Thread(target=book, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    with app.app_context():
+        rows = db.session.execute(
+            db.select(Appointment.slot_minute, db.func.count())
+            .where(Appointment.doctor_type == "Cardiologist")
+            .group_by(Appointment.slot_minute)
+        ).all()
+    assert dict(rows) == {540: 2, 570: 2, 600: 2}
+    assert statuses[200] + statuses["success"] == 6
+    assert statuses[409] + statuses["full"] == threads * per_thread - 6
+    assert all(slot["booked"] == 2 for time, slot in day(capacity)[1].items() if time in times)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the inverted-index symptom engine and its HTML/JSON routes
+"""
+
+import json
+import random
+
+import symptom_engine
+from conftest import login
+from symptom_engine import engine, SymptomEngine, SYMPTOM_CONDITIONS, SPECIALIST_MAP
+
+
+def legacy_top_conditions(selected_symptoms):
+    """Nested-loop scoring + full sort, as the symptom_checker view used to do."""
+    condition_scores = {}
+    for symptom in selected_symptoms:
+        for condition in SYMPTOM_CONDITIONS.get(symptom, []):
+            condition_scores[condition] = condition_scores.get(condition, 0) + 1
+    return sorted(condition_scores.items(), key=lambda x: x[1], reverse=True)[:5]
+
+
+def test_engine_matches_the_legacy_ranking():
+    rng = random.Random(3)
+    symptoms = list(SYMPTOM_CONDITIONS) + ["severe_headache", "unknown"]
+    for _ in range(500):
+        selected = rng.sample(symptoms, rng.randint(1, 6))
+        expected = legacy_top_conditions(selected)
+        assert engine.top_conditions(selected) == expected
+        specialist = SPECIALIST_MAP.get(expected[0][0], "General Physician") if expected else "General Physician"
+        assert engine.check(selected)["specialist"] == specialist
+
+
+def test_weighted_postings_and_top_k():
+    weighted = SymptomEngine({"a": [("X", 3), ("Y", 1)], "b": ["Y", "Z"]}, top_k=2)
+    assert weighted.top_conditions(["a", "b"]) == [("X", 3), ("Y", 2)]
+    assert weighted.top_conditions(["b"], k=1) == [("Y", 1)]
+
+
+def test_check_result_shape():
+    result = engine.check(["chest_pain", "fever"])
+    assert result["is_urgent"] is True
+    assert result["home_care"] == ["Rest and stay hydrated. Take paracetamol if needed."]
+    assert result["symptom_count"] == 2
+    assert engine.check(["rash"])["home_care"] == ["Rest well and monitor your symptoms."]
+
+
+def test_html_and_json_routes_agree(client):
+    login(client)
+    page = client.post("/symptom_checker", data={"symptoms": ["fever", "cough"]}).get_data(as_text=True)
+    assert "Common Cold" in page
+
+    response = client.post("/api/symptom_checker", json={"symptoms": ["fever", "cough", "sneezing"]})
+    data = response.get_json()
+    assert response.status_code == 200
+    assert data["result"]["possible_conditions"][:3] == ["Common Cold", "Flu", "COVID-19"]
+    assert data["unknown_symptoms"] == ["sneezing"]
+
+    assert client.post("/api/symptom_checker", json={"symptoms": []}).status_code == 400
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_batch_api_returns_one_line_per_item(client):
+    items = [["fever", "cough"], {"id": "p-2", "symptoms": ["chest_pain"]}, {"symptoms": "fever"}]
+    response = client.post("/api/symptom_checker/batch", json=items)
+    assert response.mimetype == "application/x-ndjson"
+    lines = read_ndjson(response)
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert lines[0]["possible_conditions"] == engine.check(["fever", "cough"])["possible_conditions"]
+    assert lines[1]["id"] == "p-2" and lines[1]["is_urgent"] is True
+    assert lines[2]["status"] == "error"
+    assert client.post("/api/symptom_checker/batch", json={"symptoms": ["fever"]}).status_code == 400
+
+
+def test_batch_api_process_pool_keeps_order(client, monkeypatch):
+    monkeypatch.setattr(symptom_engine, "BATCH_WORKERS", 2)
+    monkeypatch.setattr(symptom_engine, "BATCH_POOL_THRESHOLD", 100)
+    monkeypatch.setattr(symptom_engine, "BATCH_CHUNK_SIZE", 50)
+    rng = random.Random(5)
+    names = list(SYMPTOM_CONDITIONS)
+    items = [rng.sample(names, rng.randint(1, 4)) for _ in range(600)]
+
+    body = "\n".join(json.dumps(item) for item in items) + "\nnot json\n"
+    lines = read_ndjson(client.post("/api/symptom_checker/batch", data=body, content_type="application/x-ndjson"))
+    assert len(lines) == 601
+    for item, line in zip(items, lines):
+        assert line["possible_conditions"] == engine.check(item)["possible_conditions"]
+    assert lines[-1]["status"] == "error"
+    # The workers were started without forking this (threaded) process
+    pool = symptom_engine._pool
+    assert pool is not None and pool._mp_context.get_start_method() != "fork"
+
+
+def test_short_ndjson_batches_skip_the_pool(client, monkeypatch):
+    monkeypatch.setattr(symptom_engine, "BATCH_WORKERS", 2)
+    monkeypatch.setattr(symptom_engine, "BATCH_POOL_THRESHOLD", 3)
+
+    def no_pool():
+        raise AssertionError("a batch below the threshold started the process pool")
+
+    monkeypatch.setattr(symptom_engine, "_get_pool", no_pool)
+    body = '["fever"]\n["cough"]\n'
+    lines = read_ndjson(client.post("/api/symptom_checker/batch", data=body, content_type="application/x-ndjson"))
+    assert [line["index"] for line in lines] == [0, 1]
+    assert lines[1]["possible_conditions"] == engine.check(["cough"])["possible_conditions"]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the {% cache %} fragment tag and the template render profiler
+"""
+
+import time
+
+from flask import Flask, render_template_string
+
+import template_cache
+from conftest import login
+from template_cache import FragmentCache, RenderProfiler
+
+
+def template_app(profile=False):
+    app = Flask(__name__)
+    profiler = template_cache.init_app(app, profile=profile)
+    return app, profiler
+
+
+def test_fragment_is_cached_per_key():
+    app, _ = template_app()
+    calls = []
+    source = '{% cache "greeting", name %}{{ render(name) }}{% endcache %}'
+
+    def render(name):
+        calls.append(name)
+        return f"hello {name}"
+
+    with app.app_context():
+        assert render_template_string(source, name="a", render=render) == "hello a"
+        assert render_template_string(source, name="a", render=render) == "hello a"
+        assert render_template_string(source, name="b", render=render) == "hello b"
+    assert calls == ["a", "b"]
+    assert app.jinja_env.fragment_cache.hits == 1
+
+
+def test_ttl_zero_disables_and_ttl_expires():
+    app, _ = template_app()
+    calls = []
+
+    def render():
+        calls.append(1)
+        return "x"
+
+    with app.app_context():
+        for _ in range(2):
+            render_template_string('{% cache "nocache", ttl=0 %}{{ render() }}{% endcache %}', render=render)
+        assert len(calls) == 2
+        render_template_string('{% cache "short", ttl=0.05 %}{{ render() }}{% endcache %}', render=render)
+        time.sleep(0.06)
+        render_template_string('{% cache "short", ttl=0.05 %}{{ render() }}{% endcache %}', render=render)
+    assert len(calls) == 4
+
+
+def test_lru_bound():
+    cache = FragmentCache(max_entries=2, default_ttl=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert len(cache) == 2
+
+
+def test_profiler_reports_templates_blocks_and_fragments():
+    app, profiler = template_app(profile=True)
+    assert isinstance(profiler, RenderProfiler)
+    source = '{% block body %}{% cache "items" %}{% for i in range(3) %}{{ i }}{% endfor %}{% endcache %}{% endblock %}'
+    with app.app_context():
+        assert render_template_string(source) == "012"
+        assert render_template_string(source) == "012"
+    rows = {row["name"]: row for row in profiler.report()}
+    template_rows = [name for name in rows if ":" not in name]
+    assert len(template_rows) == 1 and rows[template_rows[0]]["count"] == 2
+    assert any(name.endswith(":body") and row["count"] == 2 for name, row in rows.items())
+    # The fragment is rendered once, then served from the cache
+    assert any(":cache:" in name and row["count"] == 1 for name, row in rows.items())
+    profiler.reset()
+    assert profiler.report() == []
+
+
+def test_pages_render_with_fragments(client):
+    login(client, "fragments@example.com")
+    first = client.post("/yoga", data={"disease": "back pain"}).get_data(as_text=True)
+    assert "yoga-grid" in first
+    assert client.post("/yoga", data={"disease": "back pain"}).get_data(as_text=True) == first
+
+    page = client.post("/symptom_checker", data={"symptoms": ["fever", "cough"]}).get_data(as_text=True)
+    assert "Analysis Results" in page
+    assert client.get("/dashboard").status_code == 200
+
+
+def test_fragments_follow_knowledge_content(client, monkeypatch):
+    from app import app
+    from knowledge_base import kb
+    cache = app.jinja_env.fragment_cache
+    login(client)
+    client.post("/yoga", data={"disease": "neck pain"})
+    misses = cache.misses
+    client.post("/yoga", data={"disease": "neck pain"})
+    assert cache.misses == misses
+    # New content under the same version number, as the page cache sees it
+    monkeypatch.setattr(kb, "fingerprint", "edited")
+    client.post("/yoga", data={"disease": "neck pain"})
+    assert cache.misses == misses + 1
+
+
+def test_render_profile_endpoint_needs_profiling(client):
+    from app import app
+    if app.jinja_env.render_profiler is None:
+        assert client.get("/api/render_profile").status_code == 404
+    else:
+        assert client.get("/api/render_profile").status_code == 200
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the password reset token stores and the /forgot -> /reset flow
+"""
+
+import threading
+
+import pytest
+
+import passwords
+from app import app, db
+from models import User, ResetToken
+from token_store import MemoryTokenStore, DatabaseTokenStore
+
+
+def test_memory_store_evicts_expired_codes_from_the_front(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("token_store.time.time", lambda: clock[0])
+    store = MemoryTokenStore(ttl=60, sweep_interval=0)
+    store.issue("a@example.com", "111111")
+    clock[0] += 30
+    store.issue("b@example.com", "222222")   # expires at +90
+    clock[0] += 30
+    store.issue("a@example.com", "333333")   # re-issue moves a behind b, expires at +120
+    assert list(store._tokens) == ["b@example.com", "a@example.com"]
+
+    clock[0] += 45
+    assert store.sweep() == 1
+    assert store.get("b@example.com") is None
+    assert store.get("a@example.com")["code"] == "333333"
+
+
+def test_memory_store_is_bounded():
+    store = MemoryTokenStore(ttl=60, max_entries=100, sweep_interval=0)
+    for i in range(10000):
+        store.issue(f"user{i}@example.com", "123456")
+    assert len(store) == 100
+    assert store.get("user0@example.com") is None
+    assert store.get("user9999@example.com") is not None
+
+
+def test_database_store_shares_codes_and_sweeps(client):
+    with app.app_context():
+        issuer, checker = DatabaseTokenStore(sweep_interval=0), DatabaseTokenStore(sweep_interval=0)
+        issuer.issue("shared@example.com", "654321")
+        assert checker.get("shared@example.com")["code"] == "654321"
+
+        issuer.ttl = -1
+        issuer.issue("stale@example.com", "000000")
+        assert db.session.get(ResetToken, "stale@example.com") is None
+        checker.discard("shared@example.com")
+        assert checker.get("shared@example.com") is None
+
+
+def test_database_store_issues_concurrently_for_one_email(client):
+    store, errors = DatabaseTokenStore(sweep_interval=3600), []
+    barrier = threading.Barrier(8)
+
+    def forgot(n):
+        with app.app_context():
+            barrier.wait()
+            try:
+                store.issue("race@example.com", f"{n:06d}")
+            except Exception as e:  # an IntegrityError here was a 500 from /forgot
+                errors.append(e)
+
+    threads = [threading.Thread(target=forgot, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    with app.app_context():
+        assert store.get("race@example.com")["code"] in {f"{n:06d}" for n in range(8)}
+        store.issue("race@example.com", "123456")
+        assert store.get("race@example.com")["code"] == "123456"
+        assert ResetToken.query.filter_by(email="race@example.com").count() == 1
+        store.discard("race@example.com")
+
+
+@pytest.mark.parametrize("store", [MemoryTokenStore(sweep_interval=0), DatabaseTokenStore()])
+def test_forgot_then_reset(client, monkeypatch, store):
+    monkeypatch.setitem(app.extensions, "reset_tokens", store)
+    passwords_before = passwords.policy
+    passwords.configure("pbkdf2:sha256", 1000)
+    try:
+        with app.app_context():
+            User.query.filter_by(email="forgot@example.com").delete()
+            user = User(email="forgot@example.com")
+            user.set_password("old-password")
+            db.session.add(user)
+            db.session.commit()
+
+        page = client.post("/forgot", data={"email": "forgot@example.com"}).get_data(as_text=True)
+        code = store.get("forgot@example.com")["code"]
+        assert code in page
+
+        form = {"email": "forgot@example.com", "code": "999999" if code != "999999" else "000000",
+                "new_password": "new-password", "confirm_password": "new-password"}
+        assert "Invalid code." in client.post("/reset", data=form).get_data(as_text=True)
+        form["code"] = code
+        assert "Password updated" in client.post("/reset", data=form).get_data(as_text=True)
+        assert store.get("forgot@example.com") is None
+        with app.app_context():
+            assert User.query.filter_by(email="forgot@example.com").one().check_password("new-password")
+    finally:
+        passwords.policy = passwords_before
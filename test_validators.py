@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the precompiled appointment validator
+"""
+
+from datetime import date
+from functools import partial
+
+from conftest import appointment_payload
+from validators import appointment_validator, DATE_ERROR, TIME_ERROR, EMAIL_ERROR, REQUIRED_ERROR
+
+
+payload = partial(appointment_payload, name=" Test Patient ", email="Test@Example.com", phone=1234567890,
+                  appointment_date="2025-03-04", appointment_time="10:00 AM")
+
+
+def test_valid_payload_is_cleaned():
+    fields, errors = appointment_validator.validate(payload())
+    assert errors == {}
+    assert fields["patient_name"] == "Test Patient"
+    assert fields["patient_email"] == "test@example.com"
+    assert fields["patient_phone"] == "1234567890"
+    assert fields["appointment_date"] == date(2025, 3, 4)
+
+
+def test_date_layouts_match_the_legacy_format_order():
+    parse = appointment_validator.parse_date
+    assert parse("2025-03-04") == date(2025, 3, 4)
+    assert parse("2025/03/04") == date(2025, 3, 4)
+    assert parse("03/04/2025") == date(2025, 3, 4)   # MM/DD/YYYY wins when ambiguous
+    assert parse("13/04/2025") == date(2025, 4, 13)  # DD/MM/YYYY
+    assert parse("3/4/2025") == date(2025, 3, 4)
+    for bad in ("2025-02-30", "04-03-2025", "2025-03/04", "13/13/2025", "invalid-date", ""):
+        assert parse(bad) is None, bad
+
+
+def test_all_errors_are_collected_in_one_pass():
+    fields, errors = appointment_validator.validate(payload(
+        name="", email="nope", appointment_date="31-31-2025", appointment_time="25:00"))
+    assert fields is None
+    assert errors == {
+        "name": REQUIRED_ERROR,
+        "email": EMAIL_ERROR,
+        "appointment_date": DATE_ERROR,
+        "appointment_time": TIME_ERROR,
+    }
+
+
+def test_save_appointment_reports_every_field_error(client):
+    response = client.post("/api/save_appointment", json=payload(email="bad", appointment_time="noon"))
+    assert response.status_code == 400
+    data = response.get_json()
+    assert data["message"] == EMAIL_ERROR
+    assert set(data["errors"]) == {"email", "appointment_time"}
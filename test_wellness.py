@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the server-side wellness history behind /dashboard
+"""
+
+import itertools
+import threading
+
+import pytest
+from sqlalchemy import event
+
+from conftest import login
+from models import db, UserActivity
+from wellness import record_activity, dashboard_stats, WELLNESS_WINDOW
+
+_user_ids = itertools.count(1)
+
+
+def new_user(client):
+    """Log in as a user no other test has used; returns the email."""
+    return login(client, f"wellness{next(_user_ids)}@example.com")
+
+
+def test_feature_pages_count_into_the_user_stats(client):
+    email = new_user(client)
+    client.post("/yoga", data={"disease": "stress"})
+    client.post("/yoga", data={"disease": "asthma"})
+    client.post("/allopathic", data={"disease": "fever"})
+    client.post("/ayurvedic", data={"disease": "cold"})
+
+    with client.application.app_context():
+        stats = dashboard_stats(email)
+        assert (stats["yoga_sessions"], stats["allopathic_count"], stats["ayurvedic_count"]) == (2, 1, 1)
+        assert UserActivity.query.filter_by(user_email=email).count() == 4
+    with client.session_transaction() as sess:
+        assert "yoga_sessions" not in sess
+
+
+def test_dashboard_check_in_updates_scores(client):
+    email = new_user(client)
+    assert 'style="--score: 75"' in client.get("/dashboard").get_data(as_text=True)
+
+    page = client.post("/dashboard", data={"mood": "calm", "sleep": "8", "stress": "3"}).get_data(as_text=True)
+    assert 'style="--score: 100"' in page
+    client.post("/dashboard", data={"mood": "angry", "sleep": "4", "stress": "9"})
+    with client.application.app_context():
+        stats = dashboard_stats(email)
+    assert stats["wellness_checkins"] == 2 and stats["wellness_score"] == (100 + 0) // 2
+
+
+def test_rolling_window_matches_a_full_recompute(client):
+    email = new_user(client)
+    scores = [(i * 37) % 101 for i in range(WELLNESS_WINDOW * 3 + 2)]
+    with client.application.app_context():
+        for score in scores:
+            record_activity(email, "wellness", score)
+        stats = dashboard_stats(email)
+        recent = scores[-WELLNESS_WINDOW:]
+        assert stats["wellness_score"] == sum(scores) // len(scores)
+        assert stats["recent_score"] == sum(recent) // len(recent)
+
+
+def test_dashboard_read_does_not_scan_history(client):
+    email = new_user(client)
+    with client.application.app_context():
+        for score in range(50):
+            record_activity(email, "wellness", score)
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            db.session.expire_all()
+            dashboard_stats(email)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+    assert len(statements) == 1 and "user_activity" not in statements[0]
+
+
+def test_unknown_activity_kind_is_rejected(client):
+    with client.application.app_context():
+        with pytest.raises(ValueError):
+            record_activity("someone@example.com", "bmi")
+
+
+def test_concurrent_activity_loses_no_increments(client):
+    email = new_user(client)
+    app = client.application
+    threads, per_thread = 8, 10
+    errors = []
+    barrier = threading.Barrier(threads)
+
+    def work(n):
+        barrier.wait()  # every thread's first write races for the missing user_stats row
+        with app.app_context():
+            try:
+                for i in range(per_thread):
+                    record_activity(email, "yoga")
+                    record_activity(email, "wellness", n * per_thread + i)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    pool = [threading.Thread(target=work, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    assert errors == []
+    with app.app_context():
+        stats = dashboard_stats(email)
+        recent = [row.score for row in UserActivity.query.filter_by(user_email=email, kind="wellness")
+                  .order_by(UserActivity.id.desc()).limit(WELLNESS_WINDOW)]
+    total = threads * per_thread
+    assert stats["yoga_sessions"] == total and stats["wellness_checkins"] == total
+    assert stats["wellness_score"] == sum(range(total)) // total
+    assert stats["recent_score"] == sum(recent) // len(recent)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the write-behind queue and the feedback / consultation routes built on it
+"""
+
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from conftest import login
+from models import db, Feedback, Consultation
+from write_behind import WriteBehindQueue, WriteQueueFull
+
+
+@pytest.fixture
+def app_db(client):
+    app = client.application
+    with app.app_context():
+        Feedback.query.delete()
+        Consultation.query.delete()
+        db.session.commit()
+    return app
+
+
+def count(app, model):
+    with app.app_context():
+        return model.query.count()
+
+
+def test_rows_are_batched_by_size_and_by_time(app_db):
+    wq = WriteBehindQueue(app_db, db, batch_size=10, flush_ms=50)
+    for i in range(25):
+        wq.submit(Feedback, user_email="a@example.com", name=None, message=f"m{i}", created_at=datetime.utcnow())
+    assert wq.flush()
+    stats = wq.metrics()
+    assert count(app_db, Feedback) == 25
+    assert stats["written"] == 25 and stats["pending"] == 0
+    assert stats["batches"] == 3 and stats["last_batch_size"] == 5
+
+    wq.submit(Consultation, name="Asha", issue="Back pain", message=None, created_at=datetime.utcnow())
+    time.sleep(0.3)
+    assert count(app_db, Consultation) == 1
+    wq.close()
+
+
+def test_close_writes_queued_rows(app_db):
+    wq = WriteBehindQueue(app_db, db, batch_size=1000, flush_ms=60000)
+    for i in range(40):
+        wq.submit(Feedback, user_email=None, name="n", message=f"m{i}", created_at=datetime.utcnow())
+    wq.close()
+    assert count(app_db, Feedback) == 40
+    with pytest.raises(WriteQueueFull):
+        wq.submit(Feedback, user_email=None, name="n", message="late", created_at=datetime.utcnow())
+
+
+def test_full_queue_rejects_after_timeout(app_db):
+    wq = WriteBehindQueue(app_db, db, batch_size=1, flush_ms=0, max_pending=2, submit_timeout=0.05)
+    release = threading.Event()
+    write = wq._write
+    wq._write = lambda batch: (release.wait(5), write(batch))
+
+    rows = [dict(user_email=None, name=None, message=f"m{i}", created_at=datetime.utcnow()) for i in range(4)]
+    wq.submit(Feedback, **rows[0])  # taken by the worker, which is now stuck
+    time.sleep(0.05)
+    wq.submit(Feedback, **rows[1])
+    wq.submit(Feedback, **rows[2])
+    with pytest.raises(WriteQueueFull):
+        wq.submit(Feedback, **rows[3])
+
+    stats = wq.metrics()
+    assert stats["rejected"] == 1 and stats["waits"] >= 1 and stats["depth"] == 2
+    release.set()
+    assert wq.flush()
+    assert count(app_db, Feedback) == 3
+    wq.close()
+
+
+def test_close_does_not_block_on_a_full_queue(app_db):
+    wq = WriteBehindQueue(app_db, db, batch_size=1, flush_ms=0, max_pending=1, submit_timeout=0.05)
+    release = threading.Event()
+    write = wq._write
+    wq._write = lambda batch: (release.wait(5), write(batch))
+    wq.submit(Feedback, user_email=None, name=None, message="taken", created_at=datetime.utcnow())
+    time.sleep(0.05)
+    wq.submit(Feedback, user_email=None, name=None, message="queued", created_at=datetime.utcnow())
+
+    started = time.monotonic()
+    closer = threading.Thread(target=wq.close, kwargs={"timeout": 0.2})
+    closer.start()
+    closer.join(2)
+    assert not closer.is_alive() and time.monotonic() - started < 1
+    release.set()
+    wq._worker.join(5)
+    assert count(app_db, Feedback) == 2
+
+
+def test_feedback_and_consultation_routes(app_db, client):
+    from app import app
+
+    login(client)
+    page = client.post("/feedback", data={"message": "Great yoga tips"})
+    assert "Your feedback has been saved" in page.get_data(as_text=True)
+
+    response = client.post("/api/consultations", json={"name": "Ravi", "issue": "Migraine", "message": "Since May"})
+    assert response.status_code == 202
+    assert client.post("/api/consultations", json={"name": "Ravi"}).status_code == 400
+
+    assert app.extensions["write_queue"].flush()
+    assert "Great yoga tips" in client.get("/feedback").get_data(as_text=True)
+    # Other users never see it, or the author's email address
+    login(client, "other@example.com")
+    page = client.get("/feedback").get_data(as_text=True)
+    assert "Great yoga tips" not in page and "patient@example.com" not in page
+    assert count(app_db, Consultation) == 1
+    assert client.get("/api/write_queue").get_json()["pending"] == 0
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for the Aho-Corasick keyword matcher behind suggest_yoga
+"""
+
+import random
+
+from yoga_suggestions import KeywordMatcher, suggest_yoga, matched_conditions, YOGA_CONDITIONS, DEFAULT_POSES
+
+
+def test_matcher_agrees_with_substring_scan():
+    rng = random.Random(7)
+    keywords = {"".join(rng.choice("abc") for _ in range(rng.randint(1, 5))) for _ in range(60)}
+    matcher = KeywordMatcher({k: k for k in keywords})
+    for _ in range(200):
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 40)))
+        expected = {k for k in keywords if k in text}
+        assert {value for _, value in matcher.find_all(text)} == expected
+
+
+def test_single_condition_keeps_its_list():
+    assert suggest_yoga("I have Diabetes") == YOGA_CONDITIONS["diabetes"]
+    assert suggest_yoga("bad migraine since morning") == YOGA_CONDITIONS["headache"]
+
+
+def test_keywords_must_start_a_word():
+    assert matched_conditions("hypertension") == []
+    assert suggest_yoga("I have hypertension") != YOGA_CONDITIONS["stress"]
+    assert matched_conditions("tension in my shoulders") == ["stress"]
+    assert matched_conditions("Migraines, every week") == ["headache"]
+
+
+def test_fallbacks():
+    assert suggest_yoga("") == ["No specific yoga found, try consulting an instructor."]
+    assert suggest_yoga("sprained wrist") == DEFAULT_POSES
+
+
+def test_several_conditions_are_merged_and_ranked():
+    assert matched_conditions("headache, then stress and anxiety") == ["headache", "stress", "anxiety"]
+    poses = suggest_yoga("headache, then stress and anxiety")
+    # stress and anxiety share all three poses, so those rank above the headache-only ones
+    assert poses[:3] == YOGA_CONDITIONS["stress"]
+    assert poses[3:] == YOGA_CONDITIONS["headache"]
+
+    poses = suggest_yoga("asthma and a cold")
+    assert poses[0] == "Bhujangasana (Cobra Pose)"
+    assert len(poses) == len(set(poses))
@@ -0,0 +1,131 @@
+"""
+Password reset code storage with TTL-based expiry.
+
+RESET_TOKEN_STORE picks the backend:
+  db (default) - reset_tokens table, shared by every worker and kept across restarts
+  memory       - per-process dict with a background sweeper (single worker / tests)
+
+Both expose issue(email, code), get(email) -> {"code", "expires"} or None,
+discard(email) and sweep() -> number of expired entries removed.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from database import upsert_insert
+from models import db, ResetToken
+
+RESET_TOKEN_TTL = 15 * 60  # seconds
+
+
+class MemoryTokenStore:
+    """
+    Every code lives for the same TTL, so insertion order is expiry order.
+    Re-issuing moves the email to the back of the OrderedDict; expired codes
+    are always at the front, which makes eviction O(1) per entry.
+    """
+
+    def __init__(self, ttl=RESET_TOKEN_TTL, max_entries=100000, sweep_interval=60):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._tokens = OrderedDict()  # email -> {"code", "expires"}
+        self._lock = threading.Lock()
+        self._sweeper = None
+
+    def issue(self, email, code):
+        now = time.time()
+        with self._lock:
+            self._tokens.pop(email, None)
+            self._tokens[email] = {"code": code, "expires": now + self.ttl}
+            self._evict(now)
+        self._start_sweeper()
+        return now + self.ttl
+
+    def get(self, email):
+        with self._lock:
+            token = self._tokens.get(email)
+            return dict(token) if token else None
+
+    def discard(self, email):
+        with self._lock:
+            self._tokens.pop(email, None)
+
+    def sweep(self):
+        with self._lock:
+            return self._evict(time.time())
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def _evict(self, now):
+        """Drop expired codes from the front, then the oldest ones beyond max_entries."""
+        removed = 0
+        while self._tokens:
+            token = next(iter(self._tokens.values()))
+            if token["expires"] > now and len(self._tokens) <= self.max_entries:
+                break
+            self._tokens.popitem(last=False)
+            removed += 1
+        return removed
+
+    def _start_sweeper(self):
+        if self._sweeper is None and self.sweep_interval:
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="reset-token-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            self.sweep()
+
+
+class DatabaseTokenStore:
+    """
+    Codes in the reset_tokens table (one row per email), so a code issued by
+    /forgot on one worker can be checked by /reset on another. issue() is one
+    upsert, so concurrent requests for one email both succeed. Expired rows
+    are deleted in bulk at most once per sweep_interval, piggybacked on issue().
+    """
+
+    def __init__(self, ttl=RESET_TOKEN_TTL, sweep_interval=60):
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+
+    def issue(self, email, code):
+        now = time.time()
+        insert = upsert_insert(db.session)(ResetToken).values(email=email, code=code, expires=now + self.ttl)
+        db.session.execute(insert.on_conflict_do_update(
+            index_elements=[ResetToken.email],
+            set_={"code": insert.excluded.code, "expires": insert.excluded.expires},
+        ))
+        db.session.commit()
+        if now - self._last_sweep > self.sweep_interval:
+            self.sweep()
+        return now + self.ttl
+
+    def get(self, email):
+        token = db.session.get(ResetToken, email)
+        return {"code": token.code, "expires": token.expires} if token else None
+
+    def discard(self, email):
+        ResetToken.query.filter_by(email=email).delete()
+        db.session.commit()
+
+    def sweep(self):
+        self._last_sweep = time.time()
+        removed = ResetToken.query.filter(ResetToken.expires <= self._last_sweep).delete()
+        db.session.commit()
+        return removed
+
+
+def create_token_store(backend=None):
+    backend = (backend or os.environ.get("RESET_TOKEN_STORE", "db")).lower()
+    if backend == "memory":
+        return MemoryTokenStore()
+    if backend == "db":
+        return DatabaseTokenStore()
+    raise ValueError(f"Unknown RESET_TOKEN_STORE '{backend}'")
@@ -0,0 +1,113 @@
+"""
+Request validation helpers.
+The appointment validator is built once at import and shared by
+/api/save_appointment and /api/save_appointments/bulk.
+"""
+
+import re
+from datetime import date
+
+# (field name in the payload, Appointment column)
+APPOINTMENT_FIELDS = [
+    ('name', 'patient_name'),
+    ('email', 'patient_email'),
+    ('phone', 'patient_phone'),
+    ('doctor_type', 'doctor_type'),
+    ('issue', 'health_issue'),
+    ('appointment_date', 'appointment_date'),
+    ('appointment_time', 'appointment_time'),
+]
+
+REQUIRED_ERROR = "This field is required"
+EMAIL_ERROR = "Invalid email format"
+DATE_ERROR = "Invalid date format. Use YYYY-MM-DD, MM/DD/YYYY, or DD/MM/YYYY"
+TIME_ERROR = "Invalid time format. Use HH:MM or HH:MM AM/PM"
+
+
+class AppointmentValidator:
+    """
+    Precompiled validator for Make.com appointment payloads.
+    validate() checks every field in one pass and returns (fields, errors):
+    fields holds the cleaned Appointment columns, errors maps field -> message.
+    """
+
+    EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+    TIME_RE = re.compile(r'^([0-1]?[0-9]|2[0-3]):[0-5][0-9](\s?(AM|PM))?$', re.IGNORECASE)
+    # Three numeric parts sharing one separator, e.g. 2025-01-31, 01/31/2025, 31/01/2025, 2025/01/31
+    DATE_RE = re.compile(r'^(\d{1,4})([-/])(\d{1,2})\2(\d{1,4})$')
+
+    def parse_date(self, value):
+        """
+        Parse an appointment date in a single pass, picking the format from the layout:
+        YYYY-MM-DD, YYYY/MM/DD, MM/DD/YYYY, or DD/MM/YYYY when the first part is above 12.
+        Returns None when the value matches none of them.
+        """
+        match = self.DATE_RE.match(value)
+        if not match:
+            return None
+        first, sep, middle, last = match.groups()
+        if len(first) == 4:
+            year, month, day = first, middle, last
+            if len(day) > 2:
+                return None
+        elif sep == '/' and len(last) == 4 and len(first) <= 2:
+            if int(first) <= 12:
+                month, day, year = first, middle, last
+            else:
+                day, month, year = first, middle, last
+        else:
+            return None
+        try:
+            return date(int(year), int(month), int(day))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def parse_minute(value):
+        """
+        Minutes since midnight for a time that matched TIME_RE: "10:00 AM" -> 600,
+        "12:15 AM" -> 15, "1:30 PM" and "13:30" -> 810. AM/PM after an hour above 12 is ignored.
+        """
+        clock, _, suffix = value.partition(':')
+        hour, minute = int(clock), int(suffix[:2])
+        suffix = suffix[2:].strip().upper()
+        if suffix and hour <= 12:
+            hour = hour % 12 + (12 if suffix == 'PM' else 0)
+        return hour * 60 + minute
+
+    def validate(self, data):
+        if not isinstance(data, dict):
+            return None, {'_': "Appointment must be a JSON object"}
+
+        values, errors = {}, {}
+        for field, column in APPOINTMENT_FIELDS:
+            raw = data.get(field)
+            value = str(raw).strip() if raw is not None else ''
+            if not value:
+                errors[field] = REQUIRED_ERROR
+            values[column] = value
+
+        email = values['patient_email']
+        if email and not self.EMAIL_RE.match(email):
+            errors['email'] = EMAIL_ERROR
+
+        appointment_date = None
+        if values['appointment_date']:
+            appointment_date = self.parse_date(values['appointment_date'])
+            if appointment_date is None:
+                errors['appointment_date'] = DATE_ERROR
+
+        if values['appointment_time'] and not self.TIME_RE.match(values['appointment_time']):
+            errors['appointment_time'] = TIME_ERROR
+
+        if errors:
+            return None, errors
+
+        values['patient_email'] = email.lower()
+        values['appointment_date'] = appointment_date
+        values['slot_minute'] = self.parse_minute(values['appointment_time'])
+        values['status'] = 'confirmed'
+        return values, {}
+
+
+appointment_validator = AppointmentValidator()
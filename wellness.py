@@ -0,0 +1,79 @@
+"""
+Per-user wellness history for /dashboard.
+
+Every tracked action is appended to user_activity, and the same transaction
+updates the user's user_stats row: counters, the all-time score count/sum and
+a rolling window of the last WELLNESS_WINDOW scores with its sum. Reading the
+dashboard is one primary-key lookup however long the history grows.
+
+Counters are added with one atomic upsert (INSERT ... ON CONFLICT DO UPDATE
+SET n = n + 1), so concurrent requests neither lose increments nor collide
+on the first insert. The upsert also takes the row lock (the write lock on
+SQLite), which makes the following read-modify-write of the window safe.
+"""
+
+import json
+from datetime import datetime
+
+from database import upsert_insert
+from models import db, UserActivity, UserStats
+
+WELLNESS_WINDOW = 7
+DEFAULT_WELLNESS_SCORE = 75
+
+# Activity kind -> UserStats counter it increments
+COUNTERS = {
+    "yoga": "yoga_sessions",
+    "allopathic": "allopathic_count",
+    "ayurvedic": "ayurvedic_count",
+}
+
+
+def _add(email, **increments):
+    """Add increments to the user's counters with one upsert, creating the row on first use."""
+    insert = upsert_insert(db.session)(UserStats)
+    row = dict(user_email=email, yoga_sessions=0, allopathic_count=0, ayurvedic_count=0,
+               wellness_count=0, wellness_sum=0, recent_scores="[]", recent_sum=0)
+    row.update(increments)
+    db.session.execute(insert.values(**row).on_conflict_do_update(
+        index_elements=[UserStats.user_email],
+        set_={name: getattr(UserStats, name) + insert.excluded[name] for name in increments},
+    ))
+
+
+def record_activity(email, kind, score=None):
+    """Log one action and fold it into the user's aggregates; kind is a COUNTERS key or "wellness"."""
+    if kind != "wellness" and kind not in COUNTERS:
+        raise ValueError(f"Unknown activity kind '{kind}'")
+    db.session.add(UserActivity(user_email=email, kind=kind, score=score, created_at=datetime.utcnow()))
+    if kind == "wellness":
+        _add(email, wellness_count=1, wellness_sum=score)
+        # Locked by the upsert until commit, so no other check-in can change the window in between
+        stats = db.session.get(UserStats, email, populate_existing=True)
+        recent = json.loads(stats.recent_scores)
+        recent.append(score)
+        stats.recent_sum += score
+        if len(recent) > WELLNESS_WINDOW:
+            stats.recent_sum -= recent.pop(0)
+        stats.recent_scores = json.dumps(recent)
+    else:
+        _add(email, **{COUNTERS[kind]: 1})
+    db.session.commit()
+
+
+def dashboard_stats(email):
+    """Counters and scores for the dashboard, read from the aggregate row only."""
+    stats = db.session.get(UserStats, email)
+    if stats is None:
+        return {"yoga_sessions": 0, "allopathic_count": 0, "ayurvedic_count": 0,
+                "wellness_checkins": 0, "wellness_score": DEFAULT_WELLNESS_SCORE,
+                "recent_score": DEFAULT_WELLNESS_SCORE}
+    recent_count = min(stats.wellness_count, WELLNESS_WINDOW)
+    return {
+        "yoga_sessions": stats.yoga_sessions,
+        "allopathic_count": stats.allopathic_count,
+        "ayurvedic_count": stats.ayurvedic_count,
+        "wellness_checkins": stats.wellness_count,
+        "wellness_score": stats.wellness_sum // stats.wellness_count if stats.wellness_count else DEFAULT_WELLNESS_SCORE,
+        "recent_score": stats.recent_sum // recent_count if recent_count else DEFAULT_WELLNESS_SCORE,
+    }
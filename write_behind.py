@@ -0,0 +1,186 @@
+"""
+In-process write-behind queue for fire-and-forget inserts (feedback, consultation requests).
+
+Request handlers call submit(Model, **columns) and return immediately. A
+background thread collects rows and inserts them in one transaction per batch,
+flushing every WRITE_BEHIND_BATCH_SIZE rows or WRITE_BEHIND_FLUSH_MS
+milliseconds, whichever comes first. Pending rows are flushed at interpreter exit.
+
+Backpressure: at most WRITE_BEHIND_MAX_PENDING rows wait in memory. submit()
+waits up to WRITE_BEHIND_SUBMIT_TIMEOUT seconds for room and then raises
+WriteQueueFull. metrics() reports queue depth, waits and rejections.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from itertools import groupby
+
+logger = logging.getLogger(__name__)
+
+
+class WriteQueueFull(Exception):
+    """Raised when the write-behind queue stays full for the whole submit timeout."""
+
+
+class WriteBehindQueue:
+    def __init__(self, app, db, batch_size=100, flush_ms=200, max_pending=10000, submit_timeout=0.5):
+        self.app = app
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000.0
+        self.submit_timeout = submit_timeout
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._worker = None
+        self._closed = False
+        self._stop = threading.Event()
+        self._stats = {
+            "submitted": 0, "written": 0, "failed": 0, "rejected": 0,
+            "batches": 0, "waits": 0, "wait_seconds": 0.0,
+            "max_depth": 0, "last_batch_size": 0, "last_batch_ms": 0.0,
+        }
+        atexit.register(self.close)
+
+    def submit(self, model, **columns):
+        """Queue one row for insertion into model's table."""
+        if self._closed:
+            raise WriteQueueFull("Write queue is shut down")
+        self._start_worker()
+        with self._lock:
+            self._pending += 1
+        item = (model, columns)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            started = time.perf_counter()
+            try:
+                self._queue.put(item, timeout=self.submit_timeout)
+            except queue.Full:
+                with self._lock:
+                    self._pending -= 1
+                    self._stats["rejected"] += 1
+                    self._idle.notify_all()
+                raise WriteQueueFull("Too many pending writes, please retry")
+            finally:
+                with self._lock:
+                    self._stats["waits"] += 1
+                    self._stats["wait_seconds"] += time.perf_counter() - started
+        with self._lock:
+            self._stats["submitted"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], self._queue.qsize())
+
+    def flush(self, timeout=10):
+        """Block until every submitted row has been written (or failed). Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout=10):
+        """Stop accepting rows, write what is queued and stop the worker."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._worker is not None:
+            deadline = time.monotonic() + timeout
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                # No room for the sentinel; the worker checks the flag between batches
+                self._stop.set()
+            self._worker.join(max(0.0, deadline - time.monotonic()))
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = self._pending
+        stats["depth"] = self._queue.qsize()
+        stats["capacity"] = self._queue.maxsize
+        stats["wait_seconds"] = round(stats["wait_seconds"], 4)
+        stats["last_batch_ms"] = round(stats["last_batch_ms"], 2)
+        return stats
+
+    def _start_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping and not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+        # Drain anything submitted before close()
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.batch_size):
+            self._write(leftover[start:start + self.batch_size])
+
+    def _write(self, batch):
+        """Insert one batch in a single transaction, one executemany per table."""
+        started = time.perf_counter()
+        ok = True
+        with self.app.app_context():
+            session = self.db.session
+            try:
+                for model, items in groupby(batch, key=lambda item: item[0]):
+                    session.execute(self.db.insert(model), [columns for _, columns in items])
+                session.commit()
+            except Exception:
+                session.rollback()
+                ok = False
+                logger.exception("Write-behind batch of %d rows failed", len(batch))
+            finally:
+                session.remove()
+        with self._lock:
+            self._stats["written" if ok else "failed"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["last_batch_size"] = len(batch)
+            self._stats["last_batch_ms"] = (time.perf_counter() - started) * 1000
+            self._pending -= len(batch)
+            self._idle.notify_all()
+
+
+def create_write_queue(app, db):
+    return WriteBehindQueue(
+        app, db,
+        batch_size=int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", "100")),
+        flush_ms=int(os.environ.get("WRITE_BEHIND_FLUSH_MS", "200")),
+        max_pending=int(os.environ.get("WRITE_BEHIND_MAX_PENDING", "10000")),
+        submit_timeout=float(os.environ.get("WRITE_BEHIND_SUBMIT_TIMEOUT", "0.5")),
+    )
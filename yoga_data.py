@@ -1,421 +1,12 @@
-# Yoga Poses Database with Images and Video Tutorials
+"""
+Plain-dict views of the knowledge base poses and medicines.
 
-YOGA_POSES = {
-    "Padmasana": {
-        "name": "Padmasana (Lotus Pose)",
-        "image": "https://images.unsplash.com/photo-1544367567-0f2fcb009e0b?w=400",
-        "video": "https://www.youtube.com/embed/3bM0vfKHY0M",
-        "duration": "5-10 minutes",
-        "difficulty": "Intermediate",
-        "benefits": [
-            "Calms the mind and reduces stress",
-            "Improves posture and spine alignment",
-            "Stimulates digestive organs",
-            "Increases awareness and focus"
-        ],
-        "steps": [
-            "Sit on the floor with legs extended",
-            "Bend right knee and place foot on left thigh",
-            "Bend left knee and place foot on right thigh",
-            "Keep spine straight and hands on knees",
-            "Close eyes and breathe deeply"
-        ],
-        "precautions": "Avoid if you have knee or ankle injuries"
-    },
-    "Shavasana": {
-        "name": "Shavasana (Corpse Pose)",
-        "image": "https://images.unsplash.com/photo-1506126613408-eca07ce68773?w=400",
-        "video": "https://www.youtube.com/embed/1VYlOKUdylM",
-        "duration": "10-15 minutes",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Deep relaxation and stress relief",
-            "Reduces blood pressure",
-            "Calms nervous system",
-            "Improves sleep quality"
-        ],
-        "steps": [
-            "Lie flat on your back",
-            "Legs slightly apart, arms by sides",
-            "Palms facing up",
-            "Close eyes and relax entire body",
-            "Focus on natural breathing"
-        ],
-        "precautions": "Use cushion under head if needed"
-    },
-    "Anulom Vilom": {
-        "name": "Anulom Vilom (Alternate Nostril Breathing)",
-        "image": "https://images.unsplash.com/photo-1599901860904-17e6ed7083a0?w=400",
-        "video": "https://www.youtube.com/embed/8VwufJrUhic",
-        "duration": "5-10 minutes",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Reduces stress and anxiety",
-            "Improves lung capacity",
-            "Balances left and right brain",
-            "Purifies blood circulation"
-        ],
-        "steps": [
-            "Sit in comfortable position",
-            "Close right nostril with thumb",
-            "Inhale through left nostril",
-            "Close left nostril, open right",
-            "Exhale through right nostril",
-            "Repeat alternating"
-        ],
-        "precautions": "Practice on empty stomach"
-    },
-    "Tadasana": {
-        "name": "Tadasana (Mountain Pose)",
-        "image": "https://images.unsplash.com/photo-1599447292023-fa1c0f6c2e9f?w=400",
-        "video": "https://www.youtube.com/embed/KN1QXlNBGGg",
-        "duration": "1-2 minutes",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Improves posture",
-            "Strengthens thighs and ankles",
-            "Increases awareness",
-            "Reduces flat feet"
-        ],
-        "steps": [
-            "Stand with feet together",
-            "Distribute weight evenly",
-            "Engage thigh muscles",
-            "Lift chest and shoulders back",
-            "Arms by sides, palms forward",
-            "Breathe deeply"
-        ],
-        "precautions": "Avoid if you have low blood pressure"
-    },
-    "Balasana": {
-        "name": "Balasana (Child's Pose)",
-        "image": "https://images.unsplash.com/photo-1599901860904-17e6ed7083a0?w=400",
-        "video": "https://www.youtube.com/embed/2MN7BQQzGnY",
-        "duration": "3-5 minutes",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Relieves back and neck pain",
-            "Calms the mind",
-            "Stretches hips and thighs",
-            "Reduces fatigue"
-        ],
-        "steps": [
-            "Kneel on floor, sit on heels",
-            "Separate knees hip-width",
-            "Bend forward, forehead to floor",
-            "Arms extended forward or by sides",
-            "Breathe deeply and relax"
-        ],
-        "precautions": "Avoid if pregnant or have knee injuries"
-    },
-    "Viparita Karani": {
-        "name": "Viparita Karani (Legs Up the Wall)",
-        "image": "https://images.unsplash.com/photo-1588286840104-8957b019727f?w=400",
-        "video": "https://www.youtube.com/embed/HSvWqJAdSPw",
-        "duration": "5-15 minutes",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Reduces leg swelling",
-            "Relieves tired legs",
-            "Calms nervous system",
-            "Improves circulation"
-        ],
-        "steps": [
-            "Sit sideways next to wall",
-            "Swing legs up the wall",
-            "Lie back with legs vertical",
-            "Arms relaxed by sides",
-            "Stay and breathe"
-        ],
-        "precautions": "Avoid during menstruation"
-    },
-    "Bhujangasana": {
-        "name": "Bhujangasana (Cobra Pose)",
-        "image": "https://images.unsplash.com/photo-1599901860904-17e6ed7083a0?w=400",
-        "video": "https://www.youtube.com/embed/JUP_YdYyfQw",
-        "duration": "15-30 seconds",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Strengthens spine",
-            "Opens chest and lungs",
-            "Relieves stress",
-            "Stimulates abdominal organs"
-        ],
-        "steps": [
-            "Lie on stomach, legs extended",
-            "Hands under shoulders",
-            "Press palms, lift chest",
-            "Keep elbows slightly bent",
-            "Look up, breathe deeply"
-        ],
-        "precautions": "Avoid if pregnant or have back injuries"
-    },
-    "Vajrasana": {
-        "name": "Vajrasana (Diamond Pose)",
-        "image": "https://images.unsplash.com/photo-1588286840104-8957b019727f?w=400",
-        "video": "https://www.youtube.com/embed/gZEKMZw8VJg",
-        "duration": "5-10 minutes",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Aids digestion",
-            "Strengthens pelvic muscles",
-            "Relieves back pain",
-            "Calms the mind"
-        ],
-        "steps": [
-            "Kneel on floor",
-            "Sit back on heels",
-            "Keep spine straight",
-            "Hands on thighs",
-            "Breathe normally"
-        ],
-        "precautions": "Avoid if you have knee problems"
-    },
-    "Surya Namaskar": {
-        "name": "Surya Namaskar (Sun Salutation)",
-        "image": "https://images.unsplash.com/photo-1588286840104-8957b019727f?w=400",
-        "video": "https://www.youtube.com/embed/73sjOu0g58M",
-        "duration": "10-15 minutes",
-        "difficulty": "Intermediate",
-        "benefits": [
-            "Full body workout",
-            "Improves flexibility",
-            "Boosts metabolism",
-            "Strengthens muscles"
-        ],
-        "steps": [
-            "12 poses in sequence",
-            "Start with prayer pose",
-            "Flow through forward bend",
-            "Plank, cobra, downward dog",
-            "Return to standing"
-        ],
-        "precautions": "Learn proper form first"
-    },
-    "Dhanurasana": {
-        "name": "Dhanurasana (Bow Pose)",
-        "image": "https://images.unsplash.com/photo-1506126613408-eca07ce68773?w=400",
-        "video": "https://www.youtube.com/embed/kkVGRbhJJYA",
-        "duration": "20-30 seconds",
-        "difficulty": "Intermediate",
-        "benefits": [
-            "Strengthens back muscles",
-            "Improves posture",
-            "Stimulates digestive organs",
-            "Opens chest and shoulders"
-        ],
-        "steps": [
-            "Lie on stomach",
-            "Bend knees, bring heels toward buttocks",
-            "Reach back and hold ankles",
-            "Lift chest and thighs off floor",
-            "Hold and breathe"
-        ],
-        "precautions": "Avoid if you have back or neck injuries"
-    },
-    "Paschimottanasana": {
-        "name": "Paschimottanasana (Seated Forward Bend)",
-        "image": "https://images.unsplash.com/photo-1544367567-0f2fcb009e0b?w=400",
-        "video": "https://www.youtube.com/embed/g-7ZWPCWv2U",
-        "duration": "1-3 minutes",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Stretches spine and hamstrings",
-            "Calms the mind",
-            "Relieves stress",
-            "Improves digestion"
-        ],
-        "steps": [
-            "Sit with legs extended",
-            "Inhale and lengthen spine",
-            "Exhale and fold forward",
-            "Reach for feet or shins",
-            "Keep spine long"
-        ],
-        "precautions": "Avoid if you have back injuries"
-    },
-    "Marjaryasana-Bitilasana": {
-        "name": "Marjaryasana-Bitilasana (Cat-Cow Pose)",
-        "image": "https://images.unsplash.com/photo-1599901860904-17e6ed7083a0?w=400",
-        "video": "https://www.youtube.com/embed/kqnua4rHVVA",
-        "duration": "1-2 minutes",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Relieves back pain",
-            "Improves spine flexibility",
-            "Massages internal organs",
-            "Reduces stress"
-        ],
-        "steps": [
-            "Start on hands and knees",
-            "Inhale, arch back (cow)",
-            "Exhale, round spine (cat)",
-            "Flow between poses",
-            "Coordinate with breath"
-        ],
-        "precautions": "Move gently if you have neck issues"
-    },
-    "Setu Bandhasana": {
-        "name": "Setu Bandhasana (Bridge Pose)",
-        "image": "https://images.unsplash.com/photo-1506126613408-eca07ce68773?w=400",
-        "video": "https://www.youtube.com/embed/kkVGRbhJJYA",
-        "duration": "30-60 seconds",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Strengthens back and glutes",
-            "Opens chest",
-            "Calms the mind",
-            "Improves digestion"
-        ],
-        "steps": [
-            "Lie on back, knees bent",
-            "Feet hip-width apart",
-            "Press feet down, lift hips",
-            "Clasp hands under back",
-            "Hold and breathe"
-        ],
-        "precautions": "Avoid if you have neck injuries"
-    },
-    "Uttanasana": {
-        "name": "Uttanasana (Standing Forward Bend)",
-        "image": "https://images.unsplash.com/photo-1599447292023-fa1c0f6c2e9f?w=400",
-        "video": "https://www.youtube.com/embed/g-7ZWPCWv2U",
-        "duration": "30-60 seconds",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Stretches hamstrings",
-            "Calms the mind",
-            "Relieves headache",
-            "Reduces fatigue"
-        ],
-        "steps": [
-            "Stand with feet hip-width",
-            "Hinge at hips",
-            "Fold forward",
-            "Let head hang",
-            "Breathe deeply"
-        ],
-        "precautions": "Bend knees if hamstrings are tight"
-    },
-    "Vrikshasana": {
-        "name": "Vrikshasana (Tree Pose)",
-        "image": "https://images.unsplash.com/photo-1599447292023-fa1c0f6c2e9f?w=400",
-        "video": "https://www.youtube.com/embed/KN1QXlNBGGg",
-        "duration": "30-60 seconds each side",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Improves balance",
-            "Strengthens legs",
-            "Increases focus",
-            "Calms the mind"
-        ],
-        "steps": [
-            "Stand on one leg",
-            "Place other foot on inner thigh",
-            "Hands in prayer position",
-            "Focus on a point",
-            "Balance and breathe"
-        ],
-        "precautions": "Use wall for support if needed"
-    },
-    "Sukhasana": {
-        "name": "Sukhasana (Easy Pose)",
-        "image": "https://images.unsplash.com/photo-1544367567-0f2fcb009e0b?w=400",
-        "video": "https://www.youtube.com/embed/3bM0vfKHY0M",
-        "duration": "5-10 minutes",
-        "difficulty": "Beginner",
-        "benefits": [
-            "Calms the mind",
-            "Opens hips",
-            "Strengthens back",
-            "Reduces stress"
-        ],
-        "steps": [
-            "Sit cross-legged",
-            "Keep spine straight",
-            "Hands on knees",
-            "Close eyes",
-            "Breathe deeply"
-        ],
-        "precautions": "Use cushion if uncomfortable"
-    }
-}
+app.py reads the frozen records in knowledge_base.kb directly; these
+dicts remain for older entry points (app_clean.py, app_simple.py).
+"""
 
-# Medicine Database with Images
-MEDICINE_DATABASE = {
-    "paracetamol": {
-        "name": "Paracetamol",
-        "generic_name": "Acetaminophen",
-        "image": "https://images.unsplash.com/photo-1584308666744-24d5c474f2ae?w=400",
-        "type": "Pain Reliever / Fever Reducer",
-        "dosage": "500mg - 1000mg every 4-6 hours",
-        "max_daily": "4000mg (4g)",
-        "uses": ["Fever", "Headache", "Body ache", "Toothache"],
-        "side_effects": ["Rare: Liver damage with overdose", "Allergic reactions"],
-        "precautions": [
-            "Do not exceed maximum daily dose",
-            "Avoid alcohol while taking",
-            "Consult doctor if liver problems"
-        ]
-    },
-    "cetirizine": {
-        "name": "Cetirizine",
-        "generic_name": "Cetirizine Hydrochloride",
-        "image": "https://images.unsplash.com/photo-1471864190281-a93a3070b6de?w=400",
-        "type": "Antihistamine",
-        "dosage": "10mg once daily",
-        "max_daily": "10mg",
-        "uses": ["Allergies", "Cold symptoms", "Runny nose", "Itching"],
-        "side_effects": ["Drowsiness", "Dry mouth", "Fatigue"],
-        "precautions": [
-            "May cause drowsiness",
-            "Avoid driving if drowsy",
-            "Take at night if causes sleepiness"
-        ]
-    },
-    "ibuprofen": {
-        "name": "Ibuprofen",
-        "generic_name": "Ibuprofen",
-        "image": "https://images.unsplash.com/photo-1587854692152-cbe660dbde88?w=400",
-        "type": "NSAID (Anti-inflammatory)",
-        "dosage": "400mg every 4-6 hours",
-        "max_daily": "1200mg (without prescription)",
-        "uses": ["Pain", "Inflammation", "Fever", "Arthritis"],
-        "side_effects": ["Stomach upset", "Heartburn", "Dizziness"],
-        "precautions": [
-            "Take with food",
-            "Avoid if stomach ulcers",
-            "Not for long-term use without doctor"
-        ]
-    },
-    "metformin": {
-        "name": "Metformin",
-        "generic_name": "Metformin Hydrochloride",
-        "image": "https://images.unsplash.com/photo-1550572017-4a6c5d8f2c7e?w=400",
-        "type": "Antidiabetic",
-        "dosage": "500mg twice daily with meals",
-        "max_daily": "2000mg",
-        "uses": ["Type 2 Diabetes", "Blood sugar control"],
-        "side_effects": ["Nausea", "Diarrhea", "Stomach upset"],
-        "precautions": [
-            "Take with meals",
-            "Regular blood sugar monitoring",
-            "Avoid alcohol"
-        ]
-    },
-    "ashwagandha": {
-        "name": "Ashwagandha",
-        "generic_name": "Withania Somnifera",
-        "image": "https://images.unsplash.com/photo-1608571423902-eed4a5ad8108?w=400",
-        "type": "Ayurvedic Herb",
-        "dosage": "300-500mg twice daily",
-        "max_daily": "1000mg",
-        "uses": ["Stress", "Anxiety", "Energy", "Immunity"],
-        "side_effects": ["Mild stomach upset", "Drowsiness"],
-        "precautions": [
-            "Take with warm milk",
-            "Avoid if pregnant",
-            "Consult doctor if on medications"
-        ]
-    }
-}
+from knowledge_base import kb
+
+YOGA_POSES = {key: pose.to_dict() for key, pose in kb.poses.items()}
+
+MEDICINE_DATABASE = {key: medicine.to_dict() for key, medicine in kb.medicines.items()}
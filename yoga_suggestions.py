@@ -1,57 +1,129 @@
+from collections import deque
+
+from knowledge_base import kb
+from fuzzy_search import closest_yoga_conditions
+
+# Condition -> recommended asanas/breathing, best first (from the knowledge base)
+YOGA_CONDITIONS = {name: list(poses) for name, poses in kb.yoga.conditions.items()}
+
+# Extra keywords that point at a condition above
+YOGA_SYNONYMS = dict(kb.yoga.synonyms)
+
+DEFAULT_POSES = list(kb.yoga.default_poses)
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a set of keywords.
+    find_all() reports every keyword occurring as a substring of the text
+    in one pass, so the cost does not grow with the number of keywords.
+    """
+
+    def __init__(self, keywords):
+        """keywords: mapping of lowercase keyword -> value reported on a match"""
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for keyword, value in keywords.items():
+            node = 0
+            for ch in keyword:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append((len(keyword), value))
+        self._link()
+
+    def _link(self):
+        """Breadth-first pass setting failure links and inherited outputs."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and ch not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(ch, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find_all(self, text):
+        """Yield (start_index, value) for every keyword occurrence, in text order of their end."""
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, value in out[node]:
+                yield i - length + 1, value
+
+
+def build_matcher(conditions=YOGA_CONDITIONS, synonyms=YOGA_SYNONYMS):
+    keywords = {name: name for name in conditions}
+    keywords.update((word, name) for word, name in synonyms.items() if name in conditions)
+    return KeywordMatcher(keywords)
+
+
+_matcher = build_matcher()
+
+
+def matched_conditions(text: str):
+    """
+    Conditions mentioned in text, in order of first mention. A keyword has to
+    start a word: "migraines" names headache, "hypertension" does not name
+    stress through "tension".
+    """
+    text = text.lower()
+    first_seen = {}
+    for start, condition in _matcher.find_all(text):
+        if start and text[start - 1].isalnum():
+            continue
+        if condition not in first_seen or start < first_seen[condition]:
+            first_seen[condition] = start
+    return sorted(first_seen, key=first_seen.get)
+
+
+def find_conditions(text: str):
+    """
+    (conditions, fuzzy): the conditions mentioned in text, and whether they
+    were only found by matching misspelt keywords ("diabetis", "astma").
+    """
+    conditions = matched_conditions(text)
+    if conditions:
+        return conditions, False
+    return closest_yoga_conditions(text), True
+
+
+def poses_for(conditions):
+    """
+    One condition returns its list as-is; several conditions return the
+    merged poses, ranked by how many of the conditions recommend each one,
+    then by the order the conditions were mentioned. No condition returns
+    the default poses.
+    """
+    if not conditions:
+        return list(DEFAULT_POSES)
+    if len(conditions) == 1:
+        return list(YOGA_CONDITIONS[conditions[0]])
+
+    votes, order = {}, {}
+    for condition in conditions:
+        for pose in YOGA_CONDITIONS[condition]:
+            votes[pose] = votes.get(pose, 0) + 1
+            order.setdefault(pose, len(order))
+    return sorted(votes, key=lambda pose: (-votes[pose], order[pose]))
+
+
 def suggest_yoga(text: str):
     """
-    Very simple keyword-based mapping.
-    Lowercases the input, returns list of asanas/breathing.
+    Keyword-based mapping from free text to asanas/breathing (see poses_for).
+    When no keyword occurs verbatim, misspelt ones are matched fuzzily.
     """
     if not text:
         return ["No specific yoga found, try consulting an instructor."]
-
-    t = text.lower()
-
-    yoga_dict = {
-        "diabetes": [
-            "Surya Namaskar (Sun Salutation)",
-            "Dhanurasana (Bow Pose)",
-            "Paschimottanasana (Seated Forward Bend)"
-        ],
-        "asthma": [
-            "Bhujangasana (Cobra Pose)",
-            "Ardha Matsyendrasana (Half Spinal Twist)",
-            "Anulom Vilom (Alternate Nostril Breathing)"
-        ],
-        "back pain": [
-            "Marjaryasana-Bitilasana (Cat–Cow)",
-            "Balasana (Child’s Pose)",
-            "Setu Bandhasana (Bridge Pose)"
-        ],
-        "stress": [
-            "Padmasana (Lotus Pose)",
-            "Shavasana (Corpse Pose)",
-            "Bhramari Pranayama (Humming Bee Breath)"
-        ],
-        "anxiety": [
-            "Padmasana (Lotus Pose)",
-            "Shavasana (Corpse Pose)",
-            "Bhramari Pranayama (Humming Bee Breath)"
-        ],
-        "headache": [
-            "Uttanasana (Standing Forward Bend)",
-            "Viparita Karani (Legs-up-the-wall)",
-            "Nadi Shodhana (Alternate Nostril Breathing)"
-        ],
-        "cold": [
-            "Kapalabhati (Skull Shining)",
-            "Ardha Matsyendrasana (Half Twist)",
-            "Bhujangasana (Cobra Pose)"
-        ]
-    }
-
-    for key, vals in yoga_dict.items():
-        if key in t:
-            return vals
-
-    return [
-        "Tadasana (Mountain Pose)",
-        "Vrikshasana (Tree Pose)",
-        "Sukhasana with deep breathing"
-    ]
+    return poses_for(find_conditions(text)[0])